@@ -0,0 +1,95 @@
+"""Convert patent and company JSON columns to JSONB
+
+Revision ID: 4b9d6e2a7c31
+Revises: 7a4f2c8e9b15
+Create Date: 2024-11-29 11:47:22.584107
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '4b9d6e2a7c31'
+down_revision = '7a4f2c8e9b15'
+branch_labels = None
+depends_on = None
+
+PATENT_JSON_COLUMNS = [
+    'application_events',
+    'citations',
+    'image_urls',
+    'landscapes',
+    'attachment_urls',
+    'inventors',
+    'claims',
+]
+
+SEARCH_DOCUMENT = "setweight(to_tsvector('english'::regconfig, coalesce(title, '')), 'A') || setweight(to_tsvector('english'::regconfig, coalesce(abstract, '')), 'B') || setweight(to_tsvector('english'::regconfig, coalesce(ai_summary, '')), 'B') || setweight(to_tsvector('english'::regconfig, coalesce(claims::text, '')), 'C')"
+
+
+def drop_search_vector():
+    # The generated column reads claims, whose type cannot change under it
+    op.drop_index('ix_patent_search_vector', table_name='patent', postgresql_using='gin')
+    op.drop_column('patent', 'search_vector')
+
+
+def add_search_vector():
+    op.add_column('patent', sa.Column('search_vector', postgresql.TSVECTOR(), sa.Computed(SEARCH_DOCUMENT, persisted=True), nullable=True))
+    op.create_index('ix_patent_search_vector', 'patent', ['search_vector'], unique=False, postgresql_using='gin')
+
+
+def upgrade():
+    drop_search_vector()
+    # Dumps stored some values as JSON encoded strings, decode those into
+    # arrays/objects so containment queries can see inside them
+    op.execute("""
+        CREATE FUNCTION pg_temp.decode_json_string(value json) RETURNS jsonb AS $$
+        BEGIN
+            IF json_typeof(value) = 'string' AND ltrim(value #>> '{}') ~ '^[\\[{]' THEN
+                RETURN (value #>> '{}')::jsonb;
+            END IF;
+            RETURN value::jsonb;
+        EXCEPTION WHEN invalid_text_representation THEN
+            RETURN value::jsonb;
+        END;
+        $$ LANGUAGE plpgsql IMMUTABLE
+    """)
+    for column in PATENT_JSON_COLUMNS:
+        op.alter_column('patent', column,
+               existing_type=postgresql.JSON(astext_type=sa.Text()),
+               type_=postgresql.JSONB(astext_type=sa.Text()),
+               existing_nullable=True,
+               postgresql_using=f'pg_temp.decode_json_string({column})')
+    op.alter_column('company', 'products',
+               existing_type=postgresql.JSON(astext_type=sa.Text()),
+               type_=postgresql.JSONB(astext_type=sa.Text()),
+               existing_nullable=True,
+               postgresql_using='pg_temp.decode_json_string(products)')
+    op.execute("DROP FUNCTION pg_temp.decode_json_string(json)")
+    add_search_vector()
+
+    op.create_index('ix_patent_landscapes', 'patent', ['landscapes'], unique=False, postgresql_using='gin', postgresql_ops={'landscapes': 'jsonb_path_ops'})
+    op.create_index('ix_patent_inventors', 'patent', ['inventors'], unique=False, postgresql_using='gin', postgresql_ops={'inventors': 'jsonb_path_ops'})
+    op.create_index('ix_company_products', 'company', ['products'], unique=False, postgresql_using='gin', postgresql_ops={'products': 'jsonb_path_ops'})
+
+
+def downgrade():
+    op.drop_index('ix_company_products', table_name='company', postgresql_using='gin', postgresql_ops={'products': 'jsonb_path_ops'})
+    op.drop_index('ix_patent_inventors', table_name='patent', postgresql_using='gin', postgresql_ops={'inventors': 'jsonb_path_ops'})
+    op.drop_index('ix_patent_landscapes', table_name='patent', postgresql_using='gin', postgresql_ops={'landscapes': 'jsonb_path_ops'})
+
+    drop_search_vector()
+    op.alter_column('company', 'products',
+               existing_type=postgresql.JSONB(astext_type=sa.Text()),
+               type_=postgresql.JSON(astext_type=sa.Text()),
+               existing_nullable=True,
+               postgresql_using='products::json')
+    for column in PATENT_JSON_COLUMNS:
+        op.alter_column('patent', column,
+               existing_type=postgresql.JSONB(astext_type=sa.Text()),
+               type_=postgresql.JSON(astext_type=sa.Text()),
+               existing_nullable=True,
+               postgresql_using=f'{column}::json')
+    add_search_vector()
@@ -0,0 +1,73 @@
+"""Add patentclaim table
+
+Revision ID: 5e2a8c4d7f10
+Revises: 4b9d6e2a7c31
+Create Date: 2024-11-30 10:12:41.318205
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '5e2a8c4d7f10'
+down_revision = '4b9d6e2a7c31'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('patentclaim',
+    sa.Column('number', sa.Integer(), nullable=False),
+    sa.Column('parent', sa.Integer(), nullable=True),
+    sa.Column('is_independent', sa.Boolean(), nullable=False),
+    sa.Column('text', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('id', sa.Uuid(), nullable=False),
+    sa.Column('patent_id', sa.Uuid(), nullable=False),
+    sa.ForeignKeyConstraint(['patent_id'], ['patent.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_patentclaim_patent_id_number', 'patentclaim', ['patent_id', 'number'], unique=True)
+    op.create_index('ix_patentclaim_text_search', 'patentclaim', [sa.text("to_tsvector('english'::regconfig, text)")], unique=False, postgresql_using='gin')
+    op.add_column('infringementjob', sa.Column('claim_numbers', postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+
+    # Split the claims of existing patents the way app.core.prompt.parse_claims
+    # does: numbered by "num" (else their position), without the "N. " prefix,
+    # depending on the lower numbered claim their preamble refers to
+    op.execute(r"""
+        INSERT INTO patentclaim (id, patent_id, number, parent, is_independent, text)
+        SELECT uuid_generate_v4(), patent_id, number, parent, parent IS NULL, text
+        FROM (
+            SELECT c.patent_id, c.number, c.text,
+                   CASE WHEN ref.number::int < c.number THEN ref.number::int END AS parent
+            FROM (
+                SELECT p.id AS patent_id,
+                       CASE WHEN e.value->>'num' ~ '^\s*\d{1,9}\s*$'
+                            THEN (e.value->>'num')::int
+                            ELSE e.ordinality::int END AS number,
+                       regexp_replace(
+                           regexp_replace(
+                               CASE jsonb_typeof(e.value)
+                                   WHEN 'object' THEN coalesce(e.value->>'text', '')
+                                   ELSE e.value #>> '{}' END,
+                               '^\s*\d+\s*\.\s*', ''),
+                           '^\s+|\s+$', '', 'g') AS text
+                FROM patent p,
+                     jsonb_array_elements(p.claims) WITH ORDINALITY AS e(value, ordinality)
+                WHERE jsonb_typeof(p.claims) = 'array'
+            ) c
+            LEFT JOIN LATERAL (
+                SELECT substring(left(c.text, 200) from '(?i)\mclaims?\s+(\d{1,9})') AS number
+            ) ref ON true
+            WHERE c.text <> ''
+        ) claims
+        ON CONFLICT (patent_id, number) DO NOTHING
+    """)
+
+
+def downgrade():
+    op.drop_column('infringementjob', 'claim_numbers')
+    op.drop_index('ix_patentclaim_text_search', table_name='patentclaim', postgresql_using='gin')
+    op.drop_index('ix_patentclaim_patent_id_number', table_name='patentclaim')
+    op.drop_table('patentclaim')
@@ -0,0 +1,72 @@
+"""Add product table
+
+Revision ID: 8f6b1d3e5a92
+Revises: 5e2a8c4d7f10
+Create Date: 2024-11-30 15:38:02.904617
+
+"""
+import uuid
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '8f6b1d3e5a92'
+down_revision = '5e2a8c4d7f10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('product',
+    sa.Column('name', sqlmodel.sql.sqltypes.AutoString(length=255), nullable=False),
+    sa.Column('description', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+    sa.Column('id', sa.Uuid(), nullable=False),
+    sa.Column('company_id', sa.Uuid(), nullable=False),
+    sa.ForeignKeyConstraint(['company_id'], ['company.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_product_company_id_name', 'product', ['company_id', 'name'], unique=True)
+    op.create_index('ix_product_search', 'product', [sa.text("(to_tsvector('english'::regconfig, name) || to_tsvector('english'::regconfig, description))")], unique=False, postgresql_using='gin')
+    op.add_column('infringementjob', sa.Column('product_names', postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+
+    # One row per named product of existing companies, the last of a
+    # repeated name wins as when seeding
+    connection = op.get_bind()
+    products = connection.execute(sa.text("""
+        SELECT DISTINCT ON (c.id, p.value->>'name')
+               c.id, p.value->>'name', coalesce(p.value->>'description', '')
+        FROM company c,
+             jsonb_array_elements(c.products) WITH ORDINALITY AS p(value, ordinality)
+        WHERE jsonb_typeof(c.products) = 'array'
+          AND jsonb_typeof(p.value) = 'object'
+          AND length(p.value->>'name') BETWEEN 1 AND 255
+        ORDER BY c.id, p.value->>'name', p.ordinality DESC
+    """)).all()
+    if products:
+        # Ids derived as in app.core.seed.replace_company_products, so
+        # reseeding keeps them and the products keep their embeddings
+        connection.execute(
+            sa.text(
+                "INSERT INTO product (id, company_id, name, description) "
+                "VALUES (:id, :company_id, :name, :description)"
+            ),
+            [
+                {
+                    "id": uuid.uuid5(company_id, name),
+                    "company_id": company_id,
+                    "name": name,
+                    "description": description,
+                }
+                for company_id, name, description in products
+            ],
+        )
+
+
+def downgrade():
+    op.drop_column('infringementjob', 'product_names')
+    op.drop_index('ix_product_search', table_name='product', postgresql_using='gin')
+    op.drop_index('ix_product_company_id_name', table_name='product')
+    op.drop_table('product')
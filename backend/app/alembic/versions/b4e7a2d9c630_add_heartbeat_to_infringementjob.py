@@ -0,0 +1,27 @@
+"""Add heartbeat to infringementjob
+
+Revision ID: b4e7a2d9c630
+Revises: 8f6b1d3e5a92
+Create Date: 2024-12-09 10:41:26.318052
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = 'b4e7a2d9c630'
+down_revision = '8f6b1d3e5a92'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('infringementjob', sa.Column('heartbeat_at', sa.DateTime(), nullable=True))
+    # Running jobs are reclaimed on their heartbeat, which used to be the start
+    op.execute("UPDATE infringementjob SET heartbeat_at = started_at WHERE status = 'running'")
+
+
+def downgrade():
+    op.drop_column('infringementjob', 'heartbeat_at')
@@ -0,0 +1,31 @@
+"""Add llm_called to infringementanalysis
+
+Revision ID: c3f8a1e6d952
+Revises: b4e7a2d9c630
+Create Date: 2024-12-11 15:02:47.193840
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel.sql.sqltypes
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3f8a1e6d952'
+down_revision = 'b4e7a2d9c630'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('infringementanalysis', sa.Column('llm_called', sa.Boolean(), server_default=sa.false(), nullable=False))
+    # Only analyses the pre-filter left without products skipped the LLM so far
+    op.execute(
+        "UPDATE infringementanalysis SET llm_called = true "
+        "WHERE overall_risk_assessment <> 'No products share relevant terms with "
+        "the patent claims, infringement risk is low.'"
+    )
+
+
+def downgrade():
+    op.drop_column('infringementanalysis', 'llm_called')
@@ -0,0 +1,30 @@
+from typing import Any
+
+from sqlalchemy import ColumnElement
+
+from app.models import Company, Patent
+
+
+def jsonb_contains(column: Any, value: Any) -> ColumnElement[bool]:
+    """
+    ``column @> value``, which the column's jsonb_path_ops GIN index serves.
+    """
+    return column.contains(value)  # type: ignore[no-any-return]
+
+
+def patent_filters(
+    *, landscape: str | None = None, inventor: str | None = None
+) -> list[ColumnElement[bool]]:
+    filters = []
+    if landscape is not None:
+        filters.append(jsonb_contains(Patent.landscapes, [landscape]))
+    if inventor is not None:
+        filters.append(jsonb_contains(Patent.inventors, [{"last_name": inventor}]))
+    return filters
+
+
+def company_filters(*, product: str | None = None) -> list[ColumnElement[bool]]:
+    filters = []
+    if product is not None:
+        filters.append(jsonb_contains(Company.products, [{"name": product}]))
+    return filters
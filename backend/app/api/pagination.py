@@ -0,0 +1,143 @@
+import base64
+import binascii
+import uuid
+from typing import Any, Literal, TypeVar
+
+from fastapi import HTTPException
+from sqlalchemy import ColumnElement
+from sqlmodel import Session, func, select, text
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlmodel.sql.expression import Select, SelectOfScalar
+
+T = TypeVar("T")
+
+# exact: COUNT(*), estimated: planner statistics, none: skip counting
+CountMode = Literal["exact", "estimated", "none"]
+
+
+def encode_cursor(id: uuid.UUID) -> str:
+    return base64.urlsafe_b64encode(id.bytes).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> uuid.UUID:
+    try:
+        return uuid.UUID(
+            bytes=base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        )
+    except (binascii.Error, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _page_statement(
+    statement: Any, *, id_column: Any, cursor: str | None, skip: int, limit: int
+) -> Any:
+    statement = statement.order_by(id_column)
+    if cursor is not None:
+        statement = statement.where(id_column > decode_cursor(cursor))
+    else:
+        statement = statement.offset(skip)
+    # One extra row tells whether there is a next page
+    return statement.limit(limit + 1)
+
+
+def _split_page(rows: list[Any], limit: int) -> tuple[list[Any], str | None]:
+    if limit <= 0 or len(rows) <= limit:
+        return rows[: max(limit, 0)], None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(getattr(last, "id", last))
+
+
+def paginate(
+    session: Session,
+    statement: SelectOfScalar[T] | Select[Any],
+    *,
+    id_column: Any,
+    cursor: str | None,
+    skip: int,
+    limit: int,
+) -> tuple[list[Any], str | None]:
+    """
+    Fetch a page of ``statement`` ordered by its primary key.
+
+    With a cursor the page starts right after the row it points to, which the
+    primary key index finds in constant time however deep the page is. Without
+    one, ``skip`` falls back to OFFSET paging. Returns the rows and the cursor
+    of the next page, None on the last page.
+    """
+    statement = _page_statement(
+        statement, id_column=id_column, cursor=cursor, skip=skip, limit=limit
+    )
+    return _split_page(list(session.exec(statement).all()), limit)
+
+
+async def paginate_async(
+    session: AsyncSession,
+    statement: SelectOfScalar[T] | Select[Any],
+    *,
+    id_column: Any,
+    cursor: str | None,
+    skip: int,
+    limit: int,
+) -> tuple[list[Any], str | None]:
+    """
+    Async version of paginate.
+    """
+    statement = _page_statement(
+        statement, id_column=id_column, cursor=cursor, skip=skip, limit=limit
+    )
+    return _split_page(list((await session.exec(statement)).all()), limit)
+
+
+# Tables that were never vacuumed or analyzed have no pages in pg_class, and
+# report a reltuples of -1 from PostgreSQL 14 on but 0 before
+ESTIMATED_COUNT_STATEMENT = text(
+    "SELECT reltuples FROM pg_class"
+    " WHERE oid = CAST(:table AS regclass) AND relpages > 0"
+)
+
+
+def count_rows(
+    session: Session,
+    model: Any,
+    count_mode: CountMode,
+    *where: ColumnElement[bool],
+) -> int | None:
+    """
+    Count the rows of ``model`` matching ``where``.
+
+    Estimated counts read the row count pg_class keeps from the last
+    VACUUM/ANALYZE instead of scanning the table. They only apply to whole
+    tables, filtered counts and never-analyzed tables are counted exactly.
+    """
+    if count_mode == "none":
+        return None
+    if count_mode == "estimated" and not where:
+        estimate = session.scalar(
+            ESTIMATED_COUNT_STATEMENT, {"table": model.__tablename__}
+        )
+        if estimate is not None and estimate >= 0:
+            return int(estimate)
+    return session.exec(select(func.count()).select_from(model).where(*where)).one()
+
+
+async def count_rows_async(
+    session: AsyncSession,
+    model: Any,
+    count_mode: CountMode,
+    *where: ColumnElement[bool],
+) -> int | None:
+    """
+    Async version of count_rows.
+    """
+    if count_mode == "none":
+        return None
+    if count_mode == "estimated" and not where:
+        estimate = await session.scalar(
+            ESTIMATED_COUNT_STATEMENT, {"table": model.__tablename__}
+        )
+        if estimate is not None and estimate >= 0:
+            return int(estimate)
+    return (
+        await session.exec(select(func.count()).select_from(model).where(*where))
+    ).one()
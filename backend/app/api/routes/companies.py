@@ -1,13 +1,21 @@
 import uuid
 from typing import Any
 
-from fastapi import APIRouter, HTTPException
-from app.api.deps import SessionDep
-from sqlmodel import func, select
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse
+from app.api.deps import AsyncSessionDep
+from app.api.filters import company_filters
+from app.api.pagination import CountMode, count_rows_async, paginate_async
+from app.core.embeddings import PATENT_INDEX, nearest, product_embedding_text
+from sqlmodel import col, select
 from app.models import (
     CompaniesPublic,
     CompanyPublic,
     Company,
+    Patent,
+    PatentSimilarityResults,
+    Product,
 )
 
 router = APIRouter()
@@ -17,25 +25,98 @@ router = APIRouter()
     "/",
     response_model=CompaniesPublic,
 )
-def read_items(session: SessionDep, skip: int = 0, limit: int = 100) -> Any:
+async def read_items(
+    session: AsyncSessionDep,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: str | None = None,
+    count_mode: CountMode = Query(default="exact", alias="count"),
+    product: str | None = Query(default=None, description="Product name"),
+) -> Any:
     """
     Retrieve companies.
     """
 
-    count_statement = select(func.count()).select_from(Company)
-    count = session.exec(count_statement).one()
-    statement = select(Company).offset(skip).limit(limit)
-    companies = session.exec(statement).all()
+    filters = company_filters(product=product)
+    count = await count_rows_async(session, Company, count_mode, *filters)
+    rows, next_cursor = await paginate_async(
+        session,
+        select(Company.id, Company.name, Company.products).where(*filters),
+        id_column=Company.id,
+        cursor=cursor,
+        skip=skip,
+        limit=limit,
+    )
 
-    return CompaniesPublic(data=companies, count=count)
+    # Serialize the rows as they are rather than validating them against the
+    # response model
+    return ORJSONResponse(
+        {
+            "data": [dict(row._mapping) for row in rows],
+            "count": count,
+            "next_cursor": next_cursor,
+        }
+    )
 
 
 @router.get("/{id}", response_model=CompanyPublic)
-def read_item(session: SessionDep, id: uuid.UUID) -> Any:
+async def read_item(session: AsyncSessionDep, id: uuid.UUID) -> Any:
     """
     Get company by ID.
     """
-    company = session.get(Company, id)
+    company = await session.get(Company, id)
     if not company:
         raise HTTPException(status_code=404, detail="Company not found")
     return company
+
+
+@router.get("/{id}/similar-patents", response_model=PatentSimilarityResults)
+async def read_similar_patents(
+    session: AsyncSessionDep,
+    id: uuid.UUID,
+    k: int = Query(default=10, ge=1, le=100),
+    product_name: str | None = Query(
+        default=None, description="Only match this product, not all of them"
+    ),
+) -> Any:
+    """
+    Find the patents closest to any of a company's products in the embedding
+    index, each with the product it is closest to.
+    """
+    company = await session.get(Company, id)
+    if not company:
+        raise HTTPException(status_code=404, detail="Company not found")
+    statement = select(Product).where(col(Product.company_id) == id)
+    if product_name is not None:
+        statement = statement.where(col(Product.name) == product_name)
+    products = (await session.exec(statement)).all()
+    if product_name is not None and not products:
+        raise HTTPException(status_code=404, detail="Product not found")
+
+    texts = [
+        product_embedding_text(name=product.name, description=product.description)
+        for product in products
+    ]
+    matches = await run_in_threadpool(nearest, PATENT_INDEX, texts, k)
+    closest = {id: (score, products[query].name) for id, score, query in matches}
+
+    patents = (
+        await session.exec(
+            select(Patent.id, Patent.publication_number, Patent.title).where(
+                col(Patent.id).in_(closest)
+            )
+        )
+    ).all()
+    # Patents deleted since the index was last synced drop out here
+    patents = sorted(patents, key=lambda patent: closest[patent[0]][0], reverse=True)
+    hits = [
+        {
+            "id": patent_id,
+            "publication_number": publication_number,
+            "title": title,
+            "score": closest[patent_id][0],
+            "product_name": closest[patent_id][1],
+        }
+        for patent_id, publication_number, title in patents
+    ]
+    return ORJSONResponse({"data": hits})
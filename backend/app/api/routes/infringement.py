@@ -1,64 +1,485 @@
 import uuid
 import logging
+import time
+from collections.abc import AsyncIterator
 from datetime import datetime
-from typing import Any
+from typing import Any, Literal
 from venv import logger
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from fastapi import APIRouter, HTTPException
-from sqlmodel import func, select
-from app.models import Company, Patent, InfringementAnalysis, InfringementAnalysisPublic
-from app.api.deps import SessionDep
-from app.core.openai import PatentInfringementAnalyzer
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlmodel import col, func, select
+from app.models import (
+    Company,
+    InfringementAnalysis,
+    InfringementAnalysisPublic,
+    InfringementJob,
+    InfringementJobPublic,
+    InfringingProductDetail,
+    Patent,
+    PatentClaim,
+    Product,
+)
+from app.api.deps import AnalyzerDep, AsyncSessionDep
+from app.core.config import settings
+from app.core.infringement import (
+    analyze_and_persist,
+    analyze_batch,
+    get_company_and_patent,
+    stream_analysis,
+)
+from app.core.jobs import enqueue_job
+from app.core.screening import screen_company
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
 
 router = APIRouter()
 
+
 class InfringementAnalysisRequest(BaseModel):
     patent_id: str
     company_name: str
+    # Queue the analysis instead of waiting for it, see app.core.jobs
+    background: bool = False
+    # Only analyze these claims and the claims they depend on
+    claim_numbers: list[int] | None = Field(default=None, min_length=1)
+    # Only analyze these products of the company, see GET /products
+    product_names: list[str] | None = Field(default=None, min_length=1)
+
+
+class InfringementBatchRequest(BaseModel):
+    patent_ids: list[str] | None = None
+    company_names: list[str] | None = None
+
+
+class InfringementBatchResult(BaseModel):
+    type: Literal["result"] = "result"
+    patent_id: str
+    company_name: str
+    cached: bool
+    elapsed_seconds: float
+    analysis: InfringementAnalysisPublic
+
+
+class InfringementBatchSummary(BaseModel):
+    type: Literal["summary"] = "summary"
+    pairs: int
+    succeeded: int = 0
+    failed: int = 0
+    cached: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    elapsed_seconds: float = 0.0
+
+
+class InfringementScreenRequest(BaseModel):
+    company_name: str
+    # Pairs kept by the similarity pass, see app.core.screening
+    top_n: int = Field(default=20, ge=1)
+    # Pairs scoring at or below this cosine similarity are never analyzed
+    min_score: float = Field(default=0.0, ge=-1.0, le=1.0)
+
+
+class InfringementScreenProduct(BaseModel):
+    name: str
+    score: float
+
+
+class InfringementScreenResult(BaseModel):
+    type: Literal["result"] = "result"
+    patent_id: str
+    company_name: str
+    products: list[InfringementScreenProduct]
+    cached: bool
+    elapsed_seconds: float
+    analysis: InfringementAnalysisPublic
+
+
+class InfringementScreenSummary(BaseModel):
+    type: Literal["summary"] = "summary"
+    patents_screened: int
+    products_screened: int
+    pairs_screened: int
+    pairs_selected: int
+    patents_analyzed: int
+    # One LLM call analyzes a patent against all of its selected products, so
+    # without screening every patent of the portfolio would cost one
+    llm_calls: int = 0
+    llm_calls_avoided: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    cached: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    screening_seconds: float = 0.0
+    elapsed_seconds: float = 0.0
+
+
+async def get_request_company_and_patent(
+    *, session: AsyncSessionDep, data: InfringementAnalysisRequest
+) -> tuple[Company, Patent]:
+    """
+    Load the company and patent of an analysis request, checking that the
+    requested claims and products exist.
+    """
+    company, patent = await get_company_and_patent(
+        session=session, company_name=data.company_name, patent_id=data.patent_id
+    )
+    if not company:
+        raise HTTPException(status_code=404, detail="Company not found")
+    if not patent:
+        raise HTTPException(status_code=404, detail="Patent not found")
+    if data.claim_numbers is not None:
+        found_claims = (
+            await session.exec(
+                select(PatentClaim.number)
+                .where(PatentClaim.patent_id == patent.id)
+                .where(col(PatentClaim.number).in_(data.claim_numbers))
+            )
+        ).all()
+        missing_claims = sorted(set(data.claim_numbers) - set(found_claims))
+        if missing_claims:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Claims not found: {', '.join(map(str, missing_claims))}",
+            )
+    if data.product_names is not None:
+        found_products = (
+            await session.exec(
+                select(Product.name)
+                .where(Product.company_id == company.id)
+                .where(col(Product.name).in_(data.product_names))
+            )
+        ).all()
+        missing_products = sorted(set(data.product_names) - set(found_products))
+        if missing_products:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Products not found: {', '.join(missing_products)}",
+            )
 
-@router.post("/check", response_model=InfringementAnalysisPublic)
-def check_infringement(
-    *, session: SessionDep, data: InfringementAnalysisRequest
+    return company, patent
+
+
+@router.post(
+    "/check",
+    response_model=InfringementAnalysisPublic,
+    responses={202: {"model": InfringementJobPublic}},
+)
+async def check_infringement(
+    *,
+    session: AsyncSessionDep,
+    analyzer: AnalyzerDep,
+    data: InfringementAnalysisRequest,
 ) -> Any:
     """
     Check infringement.
+
+    With ``background`` set, the analysis is queued and a job is returned with
+    status 202; poll GET /infringement/jobs/{job_id} for its result.
+    ``claim_numbers`` limits the analysis to those claims, see
+    GET /patents/{patent_id}/claims, and ``product_names`` to those products,
+    see GET /products.
+    """
+    company, patent = await get_request_company_and_patent(session=session, data=data)
+
+    if data.background:
+        job = await enqueue_job(
+            session=session,
+            patent_id=patent.publication_number,
+            company_name=company.name,
+            claim_numbers=data.claim_numbers,
+            product_names=data.product_names,
+        )
+        return JSONResponse(
+            status_code=202,
+            content=jsonable_encoder(InfringementJobPublic.model_validate(job)),
+        )
+
+    return await analyze_and_persist(
+        session=session,
+        analyzer=analyzer,
+        company=company,
+        patent=patent,
+        claim_numbers=data.claim_numbers,
+        product_names=data.product_names,
+    )
+
+
+@router.post(
+    "/check/stream",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"text/event-stream": {}}}},
+)
+async def stream_infringement(
+    *,
+    session: AsyncSessionDep,
+    analyzer: AnalyzerDep,
+    data: InfringementAnalysisRequest,
+) -> Any:
+    """
+    Check infringement, streaming the result as server-sent events.
+
+    Each infringing product is sent as a ``product`` event as soon as the LLM
+    has written it, and the complete analysis as a final ``analysis`` event,
+    the same as POST /infringement/check returns. ``background`` is not
+    supported.
+    """
+    if data.background:
+        raise HTTPException(
+            status_code=400, detail="Streamed analyses cannot run in the background"
+        )
+    company, patent = await get_request_company_and_patent(session=session, data=data)
+    # Release the connection, the analysis runs on its own session
+    await session.commit()
+
+    async def stream_events() -> AsyncIterator[str]:
+        async for item in stream_analysis(
+            analyzer=analyzer,
+            company=company,
+            patent=patent,
+            claim_numbers=data.claim_numbers,
+            product_names=data.product_names,
+        ):
+            if isinstance(item, InfringingProductDetail):
+                yield f"event: product\ndata: {item.model_dump_json()}\n\n"
+            else:
+                yield f"event: analysis\ndata: {item.model_dump_json()}\n\n"
+
+    return StreamingResponse(
+        stream_events(),
+        media_type="text/event-stream",
+        # Keep proxies from caching or buffering the events
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post(
+    "/batch",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"application/x-ndjson": {}}}},
+)
+async def check_infringement_batch(
+    *,
+    session: AsyncSessionDep,
+    analyzer: AnalyzerDep,
+    data: InfringementBatchRequest,
+) -> Any:
+    """
+    Check infringement for every requested patent against every requested company.
+
+    Leaving ``patent_ids`` or ``company_names`` empty screens against all rows
+    of that table. Results are streamed as NDJSON lines as soon as each pair
+    completes, followed by a final summary line with timing and token usage.
+    """
+    if data.patent_ids is None and data.company_names is None:
+        raise HTTPException(
+            status_code=400,
+            detail="At least one of patent_ids or company_names is required",
+        )
+
+    company_statement = select(Company)
+    if data.company_names is not None:
+        company_statement = company_statement.where(
+            col(Company.name).in_(data.company_names)
+        )
+    companies = (await session.exec(company_statement)).all()
+
+    patent_statement = select(Patent)
+    if data.patent_ids is not None:
+        patent_statement = patent_statement.where(
+            col(Patent.publication_number).in_(data.patent_ids)
+        )
+    patents = (await session.exec(patent_statement)).all()
+
+    missing = sorted(
+        set(data.company_names or []) - {company.name for company in companies}
+    ) + sorted(
+        set(data.patent_ids or []) - {patent.publication_number for patent in patents}
+    )
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Not found: {', '.join(missing)}")
+
+    pairs = len(companies) * len(patents)
+    if pairs > settings.INFRINGEMENT_BATCH_MAX_PAIRS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Batch of {pairs} pairs exceeds the limit of {settings.INFRINGEMENT_BATCH_MAX_PAIRS}",
+        )
+    # Release the connection, each pair runs on its own session
+    await session.commit()
+
+    async def stream_results() -> AsyncIterator[str]:
+        started = time.perf_counter()
+        summary = InfringementBatchSummary(pairs=pairs)
+        async for result in analyze_batch(
+            analyzer=analyzer,
+            companies=companies,
+            patents=patents,
+            concurrency=settings.INFRINGEMENT_BATCH_CONCURRENCY,
+        ):
+            analysis = result.analysis
+            if analysis.is_error:
+                summary.failed += 1
+            else:
+                summary.succeeded += 1
+            if result.cached:
+                summary.cached += 1
+            else:
+                # Only fresh analyses spent tokens in this batch
+                summary.prompt_tokens += analysis.prompt_tokens or 0
+                summary.completion_tokens += analysis.completion_tokens or 0
+            line = InfringementBatchResult(
+                patent_id=result.patent.publication_number,
+                company_name=result.company.name,
+                cached=result.cached,
+                elapsed_seconds=result.elapsed_seconds,
+                analysis=analysis,
+            )
+            yield line.model_dump_json() + "\n"
+        summary.elapsed_seconds = time.perf_counter() - started
+        yield summary.model_dump_json() + "\n"
+
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+
+@router.post(
+    "/screen",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"application/x-ndjson": {}}}},
+)
+async def screen_infringement(
+    *,
+    session: AsyncSessionDep,
+    analyzer: AnalyzerDep,
+    data: InfringementScreenRequest,
+) -> Any:
     """
-    # * create infringement analysis
-    # analysis = InfringementAnalysis(**analysis_in.dict(exclude_unset=True))
-    # session.add(analysis)
-    # session.commit()
-    # session.refresh(analysis)
+    Screen the whole patent portfolio for infringement risk of a company.
 
-    # Query the company data from the database
-    company = session.exec(
-        select(Company).where(Company.name == data.company_name)
+    Every (patent, product) pair is first ranked by embedding similarity, see
+    the "Similarity Index" section of the README. Only the ``top_n`` best pairs
+    go to the LLM, one analysis per patent covering its selected products.
+    Results are streamed as NDJSON lines like POST /infringement/batch,
+    followed by a summary line reporting how many LLM calls were avoided.
+    """
+    if data.top_n > settings.INFRINGEMENT_BATCH_MAX_PAIRS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"top_n of {data.top_n} exceeds the limit of {settings.INFRINGEMENT_BATCH_MAX_PAIRS}",
+        )
+    company = (
+        await session.exec(select(Company).where(Company.name == data.company_name))
     ).first()
     if not company:
         raise HTTPException(status_code=404, detail="Company not found")
 
-    # Query the patent data from the database
-    patent = session.exec(
-        select(Patent).where(Patent.publication_number == data.patent_id)
-    ).first()
-    if not patent:
-        raise HTTPException(status_code=404, detail="Patent not found")
+    screening = await screen_company(
+        session=session, company=company, top_n=data.top_n, min_score=data.min_score
+    )
+    # Release the connection, each pair runs on its own session
+    await session.commit()
+
+    async def stream_results() -> AsyncIterator[str]:
+        started = time.perf_counter()
+        summary = InfringementScreenSummary(
+            patents_screened=screening.patents_screened,
+            products_screened=screening.products_screened,
+            pairs_screened=screening.pairs_screened,
+            pairs_selected=screening.pairs_selected,
+            patents_analyzed=len(screening.patents),
+            screening_seconds=screening.elapsed_seconds,
+        )
+        async for result in analyze_batch(
+            analyzer=analyzer,
+            companies=[company],
+            patents=screening.patents,
+            concurrency=settings.INFRINGEMENT_BATCH_CONCURRENCY,
+            products={
+                patent_id: [product for product, _ in products]
+                for patent_id, products in screening.products.items()
+            },
+        ):
+            analysis = result.analysis
+            if analysis.is_error:
+                summary.failed += 1
+            else:
+                summary.succeeded += 1
+            if result.cached:
+                summary.cached += 1
+            else:
+                if analysis.llm_called:
+                    summary.llm_calls += 1
+                summary.prompt_tokens += analysis.prompt_tokens or 0
+                summary.completion_tokens += analysis.completion_tokens or 0
+            line = InfringementScreenResult(
+                patent_id=result.patent.publication_number,
+                company_name=company.name,
+                products=[
+                    InfringementScreenProduct(name=product["name"], score=score)
+                    for product, score in screening.products[result.patent.id]
+                ],
+                cached=result.cached,
+                elapsed_seconds=result.elapsed_seconds,
+                analysis=analysis,
+            )
+            yield line.model_dump_json() + "\n"
+        summary.llm_calls_avoided = summary.patents_screened - summary.llm_calls
+        summary.elapsed_seconds = (
+            screening.elapsed_seconds + time.perf_counter() - started
+        )
+        yield summary.model_dump_json() + "\n"
+
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
 
-    # Call the OpenAI API to analyze infringement
-    analyzer = PatentInfringementAnalyzer()
-    analysis_response = analyzer.analyze_infringement(company, patent)
 
-    return analysis_response
+@router.get("/jobs/{job_id}", response_model=InfringementJobPublic)
+async def read_infringement_job(session: AsyncSessionDep, job_id: uuid.UUID) -> Any:
+    """
+    Get background infringement job by ID.
+    """
+    job = await session.get(InfringementJob, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job with ID {job_id} not found")
+    return job
+
+
+@router.get("/latest", response_model=InfringementAnalysisPublic)
+async def read_latest_infringement(
+    session: AsyncSessionDep,
+    patent_id: str,
+    company_name: str,
+    include_errors: bool = False,
+) -> Any:
+    """
+    Get the most recent infringement analysis for a patent and company.
+    """
+    statement = (
+        select(InfringementAnalysis)
+        .where(InfringementAnalysis.patent_id == patent_id)
+        .where(InfringementAnalysis.company_name == company_name)
+        .order_by(col(InfringementAnalysis.analysis_date).desc())
+        .limit(1)
+    )
+    if not include_errors:
+        statement = statement.where(InfringementAnalysis.is_error == False)  # noqa: E712
+    analysis = (await session.exec(statement)).first()
+    if not analysis:
+        raise HTTPException(
+            status_code=404,
+            detail=f"No analysis found for patent {patent_id} and company {company_name}",
+        )
+    return analysis
 
 
-@router.get("/{id}", response_model=InfringementAnalysisPublic)
-def read_infringement(session: SessionDep, analysis_id: uuid.UUID) -> Any:
+@router.get("/{analysis_id}", response_model=InfringementAnalysisPublic)
+async def read_infringement(session: AsyncSessionDep, analysis_id: uuid.UUID) -> Any:
     """
     Get infringement analysis by ID.
     """
-    analysis = session.get(InfringementAnalysis, analysis_id)
+    analysis = await session.get(InfringementAnalysis, analysis_id)
     if not analysis:
         raise HTTPException(
             status_code=404, detail=f"Analysis with ID {analysis_id} not found"
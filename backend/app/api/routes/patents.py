@@ -1,39 +1,295 @@
 import uuid
 from typing import Any
 
-from fastapi import APIRouter, HTTPException
-from sqlmodel import func, select
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import literal_column
+from sqlalchemy.dialects.postgresql import REGCONFIG
+from sqlmodel import cast, col, func, select
 
-from app.api.deps import SessionDep
+from app.api.deps import AsyncSessionDep
+from app.api.filters import patent_filters
+from app.api.pagination import CountMode, count_rows_async, paginate_async
+from app.core.embeddings import PRODUCT_INDEX, nearest, patent_embedding_text
 from app.models import (
+    PATENT_SEARCH_CONFIG,
+    PATENT_SUMMARY_DEFAULT_FIELDS,
     PatentsPublic,
     PatentPublic,
     Patent,
+    PatentClaim,
+    PatentClaimSearchResults,
+    PatentClaimsPublic,
+    PatentSearchResults,
+    PatentSummary,
+    Company,
+    Product,
+    ProductSimilarityResults,
 )
 
 router = APIRouter()
 
 
+def claim_search_vector() -> Any:
+    # The configuration is inlined rather than bound, so the expression
+    # matches the ix_patentclaim_text_search index
+    return func.to_tsvector(
+        literal_column(f"'{PATENT_SEARCH_CONFIG}'::regconfig"), PatentClaim.text
+    )
+
+
 @router.get("/", response_model=PatentsPublic)
-def read_items(session: SessionDep, skip: int = 0, limit: int = 100) -> Any:
+async def read_items(
+    session: AsyncSessionDep,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: str | None = None,
+    count_mode: CountMode = Query(default="exact", alias="count"),
+    fields: str | None = Query(
+        default=None,
+        description="Comma separated PatentSummary fields to return, the id is always included",
+    ),
+    landscape: str | None = None,
+    inventor: str | None = Query(default=None, description="Inventor last name"),
+) -> Any:
+    """
+    Retrieve patent summaries, get the full patent from GET /patents/{id}.
+    """
+    selected_fields = (
+        [field.strip() for field in fields.split(",") if field.strip()]
+        if fields
+        else list(PATENT_SUMMARY_DEFAULT_FIELDS)
+    )
+    unknown_fields = set(selected_fields) - set(PatentSummary.model_fields)
+    if unknown_fields:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown patent fields: {', '.join(sorted(unknown_fields))}",
+        )
+    # Only the requested columns are read, the large JSON and text columns
+    # stay in the database
+    columns = [Patent.id] + [
+        getattr(Patent, field)
+        for field in dict.fromkeys(selected_fields)
+        if field != "id"
+    ]
+
+    filters = patent_filters(landscape=landscape, inventor=inventor)
+    count = await count_rows_async(session, Patent, count_mode, *filters)
+    rows, next_cursor = await paginate_async(
+        session,
+        select(*columns).where(*filters),
+        id_column=Patent.id,
+        cursor=cursor,
+        skip=skip,
+        limit=limit,
+    )
+
+    # The rows hold exactly the requested columns, serialize them as they are
+    # rather than validating them against the response model
+    return ORJSONResponse(
+        {
+            "data": [dict(row._mapping) for row in rows],
+            "count": count,
+            "next_cursor": next_cursor,
+        }
+    )
+
+
+@router.get("/search", response_model=PatentSearchResults)
+async def search_patents(
+    session: AsyncSessionDep,
+    q: str = Query(min_length=1, max_length=255),
+    skip: int = 0,
+    limit: int = Query(default=20, le=100),
+) -> Any:
     """
-    Retrieve companies.
+    Full-text search over patent titles, abstracts, AI summaries and claims.
+
+    ``q`` accepts web search syntax: "quoted phrases", OR and -excluded words.
     """
+    config = cast(PATENT_SEARCH_CONFIG, REGCONFIG)
+    ts_query = func.websearch_to_tsquery(config, q)
+    search_vector = Patent.__table__.c.search_vector  # type: ignore[attr-defined]
+    rank = func.ts_rank(search_vector, ts_query)
+
+    # Rank the matches found through the GIN index first, so snippets are only
+    # generated for the returned page
+    matches = (
+        select(Patent.id, rank.label("rank"))
+        .where(search_vector.op("@@")(ts_query))
+        .order_by(rank.desc(), col(Patent.id))
+        .offset(skip)
+        .limit(limit)
+        .subquery()
+    )
+    snippet = func.ts_headline(
+        config,
+        func.coalesce(Patent.abstract, Patent.ai_summary, Patent.title),
+        ts_query,
+        "MaxFragments=2, MinWords=10, MaxWords=30",
+    )
+    # More columns than select() has typed overloads for
+    columns: list[Any] = [
+        Patent.id,
+        Patent.publication_number,
+        Patent.title,
+        Patent.assignee,
+        matches.c.rank,
+        snippet.label("snippet"),
+    ]
+    statement = (
+        select(*columns)
+        .join(matches, matches.c.id == col(Patent.id))
+        .order_by(matches.c.rank.desc(), col(Patent.id))
+    )
+    hits = (await session.exec(statement)).all()
+
+    return ORJSONResponse({"data": [dict(hit._mapping) for hit in hits]})
 
-    count_statement = select(func.count()).select_from(Patent)
-    count = session.exec(count_statement).one()
-    statement = select(Patent).offset(skip).limit(limit)
-    patents = session.exec(statement).all()
 
-    return PatentsPublic(data=patents, count=count)
+@router.get("/claims/search", response_model=PatentClaimSearchResults)
+async def search_claims(
+    session: AsyncSessionDep,
+    q: str = Query(min_length=1, max_length=255),
+    independent: bool | None = None,
+    skip: int = 0,
+    limit: int = Query(default=20, le=100),
+) -> Any:
+    """
+    Full-text search over individual claims of all patents.
+
+    ``q`` accepts the same web search syntax as GET /patents/search.
+    """
+    config = cast(PATENT_SEARCH_CONFIG, REGCONFIG)
+    ts_query = func.websearch_to_tsquery(config, q)
+    claim_vector = claim_search_vector()
+    rank = func.ts_rank(claim_vector, ts_query)
+
+    matches = (
+        select(PatentClaim.id, rank.label("rank"))
+        .where(claim_vector.op("@@")(ts_query))
+        .order_by(rank.desc(), col(PatentClaim.id))
+        .offset(skip)
+        .limit(limit)
+    )
+    if independent is not None:
+        matches = matches.where(PatentClaim.is_independent == independent)
+    ranked = matches.subquery()
+    snippet = func.ts_headline(
+        config, PatentClaim.text, ts_query, "MaxFragments=2, MinWords=10, MaxWords=30"
+    )
+    # More columns than select() has typed overloads for
+    columns: list[Any] = [
+        PatentClaim.patent_id,
+        Patent.publication_number,
+        PatentClaim.number,
+        PatentClaim.is_independent,
+        ranked.c.rank,
+        snippet.label("snippet"),
+    ]
+    statement = (
+        select(*columns)
+        .join(ranked, ranked.c.id == col(PatentClaim.id))
+        .join(Patent, col(Patent.id) == col(PatentClaim.patent_id))
+        .order_by(ranked.c.rank.desc(), col(PatentClaim.id))
+    )
+    hits = (await session.exec(statement)).all()
+
+    return ORJSONResponse({"data": [dict(hit._mapping) for hit in hits]})
 
 
 @router.get("/{patent_id}", response_model=PatentPublic)
-def read_item(session: SessionDep, id: uuid.UUID) -> Any:
+async def read_item(session: AsyncSessionDep, patent_id: uuid.UUID) -> Any:
     """
     Get patent by ID.
     """
-    patent = session.get(Patent, id)
+    patent = await session.get(Patent, patent_id)
     if not patent:
         raise HTTPException(status_code=404, detail="patent not found")
     return patent
+
+
+@router.get("/{patent_id}/claims", response_model=PatentClaimsPublic)
+async def read_claims(
+    session: AsyncSessionDep,
+    patent_id: uuid.UUID,
+    numbers: str | None = Query(
+        default=None, description="Comma separated claim numbers to return"
+    ),
+    independent: bool | None = None,
+    q: str | None = Query(
+        default=None, max_length=255, description="Only claims matching this search"
+    ),
+) -> Any:
+    """
+    Get the claims of a patent in claim number order.
+    """
+    statement = (
+        select(PatentClaim)
+        .where(PatentClaim.patent_id == patent_id)
+        .order_by(col(PatentClaim.number))
+    )
+    if numbers:
+        try:
+            claim_numbers = [
+                int(number) for number in numbers.split(",") if number.strip()
+            ]
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid claim numbers")
+        statement = statement.where(col(PatentClaim.number).in_(claim_numbers))
+    if independent is not None:
+        statement = statement.where(PatentClaim.is_independent == independent)
+    if q:
+        ts_query = func.websearch_to_tsquery(cast(PATENT_SEARCH_CONFIG, REGCONFIG), q)
+        statement = statement.where(claim_search_vector().op("@@")(ts_query))
+    claims = (await session.exec(statement)).all()
+    if not claims:
+        patent_exists = (
+            await session.exec(select(Patent.id).where(col(Patent.id) == patent_id))
+        ).first()
+        if not patent_exists:
+            raise HTTPException(status_code=404, detail="patent not found")
+    return PatentClaimsPublic(data=claims)
+
+
+@router.get("/{patent_id}/similar-products", response_model=ProductSimilarityResults)
+async def read_similar_products(
+    session: AsyncSessionDep,
+    patent_id: uuid.UUID,
+    k: int = Query(default=10, ge=1, le=100),
+) -> Any:
+    """
+    Find the products whose descriptions are closest to a patent's title,
+    abstract and claims in the embedding index.
+    """
+    patent = await session.get(Patent, patent_id)
+    if not patent:
+        raise HTTPException(status_code=404, detail="patent not found")
+    text = patent_embedding_text(
+        title=patent.title, abstract=patent.abstract, claims=patent.claims
+    )
+    matches = await run_in_threadpool(nearest, PRODUCT_INDEX, [text], k)
+    scores = {id: score for id, score, _ in matches}
+
+    products = (
+        await session.exec(
+            select(Product.id, Product.company_id, Company.name, Product.name)
+            .join(Company, col(Company.id) == col(Product.company_id))
+            .where(col(Product.id).in_(scores))
+        )
+    ).all()
+    # Products deleted since the index was last synced drop out here
+    products = sorted(products, key=lambda product: scores[product[0]], reverse=True)
+    hits = [
+        {
+            "id": id,
+            "company_id": company_id,
+            "company_name": company_name,
+            "name": name,
+            "score": scores[id],
+        }
+        for id, company_id, company_name, name in products
+    ]
+    return ORJSONResponse({"data": hits})
@@ -0,0 +1,70 @@
+import uuid
+from typing import Any
+
+from fastapi import APIRouter, Query
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import ColumnElement, literal_column
+from sqlalchemy.dialects.postgresql import REGCONFIG
+from sqlmodel import cast, col, func, select
+
+from app.api.deps import AsyncSessionDep
+from app.api.pagination import CountMode, count_rows_async, paginate_async
+from app.models import PATENT_SEARCH_CONFIG, Product, ProductsPublic
+
+router = APIRouter()
+
+
+def product_search_vector() -> Any:
+    # Spelled out like the ix_product_search index expression, with the
+    # configuration inlined rather than bound, so the index serves it
+    config = literal_column(f"'{PATENT_SEARCH_CONFIG}'::regconfig", REGCONFIG)
+    return func.to_tsvector(config, col(Product.name)).op("||")(
+        func.to_tsvector(config, col(Product.description))
+    )
+
+
+@router.get("/", response_model=ProductsPublic)
+async def read_products(
+    session: AsyncSessionDep,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: str | None = None,
+    count_mode: CountMode = Query(default="exact", alias="count"),
+    company_id: uuid.UUID | None = None,
+    q: str | None = Query(
+        default=None,
+        max_length=255,
+        description="Only products whose name or description match this search",
+    ),
+) -> Any:
+    """
+    Retrieve products, optionally of one company and matching a search.
+
+    ``q`` accepts the same web search syntax as GET /patents/search.
+    """
+    filters: list[ColumnElement[bool]] = []
+    if company_id is not None:
+        filters.append(col(Product.company_id) == company_id)
+    if q:
+        ts_query = func.websearch_to_tsquery(cast(PATENT_SEARCH_CONFIG, REGCONFIG), q)
+        filters.append(product_search_vector().op("@@")(ts_query))
+
+    count = await count_rows_async(session, Product, count_mode, *filters)
+    rows, next_cursor = await paginate_async(
+        session,
+        select(Product.id, Product.company_id, Product.name, Product.description).where(
+            *filters
+        ),
+        id_column=Product.id,
+        cursor=cursor,
+        skip=skip,
+        limit=limit,
+    )
+
+    return ORJSONResponse(
+        {
+            "data": [dict(row._mapping) for row in rows],
+            "count": count,
+            "next_cursor": next_cursor,
+        }
+    )
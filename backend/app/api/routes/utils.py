@@ -2,7 +2,10 @@ from fastapi import APIRouter, Depends
 from pydantic.networks import EmailStr
 
 from app.api.deps import get_current_active_superuser
-from app.models import Message
+from app.core.db import async_engine, engine
+from app.core.openai import parse_stats
+from app.core.pool import pool_status
+from app.models import AnalysisParseStatus, DatabasePoolStatus, Message
 from app.utils import generate_test_email, send_email
 
 router = APIRouter()
@@ -26,6 +29,33 @@ def test_email(email_to: EmailStr) -> Message:
     return Message(message="Test email sent")
 
 
+@router.get(
+    "/db-pool/",
+    dependencies=[Depends(get_current_active_superuser)],
+    response_model=list[DatabasePoolStatus],
+)
+def read_db_pool_status() -> list[DatabasePoolStatus]:
+    """
+    Connection pool usage of the sync and async database engines in this worker.
+    """
+    return [
+        pool_status("sync", engine.pool),
+        pool_status("async", async_engine.sync_engine.pool),
+    ]
+
+
+@router.get(
+    "/analysis-parse/",
+    dependencies=[Depends(get_current_active_superuser)],
+    response_model=list[AnalysisParseStatus],
+)
+def read_analysis_parse_status() -> list[AnalysisParseStatus]:
+    """
+    LLM responses per model in this worker and the rate of parse failures.
+    """
+    return parse_stats.status()
+
+
 @router.get("/health-check/")
 async def health_check() -> bool:
     return True
@@ -0,0 +1,136 @@
+import asyncio
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Iterable, Sequence
+from typing import Any, Generic, TypeVar
+
+from app.core.config import settings
+from app.models import Company, InfringementAnalysisPublic, Patent
+
+V = TypeVar("V")
+
+
+class TTLCache(Generic[V]):
+    """
+    Thread-safe LRU cache whose entries expire ``ttl`` seconds after being set.
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[str, tuple[float, V]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> V | None:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: V) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SingleFlight(Generic[V]):
+    """
+    Coalesce concurrent calls for the same key: the first caller runs the
+    call, and callers arriving while it is in flight wait for and share its
+    result, or its exception.
+    """
+
+    def __init__(self) -> None:
+        self._calls: dict[str, asyncio.Task[V]] = {}
+
+    async def do(self, key: str, call: Callable[[], Awaitable[V]]) -> tuple[V, bool]:
+        """
+        Return the result of ``call`` for ``key`` and whether it was shared
+        from a call already in flight.
+        """
+        task = self._calls.get(key)
+        shared = task is not None and task.get_loop() is asyncio.get_running_loop()
+        if task is None or not shared:
+
+            async def run() -> V:
+                return await call()
+
+            task = asyncio.create_task(run())
+            self._calls[key] = task
+
+            def forget(done: asyncio.Task[V]) -> None:
+                if self._calls.get(key) is done:
+                    del self._calls[key]
+
+            task.add_done_callback(forget)
+        # A caller going away must not cancel the call the others wait for
+        return await asyncio.shield(task), shared
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+
+def analysis_cache_key(
+    *,
+    patent: Patent,
+    company: Company,
+    model: str,
+    prompt_version: str,
+    claim_numbers: Iterable[int] | None = None,
+    products: Sequence[dict[str, Any]] | None = None,
+) -> str:
+    """
+    Hash everything that goes into an analysis prompt, so editing the patent or
+    the company's products (or changing model/prompt) yields a different key.
+
+    The products hashed are the ones the prompt is built from: ``products``
+    when only those are analyzed (as loaded from the Product table), otherwise
+    Company.products. Analyses of selected ``claim_numbers`` or ``products``
+    are keyed apart from full analyses.
+    """
+    payload: dict[str, Any] = {
+        "patent": {
+            "publication_number": patent.publication_number,
+            "title": patent.title,
+            "abstract": patent.abstract,
+            "claims": patent.claims,
+        },
+        "company": {
+            "name": company.name,
+            "products": company.products if products is None else None,
+        },
+        "model": model,
+        "prompt_version": prompt_version,
+    }
+    if claim_numbers is not None:
+        payload["claim_numbers"] = sorted(set(claim_numbers))
+    if products is not None:
+        payload["products"] = sorted(products, key=lambda product: product["name"])
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+analysis_cache: TTLCache[InfringementAnalysisPublic] = TTLCache(
+    maxsize=settings.ANALYSIS_CACHE_MAX_SIZE,
+    ttl=settings.ANALYSIS_CACHE_TTL_SECONDS,
+)
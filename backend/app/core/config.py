@@ -68,6 +68,20 @@ class Settings(BaseSettings):
             path=self.POSTGRES_DB,
         )
 
+    # Connection pool of each engine (sync and async) in every worker process,
+    # see "Workers and database connections" in backend/README.md; with
+    # INFRINGEMENT_ADVISORY_LOCK each analysis in flight keeps one more async one
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    # Seconds to wait for a pooled connection before failing the request
+    DB_POOL_TIMEOUT: float = 10.0
+    # Test connections on checkout, so restarted databases don't fail requests
+    DB_POOL_PRE_PING: bool = True
+    # Replace connections older than this many seconds, -1 never does
+    DB_POOL_RECYCLE: int = 30 * 60
+    # Server-side statement timeout in milliseconds, 0 disables it
+    DB_STATEMENT_TIMEOUT_MS: int = 30_000
+
     SMTP_TLS: bool = True
     SMTP_SSL: bool = False
     SMTP_PORT: int = 587
@@ -100,6 +114,69 @@ class Settings(BaseSettings):
     OPENAI_API_KEY: str
     OPENAI_BASE_URL: AnyUrl | None = None
     OPENAI_DEFAULT_HEADER_X_FOO: bool = False
+    OPENAI_MODEL: str = "gpt-3.5-turbo-16k"
+    # Connection pool of the shared AsyncOpenAI client, see app.core.openai
+    OPENAI_MAX_CONNECTIONS: int = 200
+    OPENAI_MAX_KEEPALIVE_CONNECTIONS: int = 50
+    # Seconds an idle connection is kept open for reuse
+    OPENAI_KEEPALIVE_EXPIRY_SECONDS: float = 60.0
+    # Seconds to wait for a connection, and for each read or write of a call
+    OPENAI_CONNECT_TIMEOUT_SECONDS: float = 10.0
+    OPENAI_TIMEOUT_SECONDS: float = 120.0
+    # Output format requested from the LLM: "json_schema" for structured outputs
+    # validated against the analysis schema, "json_object" for JSON mode, or
+    # "text" for models supporting neither. Unset, the best format OPENAI_MODEL
+    # supports is used, see app.core.openai.supported_response_format
+    OPENAI_RESPONSE_FORMAT: Literal["json_schema", "json_object", "text"] | None = None
+    # Extra LLM calls allowed to correct a response that fails to parse
+    OPENAI_PARSE_RETRIES: int = 1
+    # Limits shared by all OpenAI calls of each worker process (divide the
+    # account's quota by the number of processes), 0 disables a limit
+    OPENAI_REQUESTS_PER_MINUTE: int = 500
+    OPENAI_TOKENS_PER_MINUTE: int = 200_000
+    # Retries of rate-limited and failed OpenAI calls, waiting Retry-After when
+    # sent and jittered exponential backoff from the base delay otherwise
+    OPENAI_MAX_RETRIES: int = 5
+    OPENAI_RETRY_BASE_SECONDS: float = 1.0
+    OPENAI_RETRY_MAX_SECONDS: float = 60.0
+    # Upper bound on analysis prompt size, dependent claims are cut to fit
+    ANALYSIS_PROMPT_TOKEN_BUDGET: int = 8000
+    # Only the K products scoring highest against the patent claims (BM25) are
+    # sent to the LLM, 0 sends every product
+    ANALYSIS_PREFILTER_TOP_K: int = 10
+
+    # Patent and product embeddings for similarity search, see app.core.embeddings.
+    # The index files live in EMBEDDING_INDEX_DIR, relative to the working directory
+    EMBEDDING_MODEL: str = "hashing"
+    EMBEDDING_DIMENSION: int = 512
+    EMBEDDING_INDEX_DIR: str = ".embeddings"
+
+    # In-process cache of infringement analyses, keyed on the analyzed content
+    ANALYSIS_CACHE_MAX_SIZE: int = 1024
+    ANALYSIS_CACHE_TTL_SECONDS: int = 60 * 60
+
+    # Background infringement jobs, see app.core.jobs. Set the concurrency to 0
+    # to run the workers in a separate process (python -m app.worker) instead
+    INFRINGEMENT_WORKER_CONCURRENCY: int = 4
+    INFRINGEMENT_JOB_POLL_INTERVAL_SECONDS: float = 1.0
+    # Running jobs send a heartbeat this often, and are taken over by another
+    # worker once they have missed them for INFRINGEMENT_JOB_TIMEOUT_SECONDS
+    INFRINGEMENT_JOB_HEARTBEAT_SECONDS: float = 30.0
+    INFRINGEMENT_JOB_TIMEOUT_SECONDS: int = 3 * 60
+    # Jobs whose worker died this many times are failed instead of retried
+    INFRINGEMENT_JOB_MAX_ATTEMPTS: int = 3
+
+    # Identical analyses requested concurrently in one process share a single
+    # LLM call. With the advisory lock, so do those of different processes;
+    # every analysis in flight then holds an extra async pool connection for
+    # the lock, for the whole LLM call or while waiting for another process's
+    # analysis, at most this many seconds
+    INFRINGEMENT_ADVISORY_LOCK: bool = False
+    INFRINGEMENT_ADVISORY_LOCK_TIMEOUT_SECONDS: float = 300.0
+
+    # Batch infringement screening, see POST /infringement/batch
+    INFRINGEMENT_BATCH_CONCURRENCY: int = 8
+    INFRINGEMENT_BATCH_MAX_PAIRS: int = 500
 
     def _check_default_secret(self, var_name: str, value: str | None) -> None:
         if value == "changethis":
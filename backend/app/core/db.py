@@ -1,18 +1,47 @@
 import json
-import uuid
 import os
 import logging
-from datetime import datetime
+from typing import Any
+from sqlalchemy.ext.asyncio import create_async_engine
 from sqlmodel import Session, create_engine, select
 from app import crud
+from app.core import seed
 from app.core.config import settings
-from app.models import User, UserCreate, Patent, Company, InfringementAnalysis
+from app.core.pool import TimedAsyncAdaptedQueuePool, TimedQueuePool
+from app.models import User, UserCreate
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-engine = create_engine(str(settings.SQLALCHEMY_DATABASE_URI))
+
+def engine_options() -> dict[str, Any]:
+    connect_args = {}
+    if settings.DB_STATEMENT_TIMEOUT_MS:
+        connect_args["options"] = (
+            f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"
+        )
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "connect_args": connect_args,
+    }
+
+
+engine = create_engine(
+    str(settings.SQLALCHEMY_DATABASE_URI),
+    poolclass=TimedQueuePool,
+    **engine_options(),
+)
+# psycopg 3 serves both the sync and the async engine from the same URL
+async_engine = create_async_engine(
+    str(settings.SQLALCHEMY_DATABASE_URI),
+    poolclass=TimedAsyncAdaptedQueuePool,
+    **engine_options(),
+)
 
 
 # make sure all SQLModel models are imported (app.models) before initializing DB
@@ -56,160 +85,24 @@ def init_db(session: Session) -> None:
         return
 
     try:
-        # Load and parse the companies data
+        # Stream each file and upsert it in batches, so reruns update the
+        # existing rows instead of failing on the unique keys
         with open(companies_path, "r", encoding="utf-8") as f:
-            companies_data = json.load(f)
-
-            if isinstance(companies_data, dict) and "companies" in companies_data:
-                companies_data = companies_data["companies"]
-
-            if not isinstance(companies_data, list):
-                raise ValueError(
-                    "Expected companies data to be a list of dictionaries."
-                )
-
-            # logger.info("Loaded companies data type: %s", type(companies_data))
-            # logger.info(
-            #     "First item in companies data: %s",
-            #     companies_data[0] if companies_data else "No data found",
-            # )
-
-            for company in companies_data:
-                if not isinstance(company, dict):
-                    raise ValueError("Each company entry should be a dictionary.")
-
-                company_name = company.get("name")
-                if not company_name:
-                    logger.warning(
-                        "Skipping a company entry due to missing 'name' field."
-                    )
-                    continue
-
-                products = company.get("products")
-                if not products:
-                    logger.warning(
-                        "Skipping a company entry due to missing 'products' field."
-                    )
-                    continue
-
-                new_company = Company(
-                    id=uuid.uuid4(),
-                    name=company_name,
-                    products=products,
-                )
-
-                session.add(new_company)
-
-            session.commit()  # Commit after adding all companies
-
-        # Load and parse the patents data
-        with open(patents_path, "r", encoding="utf-8") as f:
-            patents_data = json.load(f)
-
-            if not isinstance(patents_data, list):
-                raise ValueError("Expected patents data to be a list of dictionaries.")
-
-            for patent in patents_data:
-                if not isinstance(patent, dict):
-                    raise ValueError("Each patent entry should be a dictionary.")
-
-                new_patent = Patent(
-                    id=uuid.uuid4(),
-                    publication_number=patent.get("publication_number") or "",
-                    title=patent.get("title") or "",
-                    abstract=patent.get("abstract"),
-                    description=patent.get("description"),
-                    priority_date=patent.get("priority_date"),
-                    application_date=patent.get("application_date"),
-                    grant_date=patent.get("grant_date"),
-                    ai_summary=patent.get("ai_summary"),
-                    raw_source_url=patent.get("raw_source_url"),
-                    assignee=patent.get("assignee"),
-                    inventors=patent.get("inventors"),
-                    jurisdictions=patent.get("jurisdictions"),
-                    classifications=patent.get("classifications"),
-                    application_events=patent.get("application_events"),
-                    citations=patent.get("citations"),
-                    citations_non_patent=patent.get("citations_non_patent"),
-                    image_urls=patent.get("image_urls"),
-                    landscapes=patent.get("landscapes"),
-                    attachment_urls=patent.get("attachment_urls"),
-                    claims=patent.get("claims"),
-                    provenance=patent.get("provenance"),
-                    publish_date=patent.get("publish_date"),
-                )
-
-                if not new_patent.publication_number or not new_patent.title:
-                    logger.warning(
-                        "Skipping a patent entry due to missing required fields. Entry: %s",
-                        {"id": patent.get("id"), "title": patent.get("title")},
-                    )
-                    continue
-
-                session.add(new_patent)
-
-            session.commit()  # Commit after adding all patents
-
-        # Load and parse the infringement analysis data
-        with open(infringement_path, "r", encoding="utf-8") as f:
-            infringement_data = json.load(f)
+            logger.info("Loaded %d companies", seed.load_companies(session, f))
 
-        if not isinstance(infringement_data, list):
-            raise ValueError(
-                "Expected infringement analysis data to be a list of dictionaries."
+        with open(patents_path, "r", encoding="utf-8") as f:
+            stats = seed.ingest_patents(session, f)
+            logger.info(
+                "Loaded %d patents, %d unchanged",
+                stats.inserted + stats.updated,
+                stats.unchanged,
             )
 
-        for analysis in infringement_data:
-            if not isinstance(analysis, dict):
-                raise ValueError(
-                    "Each infringement analysis entry should be a dictionary."
-                )
-
-            company_name = analysis.get("company_name")
-            if not company_name:
-                logger.warning(
-                    "Skipping an infringement analysis entry due to missing 'company_name' field."
-                )
-                continue
-
-            patent_id = analysis.get("patent_id")
-            if not patent_id:
-                logger.warning(
-                    "Skipping an infringement analysis entry due to missing 'patent_id' field."
-                )
-                continue
-
-            try:
-                analysis_date = (
-                    datetime.strptime(analysis["analysis_date"], "%Y-%m-%d")
-                    if analysis.get("analysis_date")
-                    else (
-                        datetime.utcnow()
-                        if analysis.get("analysis_date")
-                        else datetime.utcnow()
-                    )
-                )
-
-                new_analysis = InfringementAnalysis(
-                    id=uuid.uuid4(),
-                    company_name=company_name,
-                    patent_id=patent_id,
-                    top_infringing_products=analysis.get("top_infringing_products")
-                    or [],
-                    analysis_date=analysis_date,
-                    overall_risk_assessment=analysis.get("overall_risk_assessment")
-                    or "Not Assessed",
-                    explanation=analysis.get("explanation") or "",
-                )
-
-                session.add(new_analysis)
-            except ValueError as e:
-                logger.error(
-                    "Invalid date format in infringement analysis entry: %s", e
-                )
-                continue
-
-        session.commit()  # Commit after adding all infringement analyses
+        with open(infringement_path, "r", encoding="utf-8") as f:
+            logger.info(
+                "Loaded %d infringement analyses",
+                seed.load_infringement_analyses(session, f),
+            )
 
     except (json.JSONDecodeError, KeyError, ValueError) as e:
         session.rollback()
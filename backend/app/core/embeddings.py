@@ -0,0 +1,416 @@
+import hashlib
+import logging
+import math
+import os
+import threading
+import uuid
+from collections import Counter
+from collections.abc import Callable, Iterable, Sequence
+from functools import lru_cache
+from itertools import pairwise
+from typing import Any, Protocol
+
+import numpy as np
+from numpy.typing import NDArray
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.core.prefilter import tokenize
+from app.core.prompt import parse_claims
+from app.models import Patent, Product
+
+logger = logging.getLogger(__name__)
+
+# Names of the index files in EMBEDDING_INDEX_DIR
+PATENT_INDEX = "patents"
+PRODUCT_INDEX = "products"
+# Rows embedded per batch when (re)building the indexes
+EMBEDDING_BATCH_SIZE = 500
+# Index rows scored per matrix product when ranking pairs, see top_pairs
+TOP_PAIRS_BATCH_ROWS = 8192
+
+
+class Embedder(Protocol):
+    # Identifies the model, indexes built by another model are discarded
+    name: str
+    dimension: int
+
+    def embed(self, texts: Sequence[str]) -> NDArray[np.float32]:
+        """
+        Embed ``texts`` as the rows of a float32 matrix of unit vectors.
+        """
+        ...
+
+
+@lru_cache(maxsize=1 << 16)
+def _hashed_feature(feature: str, dimension: int) -> tuple[int, float]:
+    value = int.from_bytes(
+        hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little"
+    )
+    return value % dimension, 1.0 if value >> 63 else -1.0
+
+
+def normalize(vectors: NDArray[np.float32]) -> NDArray[np.float32]:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    normalized: NDArray[np.float32] = vectors / np.where(norms == 0, 1, norms)
+    return normalized
+
+
+class HashingEmbedder:
+    """
+    Embed texts by hashing their words and word pairs into a fixed number of
+    dimensions, weighted by log term frequency.
+
+    Needs no model download and gives the same vectors on every run, so it
+    also serves as the embedder of the tests. Texts sharing vocabulary get a
+    high cosine similarity.
+    """
+
+    def __init__(self, dimension: int) -> None:
+        self.dimension = dimension
+        self.name = f"hashing-{dimension}"
+
+    def embed(self, texts: Sequence[str]) -> NDArray[np.float32]:
+        vectors = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        for row, text in enumerate(texts):
+            tokens = tokenize(text)
+            features = Counter(tokens)
+            features.update(f"{a} {b}" for a, b in pairwise(tokens))
+            for feature, count in features.items():
+                column, sign = _hashed_feature(feature, self.dimension)
+                vectors[row, column] += sign * (1 + math.log(count))
+        return normalize(vectors)
+
+
+# Embedders selectable through EMBEDDING_MODEL, register local models here
+EMBEDDERS: dict[str, Callable[[], Embedder]] = {
+    "hashing": lambda: HashingEmbedder(settings.EMBEDDING_DIMENSION),
+}
+
+
+@lru_cache
+def get_embedder() -> Embedder:
+    try:
+        return EMBEDDERS[settings.EMBEDDING_MODEL]()
+    except KeyError:
+        raise ValueError(
+            f"Unknown embedding model {settings.EMBEDDING_MODEL!r}"
+        ) from None
+
+
+def patent_embedding_text(*, title: str, abstract: str | None, claims: Any) -> str:
+    # Dependent claims mostly repeat the vocabulary of the claims they narrow
+    # and add detail that drowns out the invention in the embedding
+    claims_text = " ".join(
+        claim.text for claim in parse_claims(claims) if claim.is_independent
+    )
+    return f"{title} {abstract or ''} {claims_text}"
+
+
+def product_embedding_text(*, name: str, description: str | None) -> str:
+    return f"{name} {description or ''}"
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+class VectorIndex:
+    """
+    Unit vectors keyed by row id, held in memory and saved as one .npz file.
+
+    Upserts replace the vectors of known ids and append new ones, so the index
+    is extended batch by batch during ingestion. Searches are one matrix
+    product over all vectors, milliseconds for a hundred thousand rows.
+    """
+
+    def __init__(self, path: str, embedder: Embedder) -> None:
+        self.path = path
+        self.embedder = embedder
+        self._lock = threading.Lock()
+        self._mtime: float | None = None
+        # Whether there are changes that were not saved yet
+        self._dirty = False
+        self._clear()
+        self._load()
+
+    def _clear(self) -> None:
+        self._ids: list[uuid.UUID] = []
+        self._positions: dict[uuid.UUID, int] = {}
+        self._hashes: list[str] = []
+        self._vectors: NDArray[np.float32] = np.zeros(
+            (0, self.embedder.dimension), dtype=np.float32
+        )
+
+    def _load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        mtime = os.path.getmtime(self.path)
+        with np.load(self.path) as data:
+            if str(data["embedder"]) != self.embedder.name:
+                logger.warning(
+                    "Ignoring %s, built with %s instead of %s",
+                    self.path,
+                    data["embedder"],
+                    self.embedder.name,
+                )
+                self._clear()
+                return
+            self._ids = [uuid.UUID(id) for id in data["ids"]]
+            self._hashes = [str(content_hash) for content_hash in data["hashes"]]
+            self._vectors = data["vectors"]
+        self._positions = {id: position for position, id in enumerate(self._ids)}
+        self._mtime = mtime
+        self._dirty = False
+
+    def refresh(self) -> None:
+        """
+        Reload the index if another process saved a newer version, unless
+        this one has unsaved changes.
+        """
+        with self._lock:
+            if (
+                not self._dirty
+                and os.path.exists(self.path)
+                and os.path.getmtime(self.path) != self._mtime
+            ):
+                self._load()
+
+    def save(self) -> None:
+        with self._lock:
+            if not self._dirty:
+                return
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            # Written next to the index and renamed over it, so readers never
+            # see a partial file
+            temporary_path = f"{self.path}.{os.getpid()}.tmp.npz"
+            np.savez(
+                temporary_path,
+                embedder=np.array(self.embedder.name),
+                ids=np.array([str(id) for id in self._ids], dtype="<U36"),
+                hashes=np.array(self._hashes, dtype="<U16"),
+                vectors=self._vectors,
+            )
+            os.replace(temporary_path, self.path)
+            self._mtime = os.path.getmtime(self.path)
+            self._dirty = False
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, id: uuid.UUID) -> bool:
+        return id in self._positions
+
+    def ids(self) -> list[uuid.UUID]:
+        return list(self._ids)
+
+    def content_hash(self, id: uuid.UUID) -> str | None:
+        position = self._positions.get(id)
+        return None if position is None else self._hashes[position]
+
+    def upsert(
+        self,
+        ids: Sequence[uuid.UUID],
+        vectors: NDArray[np.float32],
+        hashes: Sequence[str],
+    ) -> None:
+        with self._lock:
+            self._dirty = True
+            new_ids: list[uuid.UUID] = []
+            new_rows: list[int] = []
+            new_hashes: list[str] = []
+            for row, (id, content_hash) in enumerate(zip(ids, hashes, strict=True)):
+                position = self._positions.get(id)
+                if position is None:
+                    self._positions[id] = len(self._ids) + len(new_ids)
+                    new_ids.append(id)
+                    new_rows.append(row)
+                    new_hashes.append(content_hash)
+                else:
+                    self._vectors[position] = vectors[row]
+                    self._hashes[position] = content_hash
+            if new_ids:
+                self._ids.extend(new_ids)
+                self._hashes.extend(new_hashes)
+                self._vectors = np.vstack(
+                    [self._vectors, vectors[new_rows].astype(np.float32)]
+                )
+
+    def remove(self, ids: Iterable[uuid.UUID]) -> int:
+        with self._lock:
+            removed = {id for id in ids if id in self._positions}
+            if removed:
+                self._dirty = True
+                keep = [i for i, id in enumerate(self._ids) if id not in removed]
+                self._ids = [self._ids[i] for i in keep]
+                self._hashes = [self._hashes[i] for i in keep]
+                self._vectors = self._vectors[keep]
+                self._positions = {id: i for i, id in enumerate(self._ids)}
+            return len(removed)
+
+    def vectors(self, ids: Sequence[uuid.UUID]) -> dict[uuid.UUID, NDArray[np.float32]]:
+        with self._lock:
+            return {
+                id: self._vectors[self._positions[id]]
+                for id in ids
+                if id in self._positions
+            }
+
+    def search(
+        self, queries: NDArray[np.float32], k: int
+    ) -> list[tuple[uuid.UUID, float, int]]:
+        """
+        Find the ``k`` rows closest to any of the ``queries`` unit vectors.
+
+        Returns (id, cosine similarity, index of the closest query) tuples,
+        most similar first.
+        """
+        with self._lock:
+            ids, vectors = self._ids, self._vectors
+        if not ids or k <= 0 or len(queries) == 0:
+            return []
+        # (rows x queries) similarities, then the best query of every row
+        similarities = vectors @ np.atleast_2d(queries).T
+        best_queries = similarities.argmax(axis=1)
+        scores = similarities[np.arange(len(ids)), best_queries]
+        k = min(k, len(ids))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(ids[i], float(scores[i]), int(best_queries[i])) for i in top]
+
+    def top_pairs(
+        self,
+        queries: NDArray[np.float32],
+        n: int,
+        *,
+        min_score: float = -1.0,
+        batch_size: int = TOP_PAIRS_BATCH_ROWS,
+    ) -> list[tuple[uuid.UUID, int, float]]:
+        """
+        Find the ``n`` most similar (row, query) pairs above ``min_score``
+        among all rows and ``queries``.
+
+        Rows are scored ``batch_size`` at a time against every query, so
+        memory stays at one batch x queries block however large the index is,
+        and only the best ``n`` pairs are carried from batch to batch.
+        Returns (id, query index, cosine similarity) tuples, most similar first.
+        """
+        with self._lock:
+            ids, vectors = self._ids, self._vectors
+        queries = np.atleast_2d(queries)
+        if not ids or n <= 0 or len(queries) == 0:
+            return []
+        query_count = len(queries)
+        # Scores and flat row * query_count + query positions of the best pairs
+        best_scores: NDArray[np.float32] = np.empty(0, dtype=np.float32)
+        best_pairs: NDArray[np.int64] = np.empty(0, dtype=np.int64)
+        for start in range(0, len(ids), batch_size):
+            block = (vectors[start : start + batch_size] @ queries.T).ravel()
+            keep = min(n, block.size)
+            top = np.argpartition(-block, keep - 1)[:keep]
+            scores = np.concatenate([best_scores, block[top]])
+            pairs = np.concatenate([best_pairs, top + start * query_count])
+            if len(scores) > n:
+                top = np.argpartition(-scores, n - 1)[:n]
+                scores, pairs = scores[top], pairs[top]
+            best_scores, best_pairs = scores, pairs
+        order = np.argsort(-best_scores, kind="stable")
+        return [
+            (ids[pair // query_count], int(pair % query_count), float(score))
+            for pair, score in zip(best_pairs[order], best_scores[order], strict=True)
+            if score > min_score
+        ]
+
+
+_indexes: dict[str, VectorIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_index(name: str) -> VectorIndex:
+    """
+    Return the process-wide index ``name``, loading it on first use and
+    reloading it when another process (ingestion, another worker) saved it.
+    """
+    with _indexes_lock:
+        index = _indexes.get(name)
+        if index is None:
+            path = os.path.join(settings.EMBEDDING_INDEX_DIR, f"{name}.npz")
+            index = _indexes[name] = VectorIndex(path, get_embedder())
+            return index
+    index.refresh()
+    return index
+
+
+def update_index(index: VectorIndex, items: Iterable[tuple[uuid.UUID, str]]) -> int:
+    """
+    Embed the (id, text) items whose text changed since they were indexed.
+    Returns the number of embedded items.
+    """
+    pending = [
+        (id, text, content_hash)
+        for id, text in items
+        if index.content_hash(id) != (content_hash := text_hash(text))
+    ]
+    if pending:
+        ids, texts, hashes = zip(*pending, strict=True)
+        index.upsert(ids, index.embedder.embed(texts), hashes)
+    return len(pending)
+
+
+def sync_indexes(
+    session: Session, *, batch_size: int = EMBEDDING_BATCH_SIZE
+) -> dict[str, int]:
+    """
+    Bring the patent and product indexes in line with the database: embed
+    rows that are missing or changed and drop the ids of deleted rows.
+
+    Returns the number of embedded rows per index.
+    """
+    embedded = {}
+    sources: list[tuple[str, Any, Callable[[Any], str]]] = [
+        (
+            PATENT_INDEX,
+            select(Patent.id, Patent.title, Patent.abstract, Patent.claims),
+            lambda row: patent_embedding_text(
+                title=row.title, abstract=row.abstract, claims=row.claims
+            ),
+        ),
+        (
+            PRODUCT_INDEX,
+            select(Product.id, Product.name, Product.description),
+            lambda row: product_embedding_text(
+                name=row.name, description=row.description
+            ),
+        ),
+    ]
+    for name, statement, to_text in sources:
+        index = get_index(name)
+        seen: set[uuid.UUID] = set()
+        embedded[name] = 0
+        result = session.exec(statement.execution_options(yield_per=batch_size))
+        for rows in result.partitions():
+            seen.update(row.id for row in rows)
+            embedded[name] += update_index(
+                index, ((row.id, to_text(row)) for row in rows)
+            )
+        removed = index.remove(set(index.ids()) - seen)
+        index.save()
+        logger.info(
+            "%s index: %d rows, %d embedded, %d removed",
+            name,
+            len(index),
+            embedded[name],
+            removed,
+        )
+    return embedded
+
+
+def nearest(
+    name: str, texts: Sequence[str], k: int
+) -> list[tuple[uuid.UUID, float, int]]:
+    """
+    Embed ``texts`` and find the ``k`` rows of index ``name`` closest to any
+    of them, see VectorIndex.search. Blocking, run it in a worker thread.
+    """
+    index = get_index(name)
+    return index.search(index.embedder.embed(texts), k)
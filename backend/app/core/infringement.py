@@ -0,0 +1,419 @@
+import asyncio
+import logging
+import time
+import uuid
+from collections.abc import AsyncIterator, Mapping, Sequence
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy.exc import DBAPIError
+from sqlmodel import col, func, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.cache import SingleFlight, analysis_cache
+from app.core.config import settings
+from app.core.db import async_engine
+from app.core.openai import PatentInfringementAnalyzer
+from app.core.prompt import Claim
+from app.models import (
+    Company,
+    InfringementAnalysis,
+    InfringementAnalysisPublic,
+    InfringingProductDetail,
+    Patent,
+    PatentClaim,
+    Product,
+)
+
+logger = logging.getLogger(__name__)
+
+# Fresh analyses in flight in this process, by cache key
+in_flight_analyses: SingleFlight[tuple[InfringementAnalysisPublic, bool]] = (
+    SingleFlight()
+)
+
+
+async def get_company_and_patent(
+    *, session: AsyncSession, company_name: str, patent_id: str
+) -> tuple[Company | None, Patent | None]:
+    company = (
+        await session.exec(select(Company).where(Company.name == company_name))
+    ).first()
+    patent = (
+        await session.exec(select(Patent).where(Patent.publication_number == patent_id))
+    ).first()
+    return company, patent
+
+
+async def load_claims(
+    *, session: AsyncSession, patent: Patent, claim_numbers: Sequence[int]
+) -> list[Claim]:
+    """
+    Load the requested claims of a patent, along with the claims they depend
+    on, from the PatentClaim table.
+
+    Dependent claims only make sense with the claims they narrow, so parents
+    are followed up to the independent claim. Unknown numbers are skipped.
+    """
+    loaded: dict[int, PatentClaim] = {}
+    wanted = set(claim_numbers)
+    while wanted:
+        found = (
+            await session.exec(
+                select(PatentClaim)
+                .where(PatentClaim.patent_id == patent.id)
+                .where(col(PatentClaim.number).in_(wanted))
+            )
+        ).all()
+        loaded.update((claim.number, claim) for claim in found)
+        wanted = {
+            claim.parent for claim in found if claim.parent is not None
+        } - loaded.keys()
+    return [
+        Claim(number=claim.number, text=claim.text, parent=claim.parent)
+        for claim in sorted(loaded.values(), key=lambda claim: claim.number)
+    ]
+
+
+async def load_products(
+    *, session: AsyncSession, company: Company, product_names: Sequence[str]
+) -> list[dict[str, Any]]:
+    """
+    Load the named products of a company from the Product table, in the
+    {"name", "description"} form of Company.products. Unknown names are skipped.
+    """
+    products = (
+        await session.exec(
+            select(Product.name, Product.description)
+            .where(Product.company_id == company.id)
+            .where(col(Product.name).in_(product_names))
+            .order_by(Product.name)
+        )
+    ).all()
+    return [
+        {"name": name, "description": description} for name, description in products
+    ]
+
+
+async def find_cached_analysis(
+    *, session: AsyncSession, cache_key: str
+) -> InfringementAnalysisPublic | None:
+    """
+    Look up an earlier successful analysis of the same content, first in the
+    in-process cache and then among persisted analyses.
+    """
+    cached_analysis = analysis_cache.get(cache_key)
+    if cached_analysis is not None:
+        logger.debug("Serving infringement analysis %s from cache", cache_key)
+        return cached_analysis
+
+    persisted_analysis = (
+        await session.exec(
+            select(InfringementAnalysis)
+            .where(InfringementAnalysis.cache_key == cache_key)
+            .where(InfringementAnalysis.is_error == False)  # noqa: E712
+            .order_by(col(InfringementAnalysis.analysis_date).desc())
+        )
+    ).first()
+    if persisted_analysis is None:
+        return None
+    logger.debug("Serving infringement analysis %s from database", cache_key)
+    analysis_public = InfringementAnalysisPublic.model_validate(persisted_analysis)
+    analysis_cache.set(cache_key, analysis_public)
+    return analysis_public
+
+
+async def run_analysis(
+    *,
+    session: AsyncSession,
+    analyzer: PatentInfringementAnalyzer,
+    company: Company,
+    patent: Patent,
+    cache_key: str,
+    claims: list[Claim] | None = None,
+    products: list[dict[str, Any]] | None = None,
+) -> InfringementAnalysisPublic:
+    """
+    Run a fresh analysis and persist it, failures included (flagged with is_error).
+    """
+    # End the read transaction so the pooled connection is not held while the
+    # analysis is in flight
+    await session.commit()
+
+    # Call the OpenAI API to analyze infringement
+    analysis = await analyzer.analyze_infringement(company, patent, claims, products)
+    return await persist_analysis(
+        session=session, analysis=analysis, cache_key=cache_key
+    )
+
+
+async def persist_analysis(
+    *, session: AsyncSession, analysis: InfringementAnalysis, cache_key: str
+) -> InfringementAnalysisPublic:
+    """
+    Persist a fresh analysis and cache it unless it failed.
+    """
+    analysis.cache_key = cache_key
+    session.add(analysis)
+    await session.commit()
+    await session.refresh(analysis)
+
+    analysis_public = InfringementAnalysisPublic.model_validate(analysis)
+    # Failed analyses are not cached so the next check retries the LLM call
+    if not analysis.is_error:
+        analysis_cache.set(cache_key, analysis_public)
+    return analysis_public
+
+
+@asynccontextmanager
+async def advisory_lock(key: str) -> AsyncIterator[bool]:
+    """
+    Hold a Postgres advisory lock on ``key`` for the duration of the block,
+    so only one worker process at a time runs it for the same key.
+
+    The lock belongs to a transaction on its own connection, which is held
+    until the block exits, i.e. for the whole LLM call when it wraps one: a
+    session committing inside the block would release a lock taken on its
+    connection. Yields whether the lock was acquired: after
+    waiting INFRINGEMENT_ADVISORY_LOCK_TIMEOUT_SECONDS the block runs anyway.
+    """
+    timeout_ms = int(settings.INFRINGEMENT_ADVISORY_LOCK_TIMEOUT_SECONDS * 1000)
+    async with async_engine.connect() as connection:
+        async with connection.begin():
+            # Waiting for the lock may take longer than statements normally do
+            await connection.execute(
+                select(func.set_config("statement_timeout", str(timeout_ms), True))
+            )
+            try:
+                await connection.execute(
+                    select(func.pg_advisory_xact_lock(func.hashtextextended(key, 0)))
+                )
+            except DBAPIError as e:
+                logger.warning("Running without the advisory lock on %s: %s", key, e)
+                await connection.rollback()
+                yield False
+                return
+            yield True
+
+
+async def run_coalesced(
+    *,
+    analyzer: PatentInfringementAnalyzer,
+    company: Company,
+    patent: Patent,
+    cache_key: str,
+    claims: list[Claim] | None = None,
+    products: list[dict[str, Any]] | None = None,
+) -> tuple[InfringementAnalysisPublic, bool]:
+    """
+    Run a fresh analysis, unless an identical one is already in flight in
+    this process, whose persisted result is then shared.
+
+    With INFRINGEMENT_ADVISORY_LOCK, identical analyses in flight in other
+    worker processes are waited for too, and their result is read back from
+    the database. Returns the analysis and whether it was shared.
+    """
+
+    async def analyze() -> tuple[InfringementAnalysisPublic, bool]:
+        # On its own session, as the caller that started it may go away while
+        # others still wait for it
+        async with AsyncSession(async_engine, expire_on_commit=False) as session:
+            if not settings.INFRINGEMENT_ADVISORY_LOCK:
+                analysis = await run_analysis(
+                    session=session,
+                    analyzer=analyzer,
+                    company=company,
+                    patent=patent,
+                    cache_key=cache_key,
+                    claims=claims,
+                    products=products,
+                )
+                return analysis, False
+            async with advisory_lock(cache_key):
+                # Another worker may have finished it while this one waited
+                cached_analysis = await find_cached_analysis(
+                    session=session, cache_key=cache_key
+                )
+                if cached_analysis is not None:
+                    return cached_analysis, True
+                analysis = await run_analysis(
+                    session=session,
+                    analyzer=analyzer,
+                    company=company,
+                    patent=patent,
+                    cache_key=cache_key,
+                    claims=claims,
+                    products=products,
+                )
+                return analysis, False
+
+    (analysis, shared_across_workers), shared = await in_flight_analyses.do(
+        cache_key, analyze
+    )
+    return analysis, shared or shared_across_workers
+
+
+async def analyze_and_persist(
+    *,
+    session: AsyncSession,
+    analyzer: PatentInfringementAnalyzer,
+    company: Company,
+    patent: Patent,
+    claim_numbers: list[int] | None = None,
+    product_names: list[str] | None = None,
+) -> InfringementAnalysisPublic:
+    """
+    Analyze a patent/company pair, reusing an earlier result for the same content.
+
+    With ``claim_numbers`` only those claims (and the claims they depend on)
+    are loaded and sent to the LLM, instead of all claims of the patent. With
+    ``product_names`` only those products are, instead of all of the
+    company's products.
+    """
+    # Selected products are keyed on their content, so they are loaded first
+    products = (
+        await load_products(
+            session=session, company=company, product_names=product_names
+        )
+        if product_names is not None
+        else None
+    )
+    cache_key = analyzer.cache_key(company, patent, claim_numbers, products)
+    cached_analysis = await find_cached_analysis(session=session, cache_key=cache_key)
+    if cached_analysis is not None:
+        return cached_analysis
+    claims = (
+        await load_claims(session=session, patent=patent, claim_numbers=claim_numbers)
+        if claim_numbers is not None
+        else None
+    )
+    # Do not hold the connection while the analysis is in flight
+    await session.commit()
+    analysis, _ = await run_coalesced(
+        analyzer=analyzer,
+        company=company,
+        patent=patent,
+        cache_key=cache_key,
+        claims=claims,
+        products=products,
+    )
+    return analysis
+
+
+async def stream_analysis(
+    *,
+    analyzer: PatentInfringementAnalyzer,
+    company: Company,
+    patent: Patent,
+    claim_numbers: list[int] | None = None,
+    product_names: list[str] | None = None,
+) -> AsyncIterator[InfringingProductDetail | InfringementAnalysisPublic]:
+    """
+    Like ``analyze_and_persist``, but yield every infringing product as soon as
+    the LLM has written it, followed by the persisted analysis.
+
+    Runs on its own session, so it can outlive the request's session when
+    streamed in a response. Cached analyses are replayed at once.
+    """
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        products = (
+            await load_products(
+                session=session, company=company, product_names=product_names
+            )
+            if product_names is not None
+            else None
+        )
+        cache_key = analyzer.cache_key(company, patent, claim_numbers, products)
+        analysis = await find_cached_analysis(session=session, cache_key=cache_key)
+        if analysis is not None:
+            for product in analysis.top_infringing_products:
+                yield product
+            yield analysis
+            return
+        claims = (
+            await load_claims(
+                session=session, patent=patent, claim_numbers=claim_numbers
+            )
+            if claim_numbers is not None
+            else None
+        )
+        # Do not hold the connection while the completion streams
+        await session.commit()
+
+        async for item in analyzer.stream_infringement(
+            company, patent, claims, products
+        ):
+            if isinstance(item, InfringementAnalysis):
+                yield await persist_analysis(
+                    session=session, analysis=item, cache_key=cache_key
+                )
+            else:
+                yield item
+
+
+@dataclass
+class BatchResult:
+    company: Company
+    patent: Patent
+    analysis: InfringementAnalysisPublic
+    cached: bool
+    elapsed_seconds: float
+
+
+async def analyze_batch(
+    *,
+    analyzer: PatentInfringementAnalyzer,
+    companies: Sequence[Company],
+    patents: Sequence[Patent],
+    concurrency: int,
+    products: Mapping[uuid.UUID, list[dict[str, Any]]] | None = None,
+) -> AsyncIterator[BatchResult]:
+    """
+    Analyze every patent against every company, yielding results as they finish.
+
+    At most ``concurrency`` analyses run at once, each on its own session so
+    the pairs do not serialize on a single connection. ``products`` limits the
+    analysis of a patent id to those products instead of all of the company's.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def analyze_pair(company: Company, patent: Patent) -> BatchResult:
+        async with semaphore:
+            started = time.perf_counter()
+            patent_products = products.get(patent.id) if products else None
+            cache_key = analyzer.cache_key(company, patent, products=patent_products)
+            async with AsyncSession(async_engine, expire_on_commit=False) as session:
+                analysis = await find_cached_analysis(
+                    session=session, cache_key=cache_key
+                )
+            cached = analysis is not None
+            if analysis is None:
+                # Identical pairs of concurrent batches share one analysis
+                analysis, cached = await run_coalesced(
+                    analyzer=analyzer,
+                    company=company,
+                    patent=patent,
+                    cache_key=cache_key,
+                    products=patent_products,
+                )
+            return BatchResult(
+                company=company,
+                patent=patent,
+                analysis=analysis,
+                cached=cached,
+                elapsed_seconds=time.perf_counter() - started,
+            )
+
+    tasks = [
+        asyncio.create_task(analyze_pair(company, patent))
+        for patent in patents
+        for company in companies
+    ]
+    try:
+        for next_result in asyncio.as_completed(tasks):
+            yield await next_result
+    finally:
+        # Stop outstanding analyses if the consumer goes away early
+        for task in tasks:
+            task.cancel()
@@ -0,0 +1,198 @@
+import asyncio
+import logging
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import and_, or_
+from sqlmodel import col, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import settings
+from app.core.db import async_engine
+from app.core.infringement import analyze_and_persist, get_company_and_patent
+from app.core.openai import get_analyzer
+from app.models import InfringementJob
+
+logger = logging.getLogger(__name__)
+
+
+async def enqueue_job(
+    *,
+    session: AsyncSession,
+    patent_id: str,
+    company_name: str,
+    claim_numbers: list[int] | None = None,
+    product_names: list[str] | None = None,
+) -> InfringementJob:
+    job = InfringementJob(
+        patent_id=patent_id,
+        company_name=company_name,
+        claim_numbers=claim_numbers,
+        product_names=product_names,
+    )
+    session.add(job)
+    await session.commit()
+    await session.refresh(job)
+    return job
+
+
+async def claim_next_job(*, session: AsyncSession) -> InfringementJob | None:
+    """
+    Atomically take the oldest runnable job off the queue.
+
+    SKIP LOCKED lets any number of workers, in this process or others, poll the
+    same table without blocking on or double-claiming each other's jobs. Jobs
+    left "running" by a worker that stopped sending heartbeats are picked up
+    again, unless they have used up their attempts, in which case they fail.
+    """
+    while True:
+        stale_before = datetime.utcnow() - timedelta(
+            seconds=settings.INFRINGEMENT_JOB_TIMEOUT_SECONDS
+        )
+        statement = (
+            select(InfringementJob)
+            .where(
+                or_(
+                    col(InfringementJob.status) == "pending",
+                    and_(
+                        col(InfringementJob.status) == "running",
+                        col(InfringementJob.heartbeat_at) < stale_before,
+                    ),
+                )
+            )
+            .order_by(col(InfringementJob.created_at))
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        )
+        job = (await session.exec(statement)).first()
+        if job is None:
+            await session.commit()
+            return None
+        now = datetime.utcnow()
+        if job.attempts >= settings.INFRINGEMENT_JOB_MAX_ATTEMPTS:
+            logger.error(
+                "Infringement job %s gave up after %d attempts", job.id, job.attempts
+            )
+            job.status = "failed"
+            job.error = f"Gave up after {job.attempts} attempts"
+            job.finished_at = now
+            session.add(job)
+            await session.commit()
+            continue
+        job.status = "running"
+        job.attempts += 1
+        job.started_at = now
+        job.heartbeat_at = now
+        session.add(job)
+        await session.commit()
+        return job
+
+
+async def heartbeat(job_id: uuid.UUID) -> None:
+    """
+    Mark a running job as alive every INFRINGEMENT_JOB_HEARTBEAT_SECONDS, so
+    other workers don't reclaim it however long the analysis takes.
+    """
+    while True:
+        await asyncio.sleep(settings.INFRINGEMENT_JOB_HEARTBEAT_SECONDS)
+        try:
+            async with AsyncSession(async_engine) as session:
+                job = await session.get(InfringementJob, job_id)
+                if job is None or job.status != "running":
+                    return
+                job.heartbeat_at = datetime.utcnow()
+                session.add(job)
+                await session.commit()
+        except Exception as e:
+            logger.error("Failed to update infringement job %s: %s", job_id, e)
+
+
+async def run_job(job_id: uuid.UUID) -> None:
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        job = await session.get(InfringementJob, job_id)
+        if job is None:
+            return
+        try:
+            company, patent = await get_company_and_patent(
+                session=session,
+                company_name=job.company_name,
+                patent_id=job.patent_id,
+            )
+            if not company or not patent:
+                raise ValueError("Company or patent no longer exists")
+            analysis = await analyze_and_persist(
+                session=session,
+                analyzer=get_analyzer(),
+                company=company,
+                patent=patent,
+                claim_numbers=job.claim_numbers,
+                product_names=job.product_names,
+            )
+            job.analysis_id = analysis.id
+            job.status = "failed" if analysis.is_error else "succeeded"
+        except Exception as e:
+            logger.error("Infringement job %s failed: %s", job_id, e)
+            await session.rollback()
+            job.status = "failed"
+            job.error = str(e)
+        job.finished_at = datetime.utcnow()
+        session.add(job)
+        await session.commit()
+
+
+async def worker(stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        try:
+            async with AsyncSession(async_engine, expire_on_commit=False) as session:
+                job = await claim_next_job(session=session)
+        except Exception as e:
+            logger.error("Failed to claim infringement job: %s", e)
+            job = None
+
+        if job is not None:
+            beat = asyncio.create_task(heartbeat(job.id))
+            try:
+                await run_job(job.id)
+            except Exception:
+                # Left "running", the job is retried once its heartbeat is stale
+                logger.exception("Infringement job %s crashed", job.id)
+            finally:
+                beat.cancel()
+            continue
+
+        # Queue is empty, wait for the next poll unless asked to stop
+        try:
+            await asyncio.wait_for(
+                stop.wait(), timeout=settings.INFRINGEMENT_JOB_POLL_INTERVAL_SECONDS
+            )
+        except asyncio.TimeoutError:
+            pass
+
+
+class JobWorkerPool:
+    """
+    A fixed number of asyncio workers draining the infringement job queue, so
+    analysis throughput is bounded by ``concurrency`` rather than by requests.
+    """
+
+    def __init__(self, concurrency: int) -> None:
+        self.concurrency = concurrency
+        self._stop = asyncio.Event()
+        self._tasks: list[asyncio.Task[None]] = []
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._tasks = [
+            asyncio.create_task(worker(self._stop), name=f"infringement-worker-{i}")
+            for i in range(self.concurrency)
+        ]
+        logger.info("Started %d infringement job workers", self.concurrency)
+
+    async def stop(self) -> None:
+        # Jobs interrupted here stay "running" and are reclaimed once their
+        # heartbeat is stale
+        self._stop.set()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
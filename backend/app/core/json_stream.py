@@ -0,0 +1,81 @@
+import json
+import logging
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+class JsonArrayItemParser:
+    """
+    Incrementally pick the object items of one array out of a JSON object
+    that arrives in chunks, such as a streamed LLM completion.
+
+    ``feed`` returns every item of the array under the top-level ``key`` that
+    the chunk completed, so each item can be used as soon as its closing brace
+    arrives instead of once the whole object has been written. Text around
+    the object (e.g. a markdown code fence) is ignored, and so are items that
+    are not valid JSON, without stopping the items after them.
+    """
+
+    def __init__(self, key: str) -> None:
+        self.key = key
+        self._text = ""
+        # Nesting depth, 1 being inside the top-level object
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        # Start of the string being read at depth 1, and the last such string,
+        # which is the key when a value follows it
+        self._string_start: int | None = None
+        self._last_key: str | None = None
+        self._in_array = False
+        self._item_start: int | None = None
+        self._done = False
+
+    def feed(self, chunk: str) -> list[Any]:
+        items: list[Any] = []
+        if self._done:
+            return items
+        offset = len(self._text)
+        self._text += chunk
+        for position, char in enumerate(chunk, start=offset):
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._string_start is not None:
+                        try:
+                            self._last_key = json.loads(
+                                self._text[self._string_start : position + 1]
+                            )
+                        except ValueError:
+                            self._last_key = None
+            elif char == '"':
+                self._in_string = True
+                self._string_start = position if self._depth == 1 else None
+            elif char in "{[":
+                if char == "[" and self._depth == 1 and self._last_key == self.key:
+                    self._in_array = True
+                elif self._in_array and self._depth == 2 and char == "{":
+                    self._item_start = position
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._in_array and self._depth == 2 and self._item_start is not None:
+                    item_text = self._text[self._item_start : position + 1]
+                    try:
+                        items.append(json.loads(item_text))
+                    except ValueError as e:
+                        logger.warning("Skipping malformed item %s: %s", item_text, e)
+                    self._item_start = None
+                elif self._in_array and self._depth == 1:
+                    # The rest of the object is not needed
+                    self._done = True
+                    self._text = ""
+                    break
+            elif char == "," and self._depth == 1:
+                self._last_key = None
+        return items
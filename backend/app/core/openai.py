@@ -1,180 +1,586 @@
-from pyexpat import model
-from turtle import st
+import asyncio
+import httpx
 import openai
-import json
 import uuid
 import logging
-import re
+import threading
+from functools import partial
+from collections.abc import AsyncGenerator
 from datetime import datetime
+from typing import Any
+from openai.types import CompletionUsage
+from openai.types.chat import ChatCompletion, ChatCompletionMessageParam
+from pydantic import BaseModel, ValidationError
+from app.core.cache import analysis_cache_key
 from app.core.config import settings  # Import your settings
-from app.models import Company, Patent, InfringementAnalysis
+from app.core.json_stream import JsonArrayItemParser
+from app.core.prefilter import prefilter_products
+from app.core.prompt import Claim, build_analysis_prompt, count_tokens
+from app.core.ratelimit import call_with_retries, openai_limiter
+from app.models import (
+    AnalysisParseStatus,
+    Company,
+    Patent,
+    InfringementAnalysis,
+    InfringementAnalysisOutput,
+    InfringingProductDetail,
+)
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
 
+# Overall risk assessment returned when the analysis could not be completed
+ANALYSIS_ERROR_MESSAGE = "An error occurred during the analysis."
+# Overall risk assessment returned when the pre-filter leaves no products
+NO_CANDIDATE_PRODUCTS_MESSAGE = (
+    "No products share relevant terms with the patent claims, infringement risk is low."
+)
 
-class PatentInfringementAnalyzer:
-    def __init__(self):
-        self.api_key = settings.OPENAI_API_KEY
-        openai.api_key = self.api_key
+# Completion tokens reserved with the rate limiter before a call reports its usage
+COMPLETION_TOKENS_ESTIMATE = 1000
+
+# Models accepting strict json_schema structured outputs, by name prefix, and
+# the snapshots of those families that predate them
+STRUCTURED_OUTPUT_MODELS = ("gpt-4o", "gpt-4.1", "gpt-4.5", "gpt-5", "o1", "o3", "o4")
+JSON_MODE_ONLY_MODELS = ("gpt-4o-2024-05-13",)
+NO_RESPONSE_FORMAT_MODELS = ("o1-mini", "o1-preview")
+# Models accepting json_object (JSON mode) only, by name prefix
+JSON_MODE_MODELS = (
+    "gpt-4-turbo",
+    "gpt-4-1106",
+    "gpt-4-0125",
+    "gpt-3.5-turbo-1106",
+    "gpt-3.5-turbo-0125",
+)
+
+
+def supported_response_format(model: str) -> str:
+    """
+    Best output format ``model`` accepts: "json_schema" for structured outputs,
+    "json_object" for JSON mode, or "text" for models supporting neither, such
+    as gpt-3.5-turbo-16k, and models not listed here.
+    """
+    if model.startswith(JSON_MODE_ONLY_MODELS):
+        return "json_object"
+    if model.startswith(NO_RESPONSE_FORMAT_MODELS):
+        return "text"
+    if model.startswith(STRUCTURED_OUTPUT_MODELS):
+        return "json_schema"
+    if model == "gpt-3.5-turbo" or model.startswith(JSON_MODE_MODELS):
+        return "json_object"
+    return "text"
+
+
+def response_format_for(model: str) -> str:
+    """
+    Output format requested from ``model``: OPENAI_RESPONSE_FORMAT when set,
+    the best format the model supports otherwise.
+    """
+    return settings.OPENAI_RESPONSE_FORMAT or supported_response_format(model)
 
-        base_url = str(settings.OPENAI_BASE_URL)
-        if base_url:
-            openai.base_url = base_url
 
+def create_async_client() -> openai.AsyncOpenAI:
+    """
+    Build the AsyncOpenAI client from the settings, with explicit timeouts and
+    connection pool limits.
+
+    Retries are left to app.core.ratelimit, which coordinates them across
+    analyses.
+    """
+    return openai.AsyncOpenAI(
+        api_key=settings.OPENAI_API_KEY,
+        base_url=str(settings.OPENAI_BASE_URL) if settings.OPENAI_BASE_URL else None,
+        max_retries=0,
         # Set default headers if specified in settings
-        openai.default_headers = {
+        default_headers={
             "x-foo": "true" if settings.OPENAI_DEFAULT_HEADER_X_FOO else "false"
-        }
+        },
+        http_client=openai.DefaultAsyncHttpxClient(
+            http2=True,
+            timeout=httpx.Timeout(
+                settings.OPENAI_TIMEOUT_SECONDS,
+                connect=settings.OPENAI_CONNECT_TIMEOUT_SECONDS,
+            ),
+            limits=httpx.Limits(
+                max_connections=settings.OPENAI_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.OPENAI_KEEPALIVE_EXPIRY_SECONDS,
+            ),
+        ),
+    )
 
-    def analyze_infringement(
-        self, company: Company, patent: Patent
-    ) -> InfringementAnalysis:
+
+def strict_json_schema(model: type[BaseModel]) -> dict[str, Any]:
+    """
+    JSON schema of ``model`` in the form strict structured outputs require:
+    every property required and no additional properties.
+    """
+
+    def tighten(node: Any) -> None:
+        if isinstance(node, dict):
+            if node.get("type") == "object" and "properties" in node:
+                node["additionalProperties"] = False
+                node["required"] = list(node["properties"])
+            for value in node.values():
+                tighten(value)
+        elif isinstance(node, list):
+            for value in node:
+                tighten(value)
+
+    schema = model.model_json_schema()
+    tighten(schema)
+    return schema
+
+
+ANALYSIS_OUTPUT_SCHEMA = strict_json_schema(InfringementAnalysisOutput)
+
+
+def parse_response(response_messages: str) -> InfringementAnalysisOutput:
+    """
+    Validate an LLM response against the analysis output schema in one pass.
+
+    Text around the JSON object, which models without structured outputs tend
+    to add, is skipped. Raises ValidationError for malformed responses.
+    """
+    start = response_messages.find("{")
+    if start != -1:
+        response_messages = response_messages[start : response_messages.rfind("}") + 1]
+    return InfringementAnalysisOutput.model_validate_json(response_messages)
+
+
+class AnalysisParseStats:
+    """
+    Running totals of LLM responses per model and how many failed to parse.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        # model -> [responses, parse failures, retries]
+        self._counts: dict[str, list[int]] = {}
+
+    def record(self, model: str, *, failed: bool = False) -> None:
+        with self._lock:
+            counts = self._counts.setdefault(model, [0, 0, 0])
+            counts[0] += 1
+            if failed:
+                counts[1] += 1
+
+    def record_retry(self, model: str) -> None:
+        with self._lock:
+            self._counts.setdefault(model, [0, 0, 0])[2] += 1
+
+    def status(self) -> list[AnalysisParseStatus]:
+        with self._lock:
+            counts = {model: list(values) for model, values in self._counts.items()}
+        return [
+            AnalysisParseStatus(
+                model=model,
+                response_format=response_format_for(model),
+                responses=responses,
+                parse_failures=failures,
+                retries=retries,
+                parse_failure_rate=failures / responses if responses else 0.0,
+            )
+            for model, (responses, failures, retries) in sorted(counts.items())
+        ]
+
+
+# Parse failures of this process, see GET /utils/analysis-parse/
+parse_stats = AnalysisParseStats()
+
+
+class PatentInfringementAnalyzer:
+    # Bump whenever the prompt changes, so cached analyses are not reused
+    PROMPT_VERSION = "3"
+
+    def __init__(self, client: openai.AsyncOpenAI | None = None):
+        self.client = client or create_async_client()
+        self.model = settings.OPENAI_MODEL
+
+    async def close(self) -> None:
+        await self.client.close()
+
+    def cache_key(
+        self,
+        company: Company,
+        patent: Patent,
+        claim_numbers: list[int] | None = None,
+        products: list[dict[str, Any]] | None = None,
+    ) -> str:
+        return analysis_cache_key(
+            patent=patent,
+            company=company,
+            model=self.model,
+            # The token budget and pre-filter cutoff decide which claims and
+            # products make it into the prompt
+            prompt_version=(
+                f"{self.PROMPT_VERSION}:{settings.ANALYSIS_PROMPT_TOKEN_BUDGET}"
+                f":{settings.ANALYSIS_PREFILTER_TOP_K}"
+            ),
+            claim_numbers=claim_numbers,
+            products=products,
+        )
+
+    def _prepare(
+        self,
+        company: Company,
+        patent: Patent,
+        claims: list[Claim] | None,
+        products: list[dict[str, Any]] | None,
+    ) -> tuple[InfringementAnalysis, str | None]:
+        """
+        Start the analysis and build its prompt.
+
+        Returns the analysis to complete from the LLM response along with the
+        prompt, or a finished analysis and no prompt when the pre-filter
+        leaves no products to analyze.
+        """
         # Create a unique analysis ID and current analysis date
         analysis_id = str(uuid.uuid4())
         analysis_date = datetime.now().isoformat()
 
-        # Format the input message for OpenAI
-        input_message = f"""
-            You are an expert in patent analysis. Your task is to analyze the following patent and company product details and provide a response in the JSON format specified below:
-
-            Expected JSON format:
-            {{
-            "analysis_id": "{analysis_id}",
-            "patent_id": "{patent.publication_number}",
-            "company_name": "{company.name}",
-            "analysis_date": "{analysis_date}",
-            "top_infringing_products": [
-                {{
-                    "product_name": "<product_name>",
-                    "infringement_likelihood": "<High/Moderate/Low>",
-                    "relevant_claims": ["<claim_number_1>", "<claim_number_2>"],
-                    "explanation": "<detailed explanation>",
-                    "specific_features": [
-                        "<feature_1>",
-                        "<feature_2>",
-                        "<feature_3>"
-                    ]
-                }}
-                // Repeat for each product if applicable
-            ],
-            "overall_risk_assessment": "<summary_of_overall_risk>"
-            }}
-
-            Details for analysis:
-
-            Patent Information:
-            - Title: "{patent.title}"
-            - Abstract: "{patent.abstract}"
-            - Claims:
-            {json.dumps(patent.claims, indent=4)}
-
-            Company Information:
-            Company "{company.name}" has the following products:
-            {json.dumps(company.products, indent=4)}
-
-            Please analyze and identify which of these products potentially infringe on the patent claims. Include detailed explanations and ensure the response follows the JSON format specified above.
+        if products is None:
+            products = company.products or []
+        candidates = products
+        # Only send the products that share vocabulary with the patent claims
+        products, scores = prefilter_products(
+            candidates, patent, settings.ANALYSIS_PREFILTER_TOP_K, claims
+        )
+        analysis = InfringementAnalysis(
+            id=uuid.UUID(analysis_id),
+            patent_id=patent.publication_number,
+            company_name=company.name,
+            analysis_date=datetime.fromisoformat(analysis_date),
+            top_infringing_products=[],
+            product_scores=[score.model_dump() for score in scores],
+        )
+        if candidates and not products:
+            logger.debug(
+                "No candidate products of %s for %s, skipping the LLM call",
+                company.name,
+                patent.publication_number,
+            )
+            analysis.overall_risk_assessment = NO_CANDIDATE_PRODUCTS_MESSAGE
+            return analysis, None
+
+        # Format the input message for OpenAI, compacting the claims to fit the
+        # configured token budget
+        input_message, prompt_tokens = build_analysis_prompt(
+            company=company,
+            patent=patent,
+            analysis_id=analysis_id,
+            analysis_date=analysis_date,
+            budget=settings.ANALYSIS_PROMPT_TOKEN_BUDGET,
+            model=self.model,
+            products=products,
+            claims=claims,
+        )
+        logger.debug(
+            "Analyzing %s against %s with a %d token prompt",
+            patent.publication_number,
+            company.name,
+            prompt_tokens,
+        )
+        # Replaced by the usage OpenAI reports, when it does
+        analysis.prompt_tokens = prompt_tokens
+        return analysis, input_message
+
+    def _messages(self, input_message: str) -> list[ChatCompletionMessageParam]:
+        return [
+            # {
+            #     "role": "system",
+            #     "content": "You are an expert patent analyst specializing in evaluating and assessing patent infringement scenarios. Your responses must be in a structured JSON format for machine parsing and use.",
+            # },
+            {
+                "role": "system",
+                "content": "You are a professional patent genius with expertise in analyzing and evaluating patent infringement scenarios.",
+            },
+            {
+                "role": "user",
+                "content": input_message,
+            },
+        ]
+
+    def _response_format(self) -> Any:
+        response_format = response_format_for(self.model)
+        if response_format == "json_schema":
+            return {
+                "type": "json_schema",
+                "json_schema": {
+                    "name": "infringement_analysis",
+                    "strict": True,
+                    "schema": ANALYSIS_OUTPUT_SCHEMA,
+                },
+            }
+        if response_format == "json_object":
+            return {"type": "json_object"}
+        return openai.NOT_GIVEN
+
+    def _estimate_tokens(self, messages: list[ChatCompletionMessageParam]) -> int:
         """
+        Tokens to reserve with the rate limiter for a call, until its usage is known.
+        """
+        return (
+            sum(
+                count_tokens(content, self.model)
+                for message in messages
+                if isinstance(content := message.get("content"), str)
+            )
+            + COMPLETION_TOKENS_ESTIMATE
+        )
 
+    def _validate(self, response_messages: str) -> InfringementAnalysisOutput:
+        """
+        Parse a response, counting it and its failure in ``parse_stats``.
+        """
         try:
-            # logger.debug("Calling OpenAI API with input message: %s", input_message)
-            # Call OpenAI API
-            response = openai.chat.completions.create(
-                model="gpt-3.5-turbo-16k",
-                # model="gpt-4o-mini",
-                messages=[
-                    # {
-                    #     "role": "system",
-                    #     "content": "You are an expert patent analyst specializing in evaluating and assessing patent infringement scenarios. Your responses must be in a structured JSON format for machine parsing and use.",
-                    # },
-                    {
-                        "role": "system",
-                        "content": "You are a professional patent genius with expertise in analyzing and evaluating patent infringement scenarios.",
-                    },
-                    {
-                        "role": "user",
-                        "content": input_message,
-                    },
-                ],
+            output = parse_response(response_messages)
+        except ValidationError as e:
+            logger.warning(
+                "Response of %s failed to parse: %s. Response content: %s",
+                self.model,
+                e,
+                response_messages,
             )
+            parse_stats.record(self.model, failed=True)
+            raise
+        parse_stats.record(self.model)
+        return output
 
-            # complete_response = ""
-            # for chunk in response:
-            #     complete_response += chunk["choices"][0]["delta"].get("content", "")
-            # logger.debug("Complete response from OpenAI: %s", complete_response)
+    def _correction(
+        self,
+        messages: list[ChatCompletionMessageParam],
+        response_messages: str,
+        error: ValidationError,
+    ) -> list[ChatCompletionMessageParam]:
+        """
+        Messages asking the LLM to fix a response that failed to parse.
+        """
+        parse_stats.record_retry(self.model)
+        return [
+            *messages,
+            {"role": "assistant", "content": response_messages},
+            {
+                "role": "user",
+                "content": "Your response is not valid for the requested JSON "
+                f"format:\n{error}\nRespond again with the corrected JSON only.",
+            },
+        ]
+
+    async def _create(
+        self, messages: list[ChatCompletionMessageParam]
+    ) -> ChatCompletion:
+        return await self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            response_format=self._response_format(),
+        )
+
+    async def _complete(
+        self,
+        messages: list[ChatCompletionMessageParam],
+        usages: list[CompletionUsage],
+        retries: int,
+    ) -> InfringementAnalysisOutput:
+        """
+        Request the analysis, repeating the call up to ``retries`` times only
+        while the response fails to parse. Token usage is added to ``usages``.
+        """
+        while True:
+            reserved = self._estimate_tokens(messages)
+            response = await call_with_retries(
+                partial(self._create, messages), tokens=reserved
+            )
+            if response.usage:
+                usages.append(response.usage)
+                openai_limiter.settle(reserved, response.usage.total_tokens)
 
             # Extract the response from OpenAI
-            if response.choices and response.choices[0].message:
-                response_messages = response.choices[0].message.content
-                if isinstance(response_messages, str):
-                    response_messages = response_messages.strip()
-                else:
-                    logger.error(
-                        "Received an unexpected response structure from OpenAI. Response content: %s",
-                        response_messages,
-                    )
-                    raise ValueError("OpenAI returned an unexpected response format.")
-
-                logger.debug("Response from OpenAI: %s", response_messages)
-
-                # Extract the JSON content from the response by slicing the string twice, not recommended
-                # response_messages = response_messages[response_messages.find("{") :]
-                # response_messages = response_messages[: response_messages.rfind("}") + 1]
-
-                # Optimize
-                response_messages = response_messages[
-                    response_messages.find("{") : response_messages.rfind("}") + 1
-                ]
-
-                # Extract the JSON content using a regular expression
-                match = re.search(r"\{.*\}", response_messages, re.DOTALL)
-                if match:
-                    response_messages = match.group()
-                else:
-                    raise ValueError("No JSON content found in response_messages.")
-
-                try:
-                    # logger.debug("Parsing response as JSON: %s", response_messages)
-                    response_dict = json.loads(response_messages)
-                    # logger.debug("Parsed JSON response: %s", response_dict)
-                except json.JSONDecodeError:
-                    logger.error(
-                        "Failed to parse response as JSON. Response content: %s",
-                        response_messages,
-                    )
-                    raise ValueError("Invalid JSON response from OpenAI.")
-            else:
+            if not response.choices or not response.choices[0].message:
                 logger.error("Received an unexpected response structure from OpenAI.")
                 raise ValueError("OpenAI returned an unexpected response format.")
+            message = response.choices[0].message
+            if getattr(message, "refusal", None):
+                raise ValueError(f"OpenAI refused the analysis: {message.refusal}")
+            if not isinstance(message.content, str):
+                logger.error(
+                    "Received an unexpected response structure from OpenAI. Response content: %s",
+                    message.content,
+                )
+                raise ValueError("OpenAI returned an unexpected response format.")
+            response_messages = message.content.strip()
+            logger.debug("Response from OpenAI: %s", response_messages)
 
-            # Create InfringementAnalysis object
-            analysis_response = InfringementAnalysis(
-                id=uuid.UUID(analysis_id),
-                patent_id=patent.publication_number,
-                company_name=company.name,
-                analysis_date=datetime.fromisoformat(analysis_date),
-                top_infringing_products=response_dict.get(
-                    "top_infringing_products", []
-                ),
-                overall_risk_assessment=response_dict.get(
-                    "overall_risk_assessment", ""
-                ),
+            try:
+                return self._validate(response_messages)
+            except ValidationError as e:
+                if retries <= 0:
+                    raise
+                retries -= 1
+                messages = self._correction(messages, response_messages, e)
+
+    @staticmethod
+    def _finish(
+        analysis: InfringementAnalysis,
+        usages: list[CompletionUsage],
+        output: InfringementAnalysisOutput | None,
+    ) -> InfringementAnalysis:
+        """
+        Complete the analysis from the parsed response, or flag it as failed
+        when there is none. Token usage of all calls is kept either way.
+        """
+        if usages:
+            analysis.prompt_tokens = sum(usage.prompt_tokens for usage in usages)
+            analysis.completion_tokens = sum(
+                usage.completion_tokens for usage in usages
             )
+        if output is None:
+            analysis.top_infringing_products = []
+            analysis.overall_risk_assessment = ANALYSIS_ERROR_MESSAGE
+            analysis.is_error = True
+        else:
+            # Stored as plain JSON
+            analysis.sqlmodel_update(
+                {
+                    "top_infringing_products": [
+                        product.model_dump()
+                        for product in output.top_infringing_products
+                    ],
+                    "overall_risk_assessment": output.overall_risk_assessment,
+                }
+            )
+        return analysis
+
+    async def analyze_infringement(
+        self,
+        company: Company,
+        patent: Patent,
+        claims: list[Claim] | None = None,
+        products: list[dict[str, Any]] | None = None,
+    ) -> InfringementAnalysis:
+        """
+        Analyze ``claims`` of the patent against ``products`` of the company,
+        all claims and all products by default.
+        """
+        analysis, input_message = self._prepare(company, patent, claims, products)
+        if input_message is None:
+            return analysis
+        analysis.llm_called = True
 
-            return analysis_response
+        # Token usage reported by OpenAI, kept even if the response fails to parse
+        usages: list[CompletionUsage] = []
+
+        try:
+            output = await self._complete(
+                self._messages(input_message), usages, settings.OPENAI_PARSE_RETRIES
+            )
+            return self._finish(analysis, usages, output)
 
         except Exception as e:
             logger.error("An unexpected error occurred: %s", e)
             # return default response
-            response_raise = InfringementAnalysis(
-                id=uuid.UUID(analysis_id),
-                patent_id=patent.publication_number,
-                company_name=company.name,
-                analysis_date=datetime.fromisoformat(analysis_date),
-                top_infringing_products=[],
-                overall_risk_assessment="An error occurred during the analysis.",
+            return self._finish(analysis, usages, None)
+
+    async def stream_infringement(
+        self,
+        company: Company,
+        patent: Patent,
+        claims: list[Claim] | None = None,
+        products: list[dict[str, Any]] | None = None,
+    ) -> AsyncGenerator[InfringingProductDetail | InfringementAnalysis, None]:
+        """
+        Like ``analyze_infringement``, but stream the completion.
+
+        Every infringing product is yielded as soon as the LLM has written it,
+        followed by the complete analysis, which is always the last item. A
+        response that fails to parse is corrected without streaming.
+        """
+        analysis, input_message = self._prepare(company, patent, claims, products)
+        if input_message is None:
+            yield analysis
+            return
+        analysis.llm_called = True
+
+        usages: list[CompletionUsage] = []
+        messages = self._messages(input_message)
+        content: list[str] = []
+        refusal: list[str] = []
+        parser = JsonArrayItemParser("top_infringing_products")
+        output = None
+        try:
+            reserved = self._estimate_tokens(messages)
+            stream = await call_with_retries(
+                lambda: self.client.chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    response_format=self._response_format(),
+                    stream=True,
+                    # The last chunk then reports the token usage
+                    stream_options={"include_usage": True},
+                ),
+                tokens=reserved,
             )
-            return response_raise
+            async for chunk in stream:
+                if chunk.usage:
+                    usages.append(chunk.usage)
+                    openai_limiter.settle(reserved, chunk.usage.total_tokens)
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta
+                if delta.refusal:
+                    refusal.append(delta.refusal)
+                if not delta.content:
+                    continue
+                content.append(delta.content)
+                for item in parser.feed(delta.content):
+                    try:
+                        yield InfringingProductDetail.model_validate(item)
+                    except ValidationError:
+                        logger.warning("Skipping malformed infringing product %s", item)
+            if refusal:
+                raise ValueError(f"OpenAI refused the analysis: {''.join(refusal)}")
+            response_messages = "".join(content).strip()
+            logger.debug("Response from OpenAI: %s", response_messages)
+            try:
+                output = self._validate(response_messages)
+            except ValidationError as e:
+                if settings.OPENAI_PARSE_RETRIES <= 0:
+                    raise
+                output = await self._complete(
+                    self._correction(messages, response_messages, e),
+                    usages,
+                    settings.OPENAI_PARSE_RETRIES - 1,
+                )
+        except Exception as e:
+            logger.error("An unexpected error occurred: %s", e)
+        yield self._finish(analysis, usages, output)
+
+
+_analyzer: PatentInfringementAnalyzer | None = None
+
+
+def get_analyzer() -> PatentInfringementAnalyzer:
+    """
+    Return the process-wide analyzer, creating it on first use.
+
+    Sharing one analyzer, and so one client, keeps its HTTP connection pool
+    (and HTTP/2 connections) alive across analyses instead of reconnecting
+    for every request. The API creates it at startup, see app.main.
+    """
+    global _analyzer
+    if _analyzer is None:
+        _analyzer = PatentInfringementAnalyzer()
+    return _analyzer
+
+
+async def close_analyzer() -> None:
+    """
+    Close the connections of the process-wide analyzer, if it was created.
+    """
+    global _analyzer
+    if _analyzer is not None:
+        analyzer, _analyzer = _analyzer, None
+        await analyzer.close()
 
 
 # Example usage (for testing purposes):
@@ -212,7 +618,9 @@ if __name__ == "__main__":
         ],
     }
 
-    result = analyzer.analyze_infringement(
-        company=Company(**company_info), patent=Patent(**patent_info)
+    result = asyncio.run(
+        analyzer.analyze_infringement(
+            company=Company(**company_info), patent=Patent(**patent_info)
+        )
     )
     print(result)
@@ -0,0 +1,77 @@
+import threading
+import time
+from typing import Any
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.models import DatabasePoolStatus
+
+
+class PoolWaitStats:
+    """
+    Running totals of how long checkouts waited for a pooled connection.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def record(self, wait_seconds: float, *, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_seconds_total += wait_seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, wait_seconds)
+
+
+class _TimedPoolMixin:
+    wait_stats: PoolWaitStats
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.wait_stats = PoolWaitStats()
+
+    def _do_get(self) -> Any:
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()  # type: ignore[misc]
+        except exc.TimeoutError:
+            self.wait_stats.record(time.perf_counter() - started, timed_out=True)
+            raise
+        self.wait_stats.record(time.perf_counter() - started)
+        return connection
+
+
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+    """
+    QueuePool that records how long each checkout waited for a connection.
+    """
+
+
+class TimedAsyncAdaptedQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+    """
+    AsyncAdaptedQueuePool that records how long each checkout waited for a
+    connection.
+    """
+
+
+def pool_status(name: str, pool: Any) -> DatabasePoolStatus:
+    wait_stats: PoolWaitStats | None = getattr(pool, "wait_stats", None)
+    return DatabasePoolStatus(
+        name=name,
+        size=pool.size(),
+        checked_in=pool.checkedin(),
+        checked_out=pool.checkedout(),
+        # Negative until the pool has opened pool_size connections
+        overflow=max(pool.overflow(), 0),
+        checkouts=wait_stats.checkouts if wait_stats else 0,
+        timeouts=wait_stats.timeouts if wait_stats else 0,
+        wait_seconds_total=wait_stats.wait_seconds_total if wait_stats else 0.0,
+        wait_seconds_max=wait_stats.wait_seconds_max if wait_stats else 0.0,
+    )
@@ -0,0 +1,97 @@
+import math
+import re
+from collections import Counter
+from collections.abc import Iterable
+from typing import Any
+
+from app.core.prompt import Claim, parse_claims
+from app.models import Patent, ProductScore
+
+# BM25 term frequency saturation and document length normalization
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset(
+    """
+    a an and any are as at be by claim claims comprising each for from has have in
+    is it its of on one or said such that the their this to which wherein with
+    """.split()
+)
+
+
+def tokenize(text: str) -> list[str]:
+    return [
+        token
+        for token in TOKEN_PATTERN.findall(text.lower())
+        if token not in STOPWORDS and len(token) > 1
+    ]
+
+
+def bm25_scores(query: Iterable[str], documents: list[list[str]]) -> list[float]:
+    """
+    Okapi BM25 score of every tokenized document for the query terms.
+    """
+    if not documents:
+        return []
+    average_length = sum(len(document) for document in documents) / len(documents)
+    document_frequency: Counter[str] = Counter()
+    for document in documents:
+        document_frequency.update(set(document))
+
+    terms = set(query)
+    scores = []
+    for document in documents:
+        frequencies = Counter(document)
+        length_norm = 1 - BM25_B + BM25_B * len(document) / (average_length or 1)
+        score = 0.0
+        for term in terms & frequencies.keys():
+            n = document_frequency[term]
+            idf = math.log(1 + (len(documents) - n + 0.5) / (n + 0.5))
+            tf = frequencies[term]
+            score += idf * tf * (BM25_K1 + 1) / (tf + BM25_K1 * length_norm)
+        scores.append(score)
+    return scores
+
+
+def patent_query_text(patent: Patent, claims: list[Claim] | None = None) -> str:
+    if claims is None:
+        claims = parse_claims(patent.claims)
+    claims_text = " ".join(claim.text for claim in claims)
+    return f"{patent.title} {patent.abstract or ''} {claims_text}"
+
+
+def prefilter_products(
+    products: list[dict[str, Any]],
+    patent: Patent,
+    top_k: int,
+    claims: list[Claim] | None = None,
+) -> tuple[list[dict[str, Any]], list[ProductScore]]:
+    """
+    Rank products by BM25 similarity of their name and description to the
+    patent, and keep the ``top_k`` products sharing any vocabulary with it.
+
+    Returns the selected products and the score of every product. A ``top_k``
+    of 0 disables the filter and selects every product. ``claims`` defaults to
+    all claims of the patent.
+    """
+    documents = [
+        tokenize(f"{product.get('name', '')} {product.get('description', '')}")
+        for product in products
+    ]
+    scores = bm25_scores(tokenize(patent_query_text(patent, claims)), documents)
+
+    ranked = sorted(range(len(products)), key=lambda i: scores[i], reverse=True)
+    if top_k > 0:
+        selected = {i for i in ranked[:top_k] if scores[i] > 0}
+    else:
+        selected = set(ranked)
+
+    return [products[i] for i in sorted(selected)], [
+        ProductScore(
+            product_name=str(products[i].get("name", "")),
+            score=round(scores[i], 4),
+            selected=i in selected,
+        )
+        for i in ranked
+    ]
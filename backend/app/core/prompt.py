@@ -0,0 +1,228 @@
+import json
+import logging
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any
+
+from app.models import Company, Patent
+
+logger = logging.getLogger(__name__)
+
+# Matches the "<number>. " prefix patent claims are numbered with
+CLAIM_NUMBER_PATTERN = re.compile(r"^\s*(\d+)\s*\.\s*")
+# Matches the reference a dependent claim makes to the claim it narrows
+CLAIM_REFERENCE_PATTERN = re.compile(r"\bclaims?\s+(\d+)", re.IGNORECASE)
+# Dependent claims name their parent claim in the preamble
+CLAIM_PREAMBLE_LENGTH = 200
+# Dependent claims are truncated rather than dropped if at least this many
+# tokens of budget are left
+MIN_TRUNCATED_CLAIM_TOKENS = 32
+
+
+@dataclass
+class Claim:
+    number: int
+    text: str
+    # Number of the claim this claim depends on, None for independent claims
+    parent: int | None = None
+
+    @property
+    def is_independent(self) -> bool:
+        return self.parent is None
+
+
+@lru_cache
+def _get_encoding(model: str) -> Any:
+    try:
+        import tiktoken
+
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        # tiktoken downloads its encodings on first use, which fails offline
+        logger.warning("Falling back to approximate token counts: %s", e)
+        return None
+
+
+def count_tokens(text: str, model: str) -> int:
+    encoding = _get_encoding(model)
+    if encoding is None:
+        # Roughly four characters per token for English text
+        return (len(text) + 3) // 4
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_to_tokens(text: str, max_tokens: int, model: str) -> str:
+    encoding = _get_encoding(model)
+    if encoding is None:
+        return text[: max_tokens * 4]
+    return str(
+        encoding.decode(encoding.encode(text, disallowed_special=())[:max_tokens])
+    )
+
+
+def _parse_claim(number: int, text: str) -> Claim:
+    text = CLAIM_NUMBER_PATTERN.sub("", text.strip(), count=1)
+    parent = None
+    match = CLAIM_REFERENCE_PATTERN.search(text[:CLAIM_PREAMBLE_LENGTH])
+    if match and int(match.group(1)) < number:
+        parent = int(match.group(1))
+    return Claim(number=number, text=text, parent=parent)
+
+
+def parse_claims(claims: Any) -> list[Claim]:
+    """
+    Parse claims stored as a list of {"num", "text"} dicts, the JSON encoding of
+    such a list, or plain numbered text into independent/dependent claims.
+    """
+    if not claims:
+        return []
+    if isinstance(claims, str):
+        try:
+            claims = json.loads(claims)
+        except json.JSONDecodeError:
+            # Plain text, split it on the claim numbers
+            parts = re.split(r"(?m)^\s*(?=\d+\s*\.\s)", claims)
+            return [
+                _parse_claim(int(match.group(1)), part)
+                for part in parts
+                if (match := CLAIM_NUMBER_PATTERN.match(part))
+            ]
+
+    parsed = []
+    for index, claim in enumerate(claims, start=1):
+        if isinstance(claim, dict):
+            text = str(claim.get("text") or "")
+            try:
+                number = int(claim.get("num") or index)
+            except ValueError:
+                number = index
+        else:
+            text, number = str(claim), index
+        if text.strip():
+            parsed.append(_parse_claim(number, text))
+    return parsed
+
+
+def compact_claims(
+    claims: list[Claim], *, budget: int, model: str
+) -> tuple[list[dict[str, Any]], list[int]]:
+    """
+    Fit claims into a token budget.
+
+    Independent claims are always kept in full. Dependent claims follow in
+    order while they fit, the first one that doesn't is truncated to the
+    remaining budget (or omitted when too little is left), and the rest are
+    omitted, so no dependent claim is sent without the claims before it.
+    Returns the compact claims and the numbers of the omitted claims.
+    """
+    kept: dict[int, dict[str, Any]] = {}
+    used = 0
+    for claim in claims:
+        if claim.is_independent:
+            kept[claim.number] = {"n": claim.number, "text": claim.text}
+            used += count_tokens(to_compact_json(kept[claim.number]), model)
+
+    omitted: list[int] = []
+    for claim in claims:
+        if claim.is_independent:
+            continue
+        if omitted:
+            omitted.append(claim.number)
+            continue
+        entry = {"n": claim.number, "dep": claim.parent, "text": claim.text}
+        remaining = budget - used
+        cost = count_tokens(to_compact_json(entry), model)
+        if cost > remaining:
+            # Keep what fits of the claim text next to the entry's JSON overhead
+            overhead = count_tokens(to_compact_json({**entry, "text": "..."}), model)
+            if remaining - overhead < MIN_TRUNCATED_CLAIM_TOKENS:
+                omitted.append(claim.number)
+                continue
+            text = truncate_to_tokens(claim.text, remaining - overhead, model)
+            entry["text"] = text + "..."
+            cost = remaining
+        kept[claim.number] = entry
+        used += cost
+
+    return [kept[number] for number in sorted(kept)], omitted
+
+
+def to_compact_json(value: Any) -> str:
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+
+
+def build_analysis_prompt(
+    *,
+    company: Company,
+    patent: Patent,
+    analysis_id: str,
+    analysis_date: str,
+    budget: int,
+    model: str,
+    products: list[dict[str, Any]] | None = None,
+    claims: list[Claim] | None = None,
+) -> tuple[str, int]:
+    """
+    Build the infringement analysis prompt, keeping it within ``budget`` tokens
+    by compacting the claims. Returns the prompt and its token count.
+
+    ``products`` defaults to all of the company's products and ``claims`` to
+    all claims of the patent.
+    """
+    expected_format = to_compact_json(
+        {
+            "analysis_id": analysis_id,
+            "patent_id": patent.publication_number,
+            "company_name": company.name,
+            "analysis_date": analysis_date,
+            "top_infringing_products": [
+                {
+                    "product_name": "<product_name>",
+                    "infringement_likelihood": "<High/Moderate/Low>",
+                    "relevant_claims": ["<claim_number_1>", "<claim_number_2>"],
+                    "explanation": "<detailed explanation>",
+                    "specific_features": ["<feature_1>", "<feature_2>", "<feature_3>"],
+                }
+            ],
+            "overall_risk_assessment": "<summary_of_overall_risk>",
+        }
+    )
+    if products is None:
+        products = company.products or []
+    products_json = to_compact_json(
+        [
+            {"name": product.get("name"), "description": product.get("description")}
+            for product in products
+        ]
+    )
+
+    def render(claims: str, omitted: list[int]) -> str:
+        omitted_note = (
+            f"\nDependent claims omitted for length: {omitted}" if omitted else ""
+        )
+        return (
+            "You are an expert in patent analysis. Analyze the patent and company "
+            "products below and respond only with JSON in this format, with one "
+            "top_infringing_products entry per potentially infringing product:\n"
+            f"{expected_format}\n\n"
+            f"Patent {patent.publication_number}\n"
+            f"Title: {patent.title}\n"
+            f"Abstract: {(patent.abstract or '').strip()}\n"
+            "Claims (n: claim number, dep: claim it depends on):\n"
+            f"{claims}{omitted_note}\n\n"
+            f'Products of company "{company.name}":\n'
+            f"{products_json}\n\n"
+            "Identify which products potentially infringe the patent claims, with "
+            "detailed explanations."
+        )
+
+    if claims is None:
+        claims = parse_claims(patent.claims)
+    claims_budget = max(budget - count_tokens(render("", []), model), 0)
+    compacted, omitted = compact_claims(claims, budget=claims_budget, model=model)
+    prompt = render(to_compact_json(compacted), omitted)
+    return prompt, count_tokens(prompt, model)
@@ -0,0 +1,202 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import TypeVar
+
+import openai
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Transient failures worth another attempt: rate limits, 5xx, connection
+# errors and timeouts
+RETRYABLE_ERRORS = (
+    openai.RateLimitError,
+    openai.InternalServerError,
+    openai.APIConnectionError,
+)
+
+
+class TokenBucket:
+    """
+    Token bucket holding up to ``per_minute`` tokens, refilled continuously at
+    ``per_minute`` tokens a minute.
+
+    Callers reserve tokens up front, running the bucket into debt if needed,
+    and wait for the time it takes to repay it. Concurrent callers are thus
+    served in the order they reserved, without holding a lock while waiting.
+    """
+
+    def __init__(self, per_minute: float) -> None:
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    def reserve(self, amount: float) -> float:
+        """
+        Take ``amount`` tokens and return the seconds to wait before using them.
+        """
+        with self._lock:
+            self._refill()
+            # A reservation larger than the bucket would never be served
+            self._tokens -= min(amount, self.capacity)
+            return max(-self._tokens / self.rate, 0.0)
+
+    def adjust(self, amount: float) -> None:
+        """
+        Take ``amount`` more tokens, or give them back when negative, once the
+        actual cost of a reservation is known.
+        """
+        with self._lock:
+            self._refill()
+            self._tokens = min(self.capacity, self._tokens - amount)
+
+
+class RateLimiter:
+    """
+    Requests-per-minute and tokens-per-minute limits shared by every call to
+    an API in this process. A limit of 0 disables it.
+    """
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int) -> None:
+        self.requests = (
+            TokenBucket(requests_per_minute) if requests_per_minute > 0 else None
+        )
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute > 0 else None
+        self._paused_until = 0.0
+
+    async def acquire(self, tokens: int) -> None:
+        """
+        Wait until a request using about ``tokens`` tokens fits the limits.
+        """
+        wait = self._paused_until - time.monotonic()
+        if self.requests:
+            wait = max(wait, self.requests.reserve(1))
+        if self.tokens:
+            wait = max(wait, self.tokens.reserve(tokens))
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def settle(self, reserved: int, used: int) -> None:
+        """
+        Correct the reservation of a request once its token usage is known.
+        """
+        if self.tokens:
+            self.tokens.adjust(used - reserved)
+
+    def refund(self, reserved: int) -> None:
+        """
+        Give back the reservation of a request that failed without using tokens.
+        """
+        self.settle(reserved, 0)
+
+    def pause(self, seconds: float) -> None:
+        """
+        Hold every request for ``seconds``, e.g. when the API asks to retry later.
+        """
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+# Shared by every analyzer in the process, see app.core.openai
+openai_limiter = RateLimiter(
+    settings.OPENAI_REQUESTS_PER_MINUTE, settings.OPENAI_TOKENS_PER_MINUTE
+)
+
+
+def retry_after(error: Exception) -> float | None:
+    """
+    Seconds the API asked to wait before retrying, from the ``retry-after-ms``
+    or ``retry-after`` (seconds or HTTP date) headers of its response.
+    """
+    if not isinstance(error, openai.APIStatusError):
+        return None
+    headers = error.response.headers
+    try:
+        if "retry-after-ms" in headers:
+            return max(float(headers["retry-after-ms"]) / 1000, 0.0)
+        if "retry-after" in headers:
+            value = headers["retry-after"]
+            try:
+                return max(float(value), 0.0)
+            except ValueError:
+                wait = parsedate_to_datetime(value) - datetime.now(timezone.utc)
+                return max(wait.total_seconds(), 0.0)
+    except (TypeError, ValueError):
+        pass
+    return None
+
+
+def backoff_delay(attempt: int) -> float:
+    """
+    Exponential backoff with full jitter for the ``attempt``-th retry (from 0).
+    """
+    ceiling = min(
+        settings.OPENAI_RETRY_BASE_SECONDS * 2**attempt,
+        settings.OPENAI_RETRY_MAX_SECONDS,
+    )
+    return random.uniform(0, ceiling)
+
+
+async def call_with_retries(
+    call: Callable[[], Awaitable[T]],
+    *,
+    tokens: int,
+    limiter: RateLimiter = openai_limiter,
+) -> T:
+    """
+    Run an API call once the rate limiter admits it, retrying rate limits and
+    transient errors up to OPENAI_MAX_RETRIES times.
+
+    Waits follow the API's Retry-After when it sends one, with some jitter, and
+    jittered exponential backoff otherwise. A rate limit pauses every caller of
+    the limiter, not just this one. The tokens reserved for a failed attempt
+    are given back, unless it timed out and may have been processed anyway.
+    """
+    attempt = 0
+    while True:
+        await limiter.acquire(tokens)
+        try:
+            return await call()
+        except Exception as e:
+            if not isinstance(e, openai.APITimeoutError):
+                limiter.refund(tokens)
+            if (
+                not isinstance(e, RETRYABLE_ERRORS)
+                or attempt >= settings.OPENAI_MAX_RETRIES
+            ):
+                raise
+            requested = retry_after(e)
+            if requested is not None:
+                delay = requested + random.uniform(
+                    0, settings.OPENAI_RETRY_BASE_SECONDS
+                )
+            else:
+                delay = backoff_delay(attempt)
+            if isinstance(e, openai.RateLimitError):
+                limiter.pause(delay)
+            logger.warning(
+                "OpenAI call failed (%s), retry %d of %d in %.1fs",
+                e,
+                attempt + 1,
+                settings.OPENAI_MAX_RETRIES,
+                delay,
+            )
+            attempt += 1
+            await asyncio.sleep(delay)
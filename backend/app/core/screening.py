@@ -0,0 +1,97 @@
+import asyncio
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any
+
+from sqlmodel import col, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.embeddings import PATENT_INDEX, get_index, product_embedding_text
+from app.models import Company, Patent, Product
+
+
+@dataclass
+class Screening:
+    # Patents of the selected pairs, most similar first
+    patents: list[Patent]
+    # Selected products of every patent id, most similar first, with their
+    # cosine similarity to the patent
+    products: dict[uuid.UUID, list[tuple[dict[str, Any], float]]] = field(
+        default_factory=dict
+    )
+    patents_screened: int = 0
+    products_screened: int = 0
+    pairs_selected: int = 0
+    elapsed_seconds: float = 0.0
+
+    @property
+    def pairs_screened(self) -> int:
+        return self.patents_screened * self.products_screened
+
+
+def rank_pairs(
+    products: list[dict[str, Any]], top_n: int, min_score: float
+) -> tuple[list[tuple[uuid.UUID, int, float]], int]:
+    """
+    Score every (indexed patent, product) pair by embedding similarity and
+    keep the ``top_n`` best. Blocking, run it in a worker thread.
+
+    Returns the (patent id, product position, score) pairs and the number of
+    indexed patents.
+    """
+    index = get_index(PATENT_INDEX)
+    queries = index.embedder.embed(
+        [
+            product_embedding_text(
+                name=product["name"], description=product["description"]
+            )
+            for product in products
+        ]
+    )
+    return index.top_pairs(queries, top_n, min_score=min_score), len(index)
+
+
+async def screen_company(
+    *, session: AsyncSession, company: Company, top_n: int, min_score: float
+) -> Screening:
+    """
+    Pick the ``top_n`` (patent, product) pairs of the whole patent portfolio
+    most similar to the company's products, before any LLM call.
+    """
+    started = time.perf_counter()
+    products = [
+        {"name": name, "description": description}
+        for name, description in (
+            await session.exec(
+                select(Product.name, Product.description)
+                .where(Product.company_id == company.id)
+                .order_by(Product.name)
+            )
+        ).all()
+    ]
+    if not products:
+        return Screening(patents=[])
+
+    pairs, patents_screened = await asyncio.to_thread(
+        rank_pairs, products, top_n, min_score
+    )
+    selected: dict[uuid.UUID, list[tuple[dict[str, Any], float]]] = {}
+    for patent_id, product, score in pairs:
+        selected.setdefault(patent_id, []).append((products[product], score))
+
+    # Patents deleted since the index was last synced drop out here
+    patents = {
+        patent.id: patent
+        for patent in (
+            await session.exec(select(Patent).where(col(Patent.id).in_(selected)))
+        ).all()
+    }
+    return Screening(
+        patents=[patents[id] for id in selected if id in patents],
+        products={id: selected[id] for id in selected if id in patents},
+        patents_screened=patents_screened,
+        products_screened=len(products),
+        pairs_selected=sum(len(selected[id]) for id in selected if id in patents),
+        elapsed_seconds=time.perf_counter() - started,
+    )
@@ -0,0 +1,496 @@
+import hashlib
+import json
+import logging
+import re
+import time
+import uuid
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from datetime import datetime
+from itertools import islice
+from typing import IO, Any, TypeVar
+
+from pydantic import ValidationError
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import Session, col, delete, select
+
+from app.core.embeddings import (
+    PATENT_INDEX,
+    PRODUCT_INDEX,
+    get_index,
+    patent_embedding_text,
+    product_embedding_text,
+    update_index,
+)
+from app.core.prompt import parse_claims
+from app.models import (
+    Company,
+    CompanyBase,
+    InfringementAnalysis,
+    Patent,
+    PatentBase,
+    PatentClaim,
+    Product,
+    ProductBase,
+)
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Rows validated and written per INSERT ... ON CONFLICT round trip
+SEED_BATCH_SIZE = 500
+# Characters read from a JSON file at a time
+READ_CHUNK_SIZE = 64 * 1024
+# Namespace of the deterministic ids of seeded infringement analyses
+ANALYSIS_ID_NAMESPACE = uuid.UUID("5c3f0a52-8d0e-4d7b-9a1e-2f6b7c9d1e04")
+
+# Patent columns that dumps may carry as JSON encoded strings
+PATENT_JSON_FIELDS = (
+    "application_events",
+    "citations",
+    "image_urls",
+    "landscapes",
+    "attachment_urls",
+    "inventors",
+    "claims",
+)
+
+_decoder = json.JSONDecoder()
+
+
+def iter_json_array(
+    f: IO[str], *, key: str | None = None, chunk_size: int = READ_CHUNK_SIZE
+) -> Iterator[Any]:
+    """
+    Yield the items of a JSON array one at a time without loading the file.
+
+    The array is either the whole document or, with ``key``, the value of that
+    key, such as the "companies" array of {"companies": [...]}. Only the item
+    being decoded and one read chunk are held in memory.
+    """
+    buffer = f.read(chunk_size)
+    eof = not buffer
+
+    def fill() -> bool:
+        nonlocal buffer, eof
+        if eof:
+            return False
+        chunk = f.read(chunk_size)
+        eof = not chunk
+        buffer += chunk
+        return not eof
+
+    if key:
+        find_start = re.compile(rf"\"{re.escape(key)}\"\s*:\s*\[").search
+    else:
+        find_start = re.compile(r"\s*\[").match
+    while not (match := find_start(buffer)):
+        if not fill():
+            raise ValueError(f"No JSON array{f' under {key!r}' if key else ''} found")
+    position = match.end()
+
+    while True:
+        # Skip whitespace and the separating comma
+        while True:
+            while position < len(buffer) and buffer[position] in " \t\r\n,":
+                position += 1
+            if position < len(buffer) or not fill():
+                break
+        if position >= len(buffer):
+            raise ValueError("Unterminated JSON array")
+        if buffer[position] == "]":
+            return
+
+        try:
+            item, end = _decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            # The item may be cut off at the end of the buffer
+            if fill():
+                continue
+            raise
+        # So may an item decoded right up to the end, such as a number
+        if end == len(buffer) and fill():
+            continue
+        yield item
+
+        # Drop the consumed items so the buffer stays one item large
+        buffer = buffer[end:]
+        position = 0
+
+
+def chunked(items: Iterable[T], size: int) -> Iterator[list[T]]:
+    iterator = iter(items)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def upsert(
+    session: Session,
+    model: Any,
+    rows: list[dict[str, Any]],
+    *,
+    conflict_column: str,
+    keep_columns: Iterable[str] = (),
+    update_if_changed: str | None = None,
+    returning: Iterable[str] = (),
+) -> list[Any]:
+    """
+    Bulk insert ``rows``, updating the existing row on a ``conflict_column``
+    clash except for its id and ``keep_columns``.
+
+    With ``update_if_changed``, existing rows are only updated when that
+    column differs. Returns the ``returning`` columns of the inserted and
+    updated rows.
+    """
+    if not rows:
+        return []
+    # ON CONFLICT cannot update the same row twice in one statement, the last
+    # occurrence of a key wins
+    rows = list({row[conflict_column]: row for row in rows}.values())
+    statement = insert(model)
+    keep = {"id", conflict_column, *keep_columns}
+    statement = statement.on_conflict_do_update(
+        index_elements=[conflict_column],
+        set_={
+            column: statement.excluded[column]
+            for column in rows[0]
+            if column not in keep
+        },
+        where=(
+            model.__table__.c[update_if_changed].is_distinct_from(
+                statement.excluded[update_if_changed]
+            )
+            if update_if_changed
+            else None
+        ),
+    )
+    returning = list(returning)
+    if returning:
+        statement = statement.returning(  # type: ignore[assignment]
+            *(model.__table__.c[column] for column in returning)
+        )
+    # Executed as batched multi-row INSERTs by the psycopg dialect
+    result = session.connection().execute(statement, rows)
+    return list(result.all()) if returning else []
+
+
+def validate_companies(items: Iterable[Any]) -> list[dict[str, Any]]:
+    rows = []
+    for item in items:
+        try:
+            company = CompanyBase.model_validate(item)
+        except ValidationError as e:
+            logger.warning("Skipping an invalid company entry: %s", e)
+            continue
+        if not company.products:
+            logger.warning("Skipping company %s without products.", company.name)
+            continue
+        rows.append({"id": uuid.uuid4(), **company.model_dump()})
+    return rows
+
+
+def decode_json_strings(item: dict[str, Any], fields: Iterable[str]) -> dict[str, Any]:
+    """
+    Replace JSON encoded array/object strings in ``fields`` by their value, so
+    they are stored as JSONB arrays/objects rather than strings.
+    """
+    decoded = dict(item)
+    for field in fields:
+        value = decoded.get(field)
+        if isinstance(value, str) and value.lstrip()[:1] in ("[", "{"):
+            try:
+                decoded[field] = json.loads(value)
+            except json.JSONDecodeError:
+                pass
+    return decoded
+
+
+def patent_content_hash(patent: PatentBase) -> str:
+    """
+    Hash the content of a patent, leaving out the bookkeeping timestamps, so
+    re-ingesting an unchanged record yields the same hash.
+    """
+    content = patent.model_dump(exclude={"created_at", "updated_at"})
+    encoded = json.dumps(content, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def validate_patents(items: Iterable[Any]) -> list[dict[str, Any]]:
+    rows = []
+    for item in items:
+        try:
+            if isinstance(item, dict):
+                item = decode_json_strings(item, PATENT_JSON_FIELDS)
+            # The numeric id of the dumps is ignored, patents get a UUID
+            patent = PatentBase.model_validate(item)
+        except ValidationError as e:
+            logger.warning(
+                "Skipping an invalid patent entry %s: %s",
+                item.get("publication_number") if isinstance(item, dict) else None,
+                e,
+            )
+            continue
+        rows.append(
+            {
+                "id": uuid.uuid4(),
+                **patent.model_dump(),
+                "content_hash": patent_content_hash(patent),
+            }
+        )
+    return rows
+
+
+def validate_infringement_analyses(items: Iterable[Any]) -> list[dict[str, Any]]:
+    rows = []
+    for item in items:
+        if not isinstance(item, dict):
+            raise ValueError("Each infringement analysis entry should be a dictionary.")
+        patent_id, company_name = item.get("patent_id"), item.get("company_name")
+        if not patent_id or not company_name:
+            logger.warning(
+                "Skipping an infringement analysis entry without patent_id or company_name."
+            )
+            continue
+        try:
+            analysis_date = (
+                datetime.strptime(item["analysis_date"], "%Y-%m-%d")
+                if item.get("analysis_date")
+                else datetime.utcnow()
+            )
+        except ValueError as e:
+            logger.error("Invalid date format in infringement analysis entry: %s", e)
+            continue
+        rows.append(
+            {
+                # Stable across reruns, so reseeding updates the same row
+                "id": uuid.uuid5(
+                    ANALYSIS_ID_NAMESPACE,
+                    f"{patent_id}/{company_name}/{item.get('analysis_id')}",
+                ),
+                "patent_id": patent_id,
+                "company_name": company_name,
+                "analysis_date": analysis_date,
+                "top_infringing_products": item.get("top_infringing_products") or [],
+                "overall_risk_assessment": item.get("overall_risk_assessment")
+                or "Not Assessed",
+                "explanation": item.get("explanation") or "",
+                "is_error": False,
+                "product_scores": [],
+            }
+        )
+    return rows
+
+
+def replace_company_products(
+    session: Session, products: dict[uuid.UUID, list[dict[str, Any]]]
+) -> int:
+    """
+    Replace the Product rows of each company id in ``products`` by the entries
+    of its Company.products value. Returns the number of product rows written.
+    """
+    if not products:
+        return 0
+    connection = session.connection()
+    connection.execute(
+        delete(Product).where(col(Product.company_id).in_(list(products)))
+    )
+    rows: list[dict[str, Any]] = []
+    for company_id, company_products in products.items():
+        # Later products of a name replace earlier ones
+        by_name: dict[str, dict[str, Any]] = {}
+        for item in company_products:
+            try:
+                product = ProductBase.model_validate(item)
+            except ValidationError as e:
+                logger.warning("Skipping an invalid product entry: %s", e)
+                continue
+            by_name[product.name] = {
+                # Stable across reloads, so the product keeps its embedding
+                "id": uuid.uuid5(company_id, product.name),
+                "company_id": company_id,
+                **product.model_dump(),
+            }
+        rows.extend(by_name.values())
+    for chunk in chunked(rows, SEED_BATCH_SIZE * 10):
+        connection.execute(insert(Product), chunk)
+    update_index(
+        get_index(PRODUCT_INDEX),
+        (
+            (
+                row["id"],
+                product_embedding_text(
+                    name=row["name"], description=row["description"]
+                ),
+            )
+            for row in rows
+        ),
+    )
+    return len(rows)
+
+
+def load_companies(session: Session, f: IO[str]) -> int:
+    count = 0
+    for chunk in chunked(iter_json_array(f, key="companies"), SEED_BATCH_SIZE):
+        rows = validate_companies(chunk)
+        written = upsert(
+            session, Company, rows, conflict_column="name", returning=["id", "name"]
+        )
+        products = {row["name"]: row["products"] for row in rows}
+        replace_company_products(
+            session, {company_id: products[name] for company_id, name in written}
+        )
+        count += len(rows)
+    session.commit()
+    get_index(PRODUCT_INDEX).save()
+    return count
+
+
+@dataclass
+class IngestStats:
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    invalid: int = 0
+    # Records superseded by a later record of the same patent in their batch
+    duplicate: int = 0
+    elapsed_seconds: float = 0.0
+
+    @property
+    def processed(self) -> int:
+        return (
+            self.inserted
+            + self.updated
+            + self.unchanged
+            + self.invalid
+            + self.duplicate
+        )
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.processed / self.elapsed_seconds if self.elapsed_seconds else 0.0
+
+
+def ingest_patents(
+    session: Session,
+    f: IO[str],
+    *,
+    batch_size: int = SEED_BATCH_SIZE,
+    stats: IngestStats | None = None,
+) -> IngestStats:
+    """
+    Upsert the patents of a JSON dump, skipping those whose content hash
+    matches the stored one.
+
+    Unchanged patents are never sent back to the database, and changed ones
+    get a fresh updated_at, freshly split PatentClaim rows and a new
+    embedding in the patent index. Each batch is committed on its own so a large
+    dump makes steady progress. Pass ``stats`` to accumulate over many dumps.
+    """
+    stats = stats or IngestStats()
+    started = time.perf_counter() - stats.elapsed_seconds
+    patent_index = get_index(PATENT_INDEX)
+    for chunk in chunked(iter_json_array(f), batch_size):
+        rows = validate_patents(chunk)
+        stats.invalid += len(chunk) - len(rows)
+        # Later records of a publication number replace earlier ones
+        valid = len(rows)
+        rows = list({row["publication_number"]: row for row in rows}.values())
+        stats.duplicate += valid - len(rows)
+
+        stored_hashes = dict(
+            session.exec(
+                select(Patent.publication_number, Patent.content_hash).where(
+                    col(Patent.publication_number).in_(
+                        [row["publication_number"] for row in rows]
+                    )
+                )
+            ).all()
+        )
+        now = datetime.utcnow()
+        changed = []
+        for row in rows:
+            if row["publication_number"] not in stored_hashes:
+                stats.inserted += 1
+            elif stored_hashes[row["publication_number"]] == row["content_hash"]:
+                stats.unchanged += 1
+                continue
+            else:
+                stats.updated += 1
+                row["updated_at"] = now
+            changed.append(row)
+
+        written = upsert(
+            session,
+            Patent,
+            changed,
+            conflict_column="publication_number",
+            keep_columns=["created_at"],
+            update_if_changed="content_hash",
+            returning=["id", "publication_number"],
+        )
+        by_number = {row["publication_number"]: row for row in changed}
+        replace_patent_claims(
+            session,
+            {patent_id: by_number[number]["claims"] for patent_id, number in written},
+        )
+        session.commit()
+        update_index(
+            patent_index,
+            (
+                (
+                    patent_id,
+                    patent_embedding_text(
+                        title=by_number[number]["title"],
+                        abstract=by_number[number]["abstract"],
+                        claims=by_number[number]["claims"],
+                    ),
+                )
+                for patent_id, number in written
+            ),
+        )
+        stats.elapsed_seconds = time.perf_counter() - started
+        logger.debug("Ingested %d patents so far", stats.processed)
+    patent_index.save()
+    return stats
+
+
+def replace_patent_claims(session: Session, claims: dict[uuid.UUID, Any]) -> int:
+    """
+    Replace the PatentClaim rows of each patent id in ``claims`` by the parsed
+    claims of its Patent.claims value. Returns the number of claim rows written.
+    """
+    if not claims:
+        return 0
+    connection = session.connection()
+    connection.execute(
+        delete(PatentClaim).where(col(PatentClaim.patent_id).in_(list(claims)))
+    )
+    rows: list[dict[str, Any]] = []
+    for patent_id, patent_claims in claims.items():
+        # Later claims of a number replace earlier ones, as in the prompt
+        parsed = {claim.number: claim for claim in parse_claims(patent_claims)}
+        rows.extend(
+            {
+                "id": uuid.uuid4(),
+                "patent_id": patent_id,
+                "number": claim.number,
+                "parent": claim.parent,
+                "is_independent": claim.is_independent,
+                "text": claim.text,
+            }
+            for claim in parsed.values()
+        )
+    for chunk in chunked(rows, SEED_BATCH_SIZE * 10):
+        connection.execute(insert(PatentClaim), chunk)
+    return len(rows)
+
+
+def load_infringement_analyses(session: Session, f: IO[str]) -> int:
+    count = 0
+    for chunk in chunked(iter_json_array(f), SEED_BATCH_SIZE):
+        rows = validate_infringement_analyses(chunk)
+        upsert(session, InfringementAnalysis, rows, conflict_column="id")
+        count += len(rows)
+    session.commit()
+    return count
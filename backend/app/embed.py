@@ -0,0 +1,30 @@
+import argparse
+import logging
+
+from sqlmodel import Session
+
+from app.core.db import engine
+from app.core.embeddings import EMBEDDING_BATCH_SIZE, sync_indexes
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Embed patents and products that are missing from or changed "
+        "in the similarity indexes, and drop deleted ones."
+    )
+    parser.add_argument("--batch-size", type=int, default=EMBEDDING_BATCH_SIZE)
+    args = parser.parse_args()
+
+    with Session(engine) as session:
+        embedded = sync_indexes(session, batch_size=args.batch_size)
+    logger.info(
+        "Embedded %s",
+        ", ".join(f"{count} {name}" for name, count in embedded.items()),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+import argparse
+import gzip
+import logging
+from typing import IO
+
+from sqlmodel import Session
+
+from app.core.db import engine
+from app.core.seed import SEED_BATCH_SIZE, IngestStats, ingest_patents
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def open_dump(path: str) -> IO[str]:
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8")
+    return open(path, encoding="utf-8")
+
+
+def ingest(paths: list[str], batch_size: int) -> IngestStats:
+    stats = IngestStats()
+    with Session(engine) as session:
+        for path in paths:
+            logger.info("Ingesting %s", path)
+            with open_dump(path) as f:
+                ingest_patents(session, f, batch_size=batch_size, stats=stats)
+            logger.info(
+                "%d patents processed (%.0f rows/sec)",
+                stats.processed,
+                stats.rows_per_second,
+            )
+    return stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Insert new and update changed patents from JSON array dumps, "
+        "skipping patents whose content is unchanged."
+    )
+    parser.add_argument("paths", nargs="+", help="Patent dumps (.json or .json.gz)")
+    parser.add_argument("--batch-size", type=int, default=SEED_BATCH_SIZE)
+    args = parser.parse_args()
+
+    stats = ingest(args.paths, args.batch_size)
+    logger.info(
+        "Ingested %d patents in %.1fs (%.0f rows/sec): %d inserted, %d updated, "
+        "%d unchanged, %d invalid, %d duplicate",
+        stats.processed,
+        stats.elapsed_seconds,
+        stats.rows_per_second,
+        stats.inserted,
+        stats.updated,
+        stats.unchanged,
+        stats.invalid,
+        stats.duplicate,
+    )
+
+
+if __name__ == "__main__":
+    main()
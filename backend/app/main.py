@@ -1,10 +1,16 @@
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
 import sentry_sdk
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.routing import APIRoute
 from starlette.middleware.cors import CORSMiddleware
 
 from app.api.main import api_router
 from app.core.config import settings
+from app.core.jobs import JobWorkerPool
+from app.core.openai import close_analyzer, get_analyzer
 
 
 def custom_generate_unique_id(route: APIRoute) -> str:
@@ -14,10 +20,26 @@ def custom_generate_unique_id(route: APIRoute) -> str:
 if settings.SENTRY_DSN and settings.ENVIRONMENT != "local":
     sentry_sdk.init(dsn=str(settings.SENTRY_DSN), enable_tracing=True)
 
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    # Open the OpenAI client once, shared by every analysis of this worker
+    get_analyzer()
+    # Background infringement analyses run on in-process workers
+    workers = JobWorkerPool(settings.INFRINGEMENT_WORKER_CONCURRENCY)
+    workers.start()
+    yield
+    await workers.stop()
+    await close_analyzer()
+
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
     generate_unique_id_function=custom_generate_unique_id,
+    lifespan=lifespan,
+    # orjson encodes the large patent JSON payloads several times faster
+    default_response_class=ORJSONResponse,
 )
 
 # Set all CORS enabled origins
@@ -2,9 +2,9 @@ import uuid
 from datetime import datetime
 from pydantic import EmailStr
 from sqlmodel import Field, Relationship, SQLModel
-from sqlalchemy import Column
-from typing import List, Dict, Optional, Union
-from sqlalchemy.dialects.postgresql import JSON
+from sqlalchemy import Column, Computed, Index, text
+from typing import Any, List, Dict, Optional, Union
+from sqlalchemy.dialects.postgresql import JSON, JSONB, TSVECTOR
 
 
 # Shared properties
@@ -56,7 +56,9 @@ class UserPublic(UserBase):
 
 class UsersPublic(SQLModel):
     data: list[UserPublic]
-    count: int
+    # None when counting was skipped
+    count: int | None
+    next_cursor: str | None = None
 
 
 # Shared properties
@@ -93,7 +95,9 @@ class ItemPublic(ItemBase):
 
 class ItemsPublic(SQLModel):
     data: list[ItemPublic]
-    count: int
+    # None when counting was skipped
+    count: int | None
+    next_cursor: str | None = None
 
 
 # Generic message
@@ -101,6 +105,31 @@ class Message(SQLModel):
     message: str
 
 
+# Connection pool usage of a database engine, see app.core.pool
+class DatabasePoolStatus(SQLModel):
+    name: str
+    size: int
+    checked_in: int
+    checked_out: int
+    overflow: int
+    # Checkouts and timeouts since startup, and how long they waited
+    checkouts: int
+    timeouts: int
+    wait_seconds_total: float
+    wait_seconds_max: float
+
+
+# LLM responses of a model and how many failed to parse, see app.core.openai
+class AnalysisParseStatus(SQLModel):
+    model: str
+    response_format: str
+    responses: int
+    parse_failures: int
+    # Calls repeated to correct a response that failed to parse
+    retries: int
+    parse_failure_rate: float
+
+
 # JSON payload containing access token
 class Token(SQLModel):
     access_token: str
@@ -132,16 +161,16 @@ class PatentBase(SQLModel):
     jurisdictions: Optional[str] = None
     classifications: Optional[str] = None
     application_events: Optional[Union[str, List[Dict[str, str]]]] = Field(
-        default_factory=list, sa_column=Column(JSON)
+        default_factory=list, sa_column=Column(JSONB)
     )
-    citations: Optional[Union[str, List[Dict[str, str]]]] = Field(
-        default_factory=list, sa_column=Column(JSON)
+    citations: Optional[Union[str, Dict[str, Any], List[Dict[str, Any]]]] = Field(
+        default_factory=list, sa_column=Column(JSONB)
     )
     image_urls: Optional[Union[str, List[str]]] = Field(
-        default_factory=list, sa_column=Column(JSON)
+        default_factory=list, sa_column=Column(JSONB)
     )
     landscapes: Optional[Union[str, List[str]]] = Field(
-        default_factory=list, sa_column=Column(JSON)
+        default_factory=list, sa_column=Column(JSONB)
     )
     created_at: Optional[datetime] = Field(default_factory=datetime.utcnow)
     updated_at: Optional[datetime] = Field(default_factory=datetime.utcnow)
@@ -149,19 +178,58 @@ class PatentBase(SQLModel):
     citations_non_patent: Optional[str] = None
     provenance: Optional[str] = None
     attachment_urls: Optional[Union[str, List[str]]] = Field(
-        default_factory=list, sa_column=Column(JSON)
+        default_factory=list, sa_column=Column(JSONB)
     )
     inventors: Optional[Union[str, List[Dict[str, str]]]] = Field(
-        default_factory=list, sa_column=Column(JSON)
+        default_factory=list, sa_column=Column(JSONB)
     )
     claims: Optional[Union[str, List[Dict[str, str]]]] = Field(
-        default_factory=list, sa_column=Column(JSON)
+        default_factory=list, sa_column=Column(JSONB)
     )
 
 
 # Database model for Patent (independent, does not reference Company directly)
 class Patent(PatentBase, table=True):
+    __table_args__ = (
+        # Containment (@>) filters, see app.api.filters
+        Index(
+            "ix_patent_landscapes",
+            "landscapes",
+            postgresql_using="gin",
+            postgresql_ops={"landscapes": "jsonb_path_ops"},
+        ),
+        Index(
+            "ix_patent_inventors",
+            "inventors",
+            postgresql_using="gin",
+            postgresql_ops={"inventors": "jsonb_path_ops"},
+        ),
+    )
+
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    # Hash of the ingested content, unchanged patents are skipped on re-ingestion
+    content_hash: Optional[str] = Field(default=None, max_length=64)
+
+
+# Text search configuration of the patent search document
+PATENT_SEARCH_CONFIG = "english"
+# Weighted search document, titles rank above abstracts/summaries above claims
+PATENT_SEARCH_DOCUMENT = (
+    "setweight(to_tsvector('english'::regconfig, coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english'::regconfig, coalesce(abstract, '')), 'B') || "
+    "setweight(to_tsvector('english'::regconfig, coalesce(ai_summary, '')), 'B') || "
+    "setweight(to_tsvector('english'::regconfig, coalesce(claims::text, '')), 'C')"
+)
+# Generated by Postgres and only added to the table, not the model, so the
+# vector is never loaded along with patents. Queried by GET /patents/search
+Patent.__table__.append_column(  # type: ignore[attr-defined]
+    Column("search_vector", TSVECTOR, Computed(PATENT_SEARCH_DOCUMENT, persisted=True))
+)
+Index(
+    "ix_patent_search_vector",
+    Patent.__table__.c.search_vector,  # type: ignore[attr-defined]
+    postgresql_using="gin",
+)
 
 
 # Properties to return via API for patents
@@ -169,24 +237,121 @@ class PatentPublic(PatentBase):
     id: uuid.UUID
 
 
+# Patent list entry, only the columns requested through ``fields`` are set
+class PatentSummary(SQLModel):
+    id: uuid.UUID
+    publication_number: Optional[str] = None
+    title: Optional[str] = None
+    assignee: Optional[str] = None
+    abstract: Optional[str] = None
+    ai_summary: Optional[str] = None
+    priority_date: Optional[datetime] = None
+    application_date: Optional[datetime] = None
+    grant_date: Optional[datetime] = None
+    jurisdictions: Optional[str] = None
+
+
+# Columns listed when no ``fields`` are requested
+PATENT_SUMMARY_DEFAULT_FIELDS = (
+    "publication_number",
+    "title",
+    "assignee",
+    "grant_date",
+)
+
+
 class PatentsPublic(SQLModel):
-    data: list[PatentPublic]
-    count: int
+    data: list[PatentSummary]
+    # None when counting was skipped
+    count: Optional[int]
+    next_cursor: Optional[str] = None
 
 
-class Product(SQLModel):
-    name: str
-    description: str
+# Full-text search match, with the matching abstract excerpt highlighted
+class PatentSearchHit(SQLModel):
+    id: uuid.UUID
+    publication_number: str
+    title: str
+    assignee: Optional[str] = None
+    rank: float
+    snippet: str
+
+
+class PatentSearchResults(SQLModel):
+    data: list[PatentSearchHit]
+
+
+# Shared properties for patent claims
+class PatentClaimBase(SQLModel):
+    number: int
+    # Number of the claim this claim depends on, None for independent claims
+    parent: Optional[int] = None
+    is_independent: bool = True
+    text: str
+
+
+# Database model for the claims of a patent, one row per claim, kept in sync
+# with Patent.claims during ingestion, see app.core.seed
+class PatentClaim(PatentClaimBase, table=True):
+    __table_args__ = (
+        Index("ix_patentclaim_patent_id_number", "patent_id", "number", unique=True),
+        # "Which claims mention X" lookups, see GET /patents/claims/search
+        Index(
+            "ix_patentclaim_text_search",
+            text("to_tsvector('english'::regconfig, text)"),
+            postgresql_using="gin",
+        ),
+    )
+
+    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    patent_id: uuid.UUID = Field(
+        foreign_key="patent.id", nullable=False, ondelete="CASCADE"
+    )
+
+
+# Properties to return via API for patent claims
+class PatentClaimPublic(PatentClaimBase):
+    pass
+
+
+class PatentClaimsPublic(SQLModel):
+    data: list[PatentClaimPublic]
+
+
+# Claim full-text search match, with the matching words highlighted
+class PatentClaimSearchHit(SQLModel):
+    patent_id: uuid.UUID
+    publication_number: str
+    number: int
+    is_independent: bool
+    rank: float
+    snippet: str
+
+
+class PatentClaimSearchResults(SQLModel):
+    data: list[PatentClaimSearchHit]
 
 
 # Shared properties for Company
 class CompanyBase(SQLModel):
     name: str = Field(max_length=255, unique=True, index=True)
-    products: List[Dict[str, str]] = Field(sa_column=Column(JSON), default_factory=list)
+    products: List[Dict[str, str]] = Field(
+        sa_column=Column(JSONB), default_factory=list
+    )
 
 
 # Database model for Company (independent, does not reference Patent directly)
 class Company(CompanyBase, table=True):
+    __table_args__ = (
+        # Containment (@>) filters on product names, see app.api.filters
+        Index(
+            "ix_company_products",
+            "products",
+            postgresql_using="gin",
+            postgresql_ops={"products": "jsonb_path_ops"},
+        ),
+    )
+
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
 
 
@@ -197,7 +362,78 @@ class CompanyPublic(CompanyBase):
 
 class CompaniesPublic(SQLModel):
     data: list[CompanyPublic]
-    count: int
+    # None when counting was skipped
+    count: Optional[int]
+    next_cursor: Optional[str] = None
+
+
+# Shared properties for products
+class ProductBase(SQLModel):
+    name: str = Field(min_length=1, max_length=255)
+    description: str = ""
+
+
+# Database model for the products of a company, one row per product, kept in
+# sync with Company.products when companies are loaded, see app.core.seed
+class Product(ProductBase, table=True):
+    __table_args__ = (
+        Index("ix_product_company_id_name", "company_id", "name", unique=True),
+        # Product searches, see GET /products
+        Index(
+            "ix_product_search",
+            text(
+                "(to_tsvector('english'::regconfig, name) || "
+                "to_tsvector('english'::regconfig, description))"
+            ),
+            postgresql_using="gin",
+        ),
+    )
+
+    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    company_id: uuid.UUID = Field(
+        foreign_key="company.id", nullable=False, ondelete="CASCADE"
+    )
+
+
+# Properties to return via API for products
+class ProductPublic(ProductBase):
+    id: uuid.UUID
+    company_id: uuid.UUID
+
+
+class ProductsPublic(SQLModel):
+    data: list[ProductPublic]
+    # None when counting was skipped
+    count: Optional[int]
+    next_cursor: Optional[str] = None
+
+
+# Product close to a patent in the embedding index, see app.core.embeddings
+class ProductSimilarityHit(SQLModel):
+    id: uuid.UUID
+    company_id: uuid.UUID
+    company_name: str
+    name: str
+    # Cosine similarity of the embeddings
+    score: float
+
+
+class ProductSimilarityResults(SQLModel):
+    data: list[ProductSimilarityHit]
+
+
+# Patent close to a company's products in the embedding index
+class PatentSimilarityHit(SQLModel):
+    id: uuid.UUID
+    publication_number: str
+    title: str
+    # Cosine similarity of the embeddings, to the closest product
+    score: float
+    product_name: str
+
+
+class PatentSimilarityResults(SQLModel):
+    data: list[PatentSimilarityHit]
 
 
 # Nested model for top infringing products
@@ -209,20 +445,56 @@ class InfringingProductDetail(SQLModel):
     specific_features: List[str]
 
 
+# Structured output requested from the LLM, see app.core.openai
+class InfringementAnalysisOutput(SQLModel):
+    top_infringing_products: List[InfringingProductDetail]
+    overall_risk_assessment: str
+
+
+# Lexical pre-filter score of a company product, see app.core.prefilter
+class ProductScore(SQLModel):
+    product_name: str
+    score: float
+    # Whether the product was sent to the LLM
+    selected: bool
+
+
 # Infringement Analysis shared properties
 class InfringementAnalysisBase(SQLModel):
     analysis_date: datetime = Field(default_factory=datetime.utcnow)
     overall_risk_assessment: str = Field(default="Not Assessed", min_length=1)
+    # Set when the LLM call or response parsing failed
+    is_error: bool = False
+    # Whether the LLM was called, not when the pre-filter left no products
+    llm_called: bool = False
+    # Token usage reported by the LLM for this analysis
+    prompt_tokens: Optional[int] = None
+    completion_tokens: Optional[int] = None
 
 
 # Database model for Infringement Analysis
 class InfringementAnalysis(InfringementAnalysisBase, table=True):
+    __table_args__ = (
+        # Serves "latest analysis for a patent/company pair" lookups
+        Index(
+            "ix_infringementanalysis_patent_id_company_name_analysis_date",
+            "patent_id",
+            "company_name",
+            "analysis_date",
+        ),
+    )
+
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    # Content hash of the analyzed patent/company, see app.core.cache
+    cache_key: Optional[str] = Field(default=None, max_length=64, index=True)
     patent_id: str = Field(foreign_key="patent.publication_number", nullable=False)
     company_name: str = Field(foreign_key="company.name", nullable=False)
     top_infringing_products: List[InfringingProductDetail] = Field(
         sa_column=Column(JSON), default_factory=list
     )
+    product_scores: List[ProductScore] = Field(
+        sa_column=Column(JSON), default_factory=list
+    )
     explanation: Optional[str] = Field(default=None)
 
 
@@ -232,3 +504,52 @@ class InfringementAnalysisPublic(InfringementAnalysisBase):
     patent_id: str
     company_name: str
     top_infringing_products: List[InfringingProductDetail] = Field(default_factory=list)
+    product_scores: List[ProductScore] = Field(default_factory=list)
+
+
+# Shared properties for background infringement jobs
+class InfringementJobBase(SQLModel):
+    patent_id: str = Field(foreign_key="patent.publication_number", max_length=50)
+    company_name: str = Field(foreign_key="company.name", max_length=255)
+    # Claims to analyze, None for all of them
+    claim_numbers: Optional[List[int]] = Field(default=None, sa_column=Column(JSONB))
+    # Products to analyze, None for all of the company's products
+    product_names: Optional[List[str]] = Field(default=None, sa_column=Column(JSONB))
+
+
+# Database model for queued infringement analyses, see app.core.jobs
+class InfringementJob(InfringementJobBase, table=True):
+    __table_args__ = (
+        # Workers only ever scan for jobs that are still waiting
+        Index(
+            "ix_infringementjob_pending_created_at",
+            "created_at",
+            postgresql_where=text("status = 'pending'"),
+        ),
+    )
+
+    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    # One of "pending", "running", "succeeded" or "failed"
+    status: str = Field(default="pending", max_length=20)
+    analysis_id: Optional[uuid.UUID] = Field(
+        default=None, foreign_key="infringementanalysis.id"
+    )
+    error: Optional[str] = None
+    attempts: int = 0
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    started_at: Optional[datetime] = None
+    # Last time the worker running the job reported it alive
+    heartbeat_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+
+# Properties to return via API for background infringement jobs
+class InfringementJobPublic(InfringementJobBase):
+    id: uuid.UUID
+    status: str
+    analysis_id: Optional[uuid.UUID] = None
+    error: Optional[str] = None
+    attempts: int
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
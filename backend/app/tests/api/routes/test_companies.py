@@ -0,0 +1,59 @@
+import uuid
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.core.embeddings import sync_indexes
+from app.tests.utils.company import create_random_company
+
+
+def test_read_companies(client: TestClient, db: Session) -> None:
+    create_random_company(db)
+    response = client.get(f"{settings.API_V1_STR}/companies/", params={"limit": 1})
+    assert response.status_code == 200
+    content = response.json()
+    assert len(content["data"]) == 1
+    assert content["count"] >= 2
+    assert content["next_cursor"]
+
+
+def test_read_company(client: TestClient, db: Session) -> None:
+    company = create_random_company(db)
+    response = client.get(f"{settings.API_V1_STR}/companies/{company.id}")
+    assert response.status_code == 200
+    assert response.json()["name"] == company.name
+
+    response = client.get(f"{settings.API_V1_STR}/companies/{uuid.uuid4()}")
+    assert response.status_code == 404
+
+
+def test_read_companies_by_product(client: TestClient, db: Session) -> None:
+    company = create_random_company(db)
+    product = company.products[0]["name"]
+    response = client.get(
+        f"{settings.API_V1_STR}/companies/", params={"product": product}
+    )
+    assert response.status_code == 200
+    assert [c["name"] for c in response.json()["data"]] == [company.name]
+    assert response.json()["count"] == 1
+
+
+def test_read_similar_patents(client: TestClient, db: Session) -> None:
+    company = create_random_company(db)
+    sync_indexes(db)
+    response = client.get(
+        f"{settings.API_V1_STR}/companies/{company.id}/similar-patents",
+        params={"k": 5},
+    )
+    assert response.status_code == 200
+    hits = response.json()["data"]
+    assert len(hits) == 5
+    assert "US-RE49889-E1" in [hit["publication_number"] for hit in hits]
+    assert {hit["product_name"] for hit in hits} == {company.products[0]["name"]}
+
+    response = client.get(
+        f"{settings.API_V1_STR}/companies/{company.id}/similar-patents",
+        params={"product_name": "Unknown product"},
+    )
+    assert response.status_code == 404
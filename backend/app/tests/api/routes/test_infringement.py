@@ -0,0 +1,681 @@
+import asyncio
+import json
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any
+
+import pytest
+from fastapi.testclient import TestClient
+from openai import NOT_GIVEN
+from openai.resources.chat import AsyncCompletions
+from openai.types import CompletionUsage
+from openai.types.chat import (
+    ChatCompletion,
+    ChatCompletionChunk,
+    ChatCompletionMessage,
+)
+from openai.types.chat.chat_completion import Choice as ChatCompletionChoice
+from openai.types.chat.chat_completion_chunk import Choice, ChoiceDelta
+from sqlmodel import Session, select
+
+from app.core.cache import analysis_cache
+from app.core.config import Settings, settings
+from app.core.embeddings import sync_indexes
+from app.core.openai import (
+    ANALYSIS_ERROR_MESSAGE,
+    NO_CANDIDATE_PRODUCTS_MESSAGE,
+    PatentInfringementAnalyzer,
+    get_analyzer,
+    parse_stats,
+)
+from app.core.prompt import Claim
+from app.core.seed import replace_company_products
+from app.models import (
+    Company,
+    InfringementAnalysis,
+    InfringingProductDetail,
+    Patent,
+)
+from app.tests.utils.company import create_random_company
+
+PATENT_ID = "US-RE49889-E1"
+
+
+@pytest.fixture
+def analyzer_calls(monkeypatch: pytest.MonkeyPatch) -> list[tuple[str, str]]:
+    calls: list[tuple[str, str]] = []
+
+    async def fake_analyze(
+        _self: PatentInfringementAnalyzer,
+        company: Company,
+        patent: Patent,
+        _claims: list[Claim] | None = None,
+        _products: list[dict[str, Any]] | None = None,
+    ) -> InfringementAnalysis:
+        calls.append((patent.publication_number, company.name))
+        return InfringementAnalysis(
+            id=uuid.uuid4(),
+            patent_id=patent.publication_number,
+            company_name=company.name,
+            analysis_date=datetime.utcnow(),
+            top_infringing_products=[],
+            overall_risk_assessment="Low risk.",
+            llm_called=True,
+            prompt_tokens=100,
+            completion_tokens=20,
+        )
+
+    monkeypatch.setattr(
+        PatentInfringementAnalyzer, "analyze_infringement", fake_analyze
+    )
+    analysis_cache.clear()
+    return calls
+
+
+def test_check_infringement_is_persisted_and_cached(
+    client: TestClient, db: Session, analyzer_calls: list[tuple[str, str]]
+) -> None:
+    company = create_random_company(db)
+    data = {"patent_id": PATENT_ID, "company_name": company.name}
+    first = client.post(f"{settings.API_V1_STR}/infringement/check", json=data)
+    second = client.post(f"{settings.API_V1_STR}/infringement/check", json=data)
+    assert first.status_code == 200
+    assert second.status_code == 200
+    assert first.json()["id"] == second.json()["id"]
+    assert analyzer_calls == [(PATENT_ID, company.name)]
+
+    response = client.get(f"{settings.API_V1_STR}/infringement/{first.json()['id']}")
+    assert response.status_code == 200
+    assert response.json()["overall_risk_assessment"] == "Low risk."
+
+    # A cold in-process cache falls back to the persisted analysis
+    analysis_cache.clear()
+    third = client.post(f"{settings.API_V1_STR}/infringement/check", json=data)
+    assert third.json()["id"] == first.json()["id"]
+    assert len(analyzer_calls) == 1
+
+
+def test_check_infringement_persists_failures(
+    client: TestClient, db: Session, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    calls: list[object] = []
+
+    async def failing_create(*_args: object, **_kwargs: object) -> None:
+        calls.append(_kwargs)
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(AsyncCompletions, "create", failing_create)
+    analysis_cache.clear()
+    company = create_random_company(db)
+    data = {"patent_id": PATENT_ID, "company_name": company.name}
+    response = client.post(f"{settings.API_V1_STR}/infringement/check", json=data)
+    assert response.status_code == 200
+    content = response.json()
+    assert content["is_error"] is True
+    assert content["overall_risk_assessment"] == ANALYSIS_ERROR_MESSAGE
+    assert [score["selected"] for score in content["product_scores"]] == [True]
+    # Only parse failures are retried
+    assert len(calls) == 1
+
+    analysis = db.get(InfringementAnalysis, uuid.UUID(content["id"]))
+    assert analysis
+    assert analysis.is_error
+
+    latest = client.get(
+        f"{settings.API_V1_STR}/infringement/latest",
+        params={"patent_id": PATENT_ID, "company_name": company.name},
+    )
+    assert latest.status_code == 404
+    latest = client.get(
+        f"{settings.API_V1_STR}/infringement/latest",
+        params={
+            "patent_id": PATENT_ID,
+            "company_name": company.name,
+            "include_errors": True,
+        },
+    )
+    assert latest.status_code == 200
+    assert latest.json()["id"] == content["id"]
+
+
+@pytest.mark.usefixtures("analyzer_calls")
+def test_check_infringement_selected_claims(
+    client: TestClient, db: Session, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    analyzed_claims: list[list[Claim] | None] = []
+    fake_analyze = PatentInfringementAnalyzer.analyze_infringement
+
+    async def record_claims(
+        self: PatentInfringementAnalyzer,
+        company: Company,
+        patent: Patent,
+        claims: list[Claim] | None = None,
+        products: list[dict[str, Any]] | None = None,
+    ) -> InfringementAnalysis:
+        analyzed_claims.append(claims)
+        return await fake_analyze(self, company, patent, claims, products)
+
+    monkeypatch.setattr(
+        PatentInfringementAnalyzer, "analyze_infringement", record_claims
+    )
+    company = create_random_company(db)
+    data = {"patent_id": PATENT_ID, "company_name": company.name}
+    full = client.post(f"{settings.API_V1_STR}/infringement/check", json=data)
+    selected = client.post(
+        f"{settings.API_V1_STR}/infringement/check",
+        json={**data, "claim_numbers": [4]},
+    )
+    assert full.status_code == 200
+    assert selected.status_code == 200
+    # Analyses of selected claims are cached apart from full analyses
+    assert full.json()["id"] != selected.json()["id"]
+    assert analyzed_claims[0] is None
+    # Claim 4 depends on claim 3, which depends on claim 1
+    assert [claim.number for claim in analyzed_claims[1] or []] == [1, 3, 4]
+
+    response = client.post(
+        f"{settings.API_V1_STR}/infringement/check",
+        json={**data, "claim_numbers": [4, 9999]},
+    )
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Claims not found: 9999"
+
+
+@pytest.mark.usefixtures("analyzer_calls")
+def test_check_infringement_selected_products(
+    client: TestClient, db: Session, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    analyzed_products: list[list[dict[str, Any]] | None] = []
+    fake_analyze = PatentInfringementAnalyzer.analyze_infringement
+
+    async def record_products(
+        self: PatentInfringementAnalyzer,
+        company: Company,
+        patent: Patent,
+        claims: list[Claim] | None = None,
+        products: list[dict[str, Any]] | None = None,
+    ) -> InfringementAnalysis:
+        analyzed_products.append(products)
+        return await fake_analyze(self, company, patent, claims, products)
+
+    monkeypatch.setattr(
+        PatentInfringementAnalyzer, "analyze_infringement", record_products
+    )
+    company = create_random_company(db)
+    product = company.products[0]
+    data = {"patent_id": PATENT_ID, "company_name": company.name}
+    response = client.post(
+        f"{settings.API_V1_STR}/infringement/check",
+        json={**data, "product_names": [product["name"]]},
+    )
+    assert response.status_code == 200
+    assert analyzed_products == [[product]]
+
+    response = client.post(
+        f"{settings.API_V1_STR}/infringement/check",
+        json={**data, "product_names": [product["name"], "Unknown product"]},
+    )
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Products not found: Unknown product"
+
+
+def completion(content: str, prompt_tokens: int = 300) -> ChatCompletion:
+    return ChatCompletion(
+        id="completion",
+        created=0,
+        model="model",
+        object="chat.completion",
+        choices=[
+            ChatCompletionChoice(
+                index=0,
+                finish_reason="stop",
+                message=ChatCompletionMessage(role="assistant", content=content),
+            )
+        ],
+        usage=CompletionUsage(
+            prompt_tokens=prompt_tokens,
+            completion_tokens=40,
+            total_tokens=prompt_tokens + 40,
+        ),
+    )
+
+
+def test_check_infringement_retries_only_parse_failures(
+    client: TestClient, db: Session, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    requests: list[dict[str, Any]] = []
+    responses = [
+        completion('{"top_infringing_products": [{"product_name": "App"}]}'),
+        completion(
+            '{"top_infringing_products": [], "overall_risk_assessment": "Low risk."}',
+            prompt_tokens=500,
+        ),
+    ]
+
+    async def create(*_args: object, **kwargs: Any) -> ChatCompletion:
+        requests.append(kwargs)
+        return responses[len(requests) - 1]
+
+    monkeypatch.setattr(AsyncCompletions, "create", create)
+    monkeypatch.setattr(settings, "OPENAI_RESPONSE_FORMAT", "json_schema")
+    analysis_cache.clear()
+    failures = {
+        status.model: status.parse_failures for status in parse_stats.status()
+    }.get(settings.OPENAI_MODEL, 0)
+    company = create_random_company(db)
+    data = {"patent_id": PATENT_ID, "company_name": company.name}
+    response = client.post(f"{settings.API_V1_STR}/infringement/check", json=data)
+    assert response.status_code == 200
+    content = response.json()
+    assert content["is_error"] is False
+    assert content["overall_risk_assessment"] == "Low risk."
+    # Both calls are counted
+    assert content["prompt_tokens"] == 800
+    assert content["completion_tokens"] == 80
+
+    assert len(requests) == 2
+    response_format = requests[0]["response_format"]
+    assert response_format["type"] == "json_schema"
+    assert response_format["json_schema"]["strict"] is True
+    # The retry shows the LLM its response and what was wrong with it
+    assert requests[1]["messages"][-2]["role"] == "assistant"
+    assert "overall_risk_assessment" in requests[1]["messages"][-1]["content"]
+    status = {status.model: status for status in parse_stats.status()}
+    assert status[settings.OPENAI_MODEL].parse_failures == failures + 1
+
+
+def test_check_infringement_default_request_fits_default_model(
+    client: TestClient, db: Session, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    requests: list[dict[str, Any]] = []
+
+    async def create(*_args: object, **kwargs: Any) -> ChatCompletion:
+        requests.append(kwargs)
+        return completion(
+            '{"top_infringing_products": [], "overall_risk_assessment": "Low risk."}'
+        )
+
+    monkeypatch.setattr(AsyncCompletions, "create", create)
+    for name in ("OPENAI_MODEL", "OPENAI_RESPONSE_FORMAT"):
+        monkeypatch.setattr(settings, name, Settings.model_fields[name].default)
+    analysis_cache.clear()
+    company = create_random_company(db)
+    data = {"patent_id": PATENT_ID, "company_name": company.name}
+    response = client.post(f"{settings.API_V1_STR}/infringement/check", json=data)
+    assert response.status_code == 200
+    assert response.json()["is_error"] is False
+    assert response.json()["llm_called"] is True
+
+    # The default model supports neither structured outputs nor JSON mode
+    assert requests[0]["model"] == "gpt-3.5-turbo-16k"
+    assert requests[0]["response_format"] is NOT_GIVEN
+
+
+def test_check_infringement_without_candidate_products_skips_llm(
+    client: TestClient, db: Session, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    async def create(*_args: object, **_kwargs: Any) -> ChatCompletion:
+        raise AssertionError("The LLM should not be called")
+
+    monkeypatch.setattr(AsyncCompletions, "create", create)
+    analysis_cache.clear()
+    company = create_random_company(db)
+    company.products = [{"name": "Welder", "description": "Industrial arc welder"}]
+    db.add(company)
+    db.commit()
+    replace_company_products(db, {company.id: company.products})
+    db.commit()
+    data = {"patent_id": PATENT_ID, "company_name": company.name}
+    response = client.post(f"{settings.API_V1_STR}/infringement/check", json=data)
+    assert response.status_code == 200
+    content = response.json()
+    assert content["is_error"] is False
+    assert content["llm_called"] is False
+    assert content["overall_risk_assessment"] == NO_CANDIDATE_PRODUCTS_MESSAGE
+
+
+def test_check_infringement_gives_up_after_parse_retries(
+    client: TestClient,
+    db: Session,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    calls: list[dict[str, Any]] = []
+
+    async def create(*_args: object, **kwargs: Any) -> ChatCompletion:
+        calls.append(kwargs)
+        return completion("not json")
+
+    monkeypatch.setattr(AsyncCompletions, "create", create)
+    monkeypatch.setattr(settings, "OPENAI_PARSE_RETRIES", 2)
+    analysis_cache.clear()
+    company = create_random_company(db)
+    data = {"patent_id": PATENT_ID, "company_name": company.name}
+    response = client.post(f"{settings.API_V1_STR}/infringement/check", json=data)
+    assert response.status_code == 200
+    assert response.json()["is_error"] is True
+    assert len(calls) == 3
+
+
+def parse_events(text: str) -> list[tuple[str, dict[str, Any]]]:
+    events = []
+    for block in text.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+def test_stream_infringement_sends_products_as_they_complete(
+    client: TestClient, db: Session, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    company = create_random_company(db)
+    product = company.products[0]
+    content = json.dumps(
+        {
+            "top_infringing_products": [
+                {
+                    "product_name": product["name"],
+                    "infringement_likelihood": "High",
+                    "relevant_claims": ["1"],
+                    "explanation": "Generates shopping lists from ads.",
+                    "specific_features": ["shopping list"],
+                }
+            ],
+            "overall_risk_assessment": "High risk.",
+        }
+    )
+    sent: list[str] = []
+
+    def chunk(
+        text: str | None, usage: CompletionUsage | None = None
+    ) -> ChatCompletionChunk:
+        return ChatCompletionChunk(
+            id="chunk",
+            created=0,
+            model="model",
+            object="chat.completion.chunk",
+            choices=(
+                [Choice(index=0, delta=ChoiceDelta(content=text))]
+                if text is not None
+                else []
+            ),
+            usage=usage,
+        )
+
+    async def streaming_create(*_args: object, **kwargs: Any) -> Any:
+        assert kwargs["stream"] is True
+
+        async def chunks() -> Any:
+            for start in range(0, len(content), 16):
+                sent.append(content[start : start + 16])
+                yield chunk(content[start : start + 16])
+            yield chunk(
+                None,
+                CompletionUsage(
+                    prompt_tokens=300, completion_tokens=40, total_tokens=340
+                ),
+            )
+
+        return chunks()
+
+    monkeypatch.setattr(AsyncCompletions, "create", streaming_create)
+    analysis_cache.clear()
+    data = {"patent_id": PATENT_ID, "company_name": company.name}
+    response = client.post(
+        f"{settings.API_V1_STR}/infringement/check/stream", json=data
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = parse_events(response.text)
+    assert [event for event, _ in events] == ["product", "analysis"]
+    assert events[0][1]["product_name"] == product["name"]
+    analysis = events[1][1]
+    assert analysis["overall_risk_assessment"] == "High risk."
+    assert analysis["top_infringing_products"] == [events[0][1]]
+    assert analysis["prompt_tokens"] == 300
+    assert analysis["completion_tokens"] == 40
+    assert db.get(InfringementAnalysis, uuid.UUID(analysis["id"]))
+
+    # The same check is replayed from the cache
+    chunks_sent = len(sent)
+    response = client.post(
+        f"{settings.API_V1_STR}/infringement/check/stream", json=data
+    )
+    assert parse_events(response.text) == events
+    assert len(sent) == chunks_sent
+
+    # Products are yielded before the completion is over
+    patent = db.exec(select(Patent).where(Patent.publication_number == PATENT_ID)).one()
+
+    async def first_item() -> tuple[Any, int]:
+        stream = get_analyzer().stream_infringement(company, patent)
+        item = await anext(stream)
+        await stream.aclose()
+        return item, len(sent)
+
+    sent.clear()
+    item, chunks_before_item = asyncio.run(first_item())
+    assert isinstance(item, InfringingProductDetail)
+    assert chunks_before_item < chunks_sent
+
+
+def test_stream_infringement_rejects_background(
+    client: TestClient, db: Session
+) -> None:
+    company = create_random_company(db)
+    data = {"patent_id": PATENT_ID, "company_name": company.name, "background": True}
+    response = client.post(
+        f"{settings.API_V1_STR}/infringement/check/stream", json=data
+    )
+    assert response.status_code == 400
+
+
+def test_check_infringement_shares_one_analyzer(
+    client: TestClient,
+    db: Session,
+    analyzer_calls: list[tuple[str, str]],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    analyzers: set[int] = set()
+    fake_analyze = PatentInfringementAnalyzer.analyze_infringement
+
+    async def record_analyzer(
+        self: PatentInfringementAnalyzer,
+        company: Company,
+        patent: Patent,
+        claims: list[Claim] | None = None,
+        products: list[dict[str, Any]] | None = None,
+    ) -> InfringementAnalysis:
+        analyzers.add(id(self))
+        return await fake_analyze(self, company, patent, claims, products)
+
+    monkeypatch.setattr(
+        PatentInfringementAnalyzer, "analyze_infringement", record_analyzer
+    )
+    for company in (create_random_company(db), create_random_company(db)):
+        data = {"patent_id": PATENT_ID, "company_name": company.name}
+        response = client.post(f"{settings.API_V1_STR}/infringement/check", json=data)
+        assert response.status_code == 200
+    assert len(analyzer_calls) == 2
+    assert analyzers == {id(get_analyzer())}
+
+
+@pytest.mark.parametrize("advisory_lock", [False, True])
+def test_concurrent_identical_checks_share_one_analysis(
+    client: TestClient,
+    db: Session,
+    analyzer_calls: list[tuple[str, str]],
+    monkeypatch: pytest.MonkeyPatch,
+    advisory_lock: bool,
+) -> None:
+    fake_analyze = PatentInfringementAnalyzer.analyze_infringement
+
+    async def slow_analyze(
+        self: PatentInfringementAnalyzer,
+        company: Company,
+        patent: Patent,
+        claims: list[Claim] | None = None,
+        products: list[dict[str, Any]] | None = None,
+    ) -> InfringementAnalysis:
+        await asyncio.sleep(0.5)
+        return await fake_analyze(self, company, patent, claims, products)
+
+    monkeypatch.setattr(
+        PatentInfringementAnalyzer, "analyze_infringement", slow_analyze
+    )
+    monkeypatch.setattr(settings, "INFRINGEMENT_ADVISORY_LOCK", advisory_lock)
+    company = create_random_company(db)
+    data = {"patent_id": PATENT_ID, "company_name": company.name}
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        responses = list(
+            executor.map(
+                lambda _: client.post(
+                    f"{settings.API_V1_STR}/infringement/check", json=data
+                ),
+                range(4),
+            )
+        )
+    assert [response.status_code for response in responses] == [200] * 4
+    assert len({response.json()["id"] for response in responses}) == 1
+    assert len(analyzer_calls) == 1
+
+
+def test_check_infringement_company_not_found(
+    client: TestClient, analyzer_calls: list[tuple[str, str]]
+) -> None:
+    data = {"patent_id": PATENT_ID, "company_name": "No Such Company"}
+    response = client.post(f"{settings.API_V1_STR}/infringement/check", json=data)
+    assert response.status_code == 404
+    assert analyzer_calls == []
+
+
+def test_read_infringement_not_found(client: TestClient) -> None:
+    response = client.get(f"{settings.API_V1_STR}/infringement/{uuid.uuid4()}")
+    assert response.status_code == 404
+
+
+def test_check_infringement_in_background(
+    client: TestClient, db: Session, analyzer_calls: list[tuple[str, str]]
+) -> None:
+    company = create_random_company(db)
+    data = {"patent_id": PATENT_ID, "company_name": company.name, "background": True}
+    response = client.post(f"{settings.API_V1_STR}/infringement/check", json=data)
+    assert response.status_code == 202
+    job = response.json()
+    assert job["status"] == "pending"
+
+    for _ in range(50):
+        response = client.get(f"{settings.API_V1_STR}/infringement/jobs/{job['id']}")
+        assert response.status_code == 200
+        job = response.json()
+        if job["status"] not in ("pending", "running"):
+            break
+        time.sleep(0.1)
+    assert job["status"] == "succeeded"
+    assert analyzer_calls == [(PATENT_ID, company.name)]
+
+    response = client.get(f"{settings.API_V1_STR}/infringement/{job['analysis_id']}")
+    assert response.status_code == 200
+
+
+def test_read_infringement_job_not_found(client: TestClient) -> None:
+    response = client.get(f"{settings.API_V1_STR}/infringement/jobs/{uuid.uuid4()}")
+    assert response.status_code == 404
+
+
+def test_check_infringement_batch_streams_results(
+    client: TestClient, db: Session, analyzer_calls: list[tuple[str, str]]
+) -> None:
+    companies = [create_random_company(db), create_random_company(db)]
+    data = {
+        "patent_ids": [PATENT_ID],
+        "company_names": [company.name for company in companies],
+    }
+    response = client.post(f"{settings.API_V1_STR}/infringement/batch", json=data)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    results = [line for line in lines if line["type"] == "result"]
+    assert {result["company_name"] for result in results} == set(data["company_names"])
+    assert lines[-1]["type"] == "summary"
+    assert lines[-1]["pairs"] == 2
+    assert lines[-1]["succeeded"] == 2
+    assert lines[-1]["prompt_tokens"] == 200
+    assert len(analyzer_calls) == 2
+
+
+def test_check_infringement_batch_requires_a_filter(client: TestClient) -> None:
+    response = client.post(f"{settings.API_V1_STR}/infringement/batch", json={})
+    assert response.status_code == 400
+
+
+def test_check_infringement_batch_unknown_company(client: TestClient) -> None:
+    data = {"patent_ids": [PATENT_ID], "company_names": ["No Such Company"]}
+    response = client.post(f"{settings.API_V1_STR}/infringement/batch", json=data)
+    assert response.status_code == 404
+
+
+def test_screen_infringement_analyzes_only_top_pairs(
+    client: TestClient, db: Session, analyzer_calls: list[tuple[str, str]]
+) -> None:
+    company = create_random_company(db)
+    sync_indexes(db)
+    data = {"company_name": company.name, "top_n": 3}
+    response = client.post(f"{settings.API_V1_STR}/infringement/screen", json=data)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    results = [line for line in lines if line["type"] == "result"]
+    summary = lines[-1]
+    assert summary["type"] == "summary"
+    assert summary["pairs_selected"] == 3
+    assert summary["pairs_screened"] == (
+        summary["patents_screened"] * summary["products_screened"]
+    )
+    assert 1 <= len(results) == summary["patents_analyzed"] <= 3
+    assert sum(len(result["products"]) for result in results) == 3
+    assert len(analyzer_calls) == summary["llm_calls"] == len(results)
+    assert summary["llm_calls_avoided"] == (
+        summary["patents_screened"] - summary["llm_calls"]
+    )
+    assert summary["llm_calls_avoided"] > 0
+
+
+@pytest.mark.usefixtures("analyzer_calls")
+def test_screen_infringement_counts_only_llm_calls(
+    client: TestClient, db: Session, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    fake_analyze = PatentInfringementAnalyzer.analyze_infringement
+
+    async def no_candidates(
+        self: PatentInfringementAnalyzer,
+        company: Company,
+        patent: Patent,
+        claims: list[Claim] | None = None,
+        products: list[dict[str, Any]] | None = None,
+    ) -> InfringementAnalysis:
+        # As when the pre-filter leaves no products and the LLM is not called
+        analysis = await fake_analyze(self, company, patent, claims, products)
+        analysis.llm_called = False
+        analysis.prompt_tokens = analysis.completion_tokens = None
+        return analysis
+
+    monkeypatch.setattr(
+        PatentInfringementAnalyzer, "analyze_infringement", no_candidates
+    )
+    company = create_random_company(db)
+    sync_indexes(db)
+    data = {"company_name": company.name, "top_n": 3}
+    response = client.post(f"{settings.API_V1_STR}/infringement/screen", json=data)
+    assert response.status_code == 200
+    summary = json.loads(response.text.splitlines()[-1])
+    assert summary["patents_analyzed"] >= 1
+    assert summary["llm_calls"] == 0
+    assert summary["llm_calls_avoided"] == summary["patents_screened"]
+
+
+def test_screen_infringement_unknown_company(client: TestClient) -> None:
+    data = {"company_name": "No Such Company"}
+    response = client.post(f"{settings.API_V1_STR}/infringement/screen", json=data)
+    assert response.status_code == 404
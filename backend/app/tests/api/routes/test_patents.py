@@ -0,0 +1,194 @@
+import uuid
+
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select, text
+
+from app.api.pagination import count_rows
+from app.core.config import settings
+from app.core.db import engine
+from app.core.embeddings import sync_indexes
+from app.models import Patent, Product
+from app.tests.utils.company import create_random_company
+
+
+def test_search_patents(client: TestClient) -> None:
+    response = client.get(
+        f"{settings.API_V1_STR}/patents/search",
+        params={"q": '"shopping list" advertisement'},
+    )
+    assert response.status_code == 200
+    hits = response.json()["data"]
+    assert "US-RE49889-E1" in [hit["publication_number"] for hit in hits]
+    assert hits == sorted(hits, key=lambda hit: hit["rank"], reverse=True)
+    assert "<b>" in hits[0]["snippet"]
+
+
+def test_search_patents_without_matches(client: TestClient) -> None:
+    response = client.get(
+        f"{settings.API_V1_STR}/patents/search", params={"q": "xyzzyplugh"}
+    )
+    assert response.status_code == 200
+    assert response.json() == {"data": []}
+
+
+def test_search_patents_requires_query(client: TestClient) -> None:
+    response = client.get(f"{settings.API_V1_STR}/patents/search")
+    assert response.status_code == 422
+
+
+def test_read_patents_with_cursor(client: TestClient) -> None:
+    url = f"{settings.API_V1_STR}/patents/"
+    first_page = client.get(url, params={"limit": 30}).json()
+    assert len(first_page["data"]) == 30
+    total = first_page["count"]
+
+    ids = [patent["id"] for patent in first_page["data"]]
+    cursor = first_page["next_cursor"]
+    while cursor:
+        page = client.get(url, params={"limit": 30, "cursor": cursor, "count": "none"})
+        assert page.status_code == 200
+        assert page.json()["count"] is None
+        ids += [patent["id"] for patent in page.json()["data"]]
+        cursor = page.json()["next_cursor"]
+
+    assert len(ids) == len(set(ids)) == total
+    assert ids == sorted(ids)
+
+
+def test_read_patents_estimated_count(client: TestClient) -> None:
+    response = client.get(
+        f"{settings.API_V1_STR}/patents/", params={"limit": 1, "count": "estimated"}
+    )
+    assert response.status_code == 200
+    assert response.json()["count"] >= 0
+
+
+def test_estimated_count_of_unanalyzed_table_is_exact() -> None:
+    with Session(engine) as session:
+        # A temporary table shadows patent for this session. Analyzed while
+        # empty, it reports 0 rows and 0 pages, as a table that was never
+        # analyzed does before PostgreSQL 14
+        connection = session.connection()
+        connection.execute(text("CREATE TEMPORARY TABLE patent (id uuid)"))
+        connection.execute(text("ANALYZE patent"))
+        connection.execute(
+            text(
+                "INSERT INTO patent SELECT gen_random_uuid() FROM generate_series(1, 3)"
+            )
+        )
+        assert count_rows(session, Patent, "estimated") == 3
+        session.rollback()
+
+
+def test_read_patents_invalid_cursor(client: TestClient) -> None:
+    response = client.get(f"{settings.API_V1_STR}/patents/", params={"cursor": "!!"})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
+
+
+def test_read_patents_returns_summaries(client: TestClient) -> None:
+    response = client.get(f"{settings.API_V1_STR}/patents/", params={"limit": 2})
+    assert response.status_code == 200
+    patent = response.json()["data"][0]
+    assert set(patent) == {
+        "id",
+        "publication_number",
+        "title",
+        "assignee",
+        "grant_date",
+    }
+
+    detail = client.get(f"{settings.API_V1_STR}/patents/{patent['id']}")
+    assert detail.status_code == 200
+    assert "claims" in detail.json()
+
+
+def test_read_patents_with_fields(client: TestClient) -> None:
+    response = client.get(
+        f"{settings.API_V1_STR}/patents/",
+        params={"limit": 2, "fields": "title,abstract"},
+    )
+    assert response.status_code == 200
+    assert set(response.json()["data"][0]) == {"id", "title", "abstract"}
+
+    response = client.get(
+        f"{settings.API_V1_STR}/patents/", params={"fields": "claims"}
+    )
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Unknown patent fields: claims"
+
+
+def test_read_patents_by_inventor(client: TestClient) -> None:
+    response = client.get(
+        f"{settings.API_V1_STR}/patents/",
+        params={"inventor": "PEDERSEN MICHAEL", "fields": "publication_number"},
+    )
+    assert response.status_code == 200
+    content = response.json()
+    assert "US-RE49889-E1" in [
+        patent["publication_number"] for patent in content["data"]
+    ]
+    assert content["count"] == len(content["data"])
+
+
+def test_read_patent_claims(client: TestClient, db: Session) -> None:
+    patent_id = db.exec(
+        select(Patent.id).where(Patent.publication_number == "US-RE49889-E1")
+    ).one()
+    response = client.get(
+        f"{settings.API_V1_STR}/patents/{patent_id}/claims", params={"numbers": "4,1"}
+    )
+    assert response.status_code == 200
+    claims = response.json()["data"]
+    assert [(c["number"], c["parent"], c["is_independent"]) for c in claims] == [
+        (1, None, True),
+        (4, 3, False),
+    ]
+    assert not claims[0]["text"].startswith("1.")
+
+    response = client.get(
+        f"{settings.API_V1_STR}/patents/{patent_id}/claims",
+        params={"independent": True},
+    )
+    assert all(claim["parent"] is None for claim in response.json()["data"])
+
+
+def test_read_patent_claims_not_found(client: TestClient) -> None:
+    response = client.get(f"{settings.API_V1_STR}/patents/{uuid.uuid4()}/claims")
+    assert response.status_code == 404
+
+
+def test_search_claims(client: TestClient) -> None:
+    response = client.get(
+        f"{settings.API_V1_STR}/patents/claims/search",
+        params={"q": '"shopping list"', "independent": True},
+    )
+    assert response.status_code == 200
+    hits = response.json()["data"]
+    assert "US-RE49889-E1" in [hit["publication_number"] for hit in hits]
+    assert all(hit["is_independent"] for hit in hits)
+    assert hits == sorted(hits, key=lambda hit: hit["rank"], reverse=True)
+
+
+def test_read_similar_products(client: TestClient, db: Session) -> None:
+    create_random_company(db)
+    sync_indexes(db)
+    patent_id = db.exec(
+        select(Patent.id).where(Patent.publication_number == "US-RE49889-E1")
+    ).one()
+    response = client.get(
+        f"{settings.API_V1_STR}/patents/{patent_id}/similar-products",
+        params={"k": 20},
+    )
+    assert response.status_code == 200
+    hits = response.json()["data"]
+    assert len(hits) == 20
+    assert hits == sorted(hits, key=lambda hit: hit["score"], reverse=True)
+    # The patent is about shopping lists generated from mobile advertisements
+    top = db.get(Product, uuid.UUID(hits[0]["id"]))
+    assert top and "shopping" in f"{top.name} {top.description}".lower()
+
+    response = client.get(
+        f"{settings.API_V1_STR}/patents/{uuid.uuid4()}/similar-products"
+    )
+    assert response.status_code == 404
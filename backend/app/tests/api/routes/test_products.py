@@ -0,0 +1,49 @@
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.tests.utils.company import create_random_company
+
+
+def test_read_products_of_company(client: TestClient, db: Session) -> None:
+    company = create_random_company(db)
+    response = client.get(
+        f"{settings.API_V1_STR}/products/", params={"company_id": str(company.id)}
+    )
+    assert response.status_code == 200
+    content = response.json()
+    assert content["count"] == 1
+    assert content["data"][0]["name"] == company.products[0]["name"]
+    assert content["data"][0]["company_id"] == str(company.id)
+
+
+def test_search_products(client: TestClient, db: Session) -> None:
+    company = create_random_company(db)
+    response = client.get(
+        f"{settings.API_V1_STR}/products/",
+        params={"company_id": str(company.id), "q": "shopping lists"},
+    )
+    assert response.status_code == 200
+    assert [product["name"] for product in response.json()["data"]] == [
+        company.products[0]["name"]
+    ]
+
+    response = client.get(
+        f"{settings.API_V1_STR}/products/", params={"q": "xyzzyplugh"}
+    )
+    assert response.json()["data"] == []
+    assert response.json()["count"] == 0
+
+
+def test_read_products_with_cursor(client: TestClient, db: Session) -> None:
+    create_random_company(db)
+    create_random_company(db)
+    first = client.get(
+        f"{settings.API_V1_STR}/products/", params={"limit": 1, "count": "none"}
+    ).json()
+    assert first["count"] is None
+    second = client.get(
+        f"{settings.API_V1_STR}/products/",
+        params={"limit": 1, "cursor": first["next_cursor"]},
+    ).json()
+    assert second["data"][0]["id"] > first["data"][0]["id"]
@@ -0,0 +1,42 @@
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.core.openai import parse_stats
+
+
+def test_read_db_pool_status(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    response = client.get(
+        f"{settings.API_V1_STR}/utils/db-pool/", headers=superuser_token_headers
+    )
+    assert response.status_code == 200
+    pools = {pool["name"]: pool for pool in response.json()}
+    assert set(pools) == {"sync", "async"}
+    assert pools["sync"]["size"] == settings.DB_POOL_SIZE
+    assert pools["sync"]["checkouts"] > 0
+    assert pools["sync"]["timeouts"] == 0
+
+
+def test_read_db_pool_status_normal_user(
+    client: TestClient, normal_user_token_headers: dict[str, str]
+) -> None:
+    response = client.get(
+        f"{settings.API_V1_STR}/utils/db-pool/", headers=normal_user_token_headers
+    )
+    assert response.status_code == 403
+
+
+def test_read_analysis_parse_status(
+    client: TestClient, superuser_token_headers: dict[str, str]
+) -> None:
+    parse_stats.record("test-model")
+    parse_stats.record("test-model", failed=True)
+    response = client.get(
+        f"{settings.API_V1_STR}/utils/analysis-parse/",
+        headers=superuser_token_headers,
+    )
+    assert response.status_code == 200
+    models = {status["model"]: status for status in response.json()}
+    assert models["test-model"]["responses"] >= 2
+    assert 0 < models["test-model"]["parse_failure_rate"] < 1
@@ -0,0 +1,105 @@
+import asyncio
+import time
+
+import pytest
+
+from app.core.cache import SingleFlight, TTLCache, analysis_cache_key
+from app.models import Company, Patent
+
+
+def test_ttl_cache_evicts_least_recently_used() -> None:
+    cache: TTLCache[int] = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_ttl_cache_expires_entries() -> None:
+    cache: TTLCache[int] = TTLCache(maxsize=2, ttl=0.01)
+    cache.set("a", 1)
+    time.sleep(0.02)
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_analysis_cache_key_tracks_content() -> None:
+    patent = Patent(publication_number="US-1", title="Widget", claims="1. A widget.")
+    company = Company(name="Acme", products=[{"name": "W", "description": "w"}])
+    key = analysis_cache_key(
+        patent=patent, company=company, model="m", prompt_version="1"
+    )
+    assert key == analysis_cache_key(
+        patent=patent, company=company, model="m", prompt_version="1"
+    )
+
+    company.products = [{"name": "W", "description": "a new widget"}]
+    changed = analysis_cache_key(
+        patent=patent, company=company, model="m", prompt_version="1"
+    )
+    assert changed != key
+    assert changed != analysis_cache_key(
+        patent=patent, company=company, model="m", prompt_version="2"
+    )
+
+
+def test_analysis_cache_key_tracks_selected_products() -> None:
+    patent = Patent(publication_number="US-1", title="Widget", claims="1. A widget.")
+    company = Company(name="Acme", products=[{"name": "W", "description": "w"}])
+    selected = [{"name": "W", "description": "w"}]
+    key = analysis_cache_key(
+        patent=patent, company=company, model="m", prompt_version="1", products=selected
+    )
+    assert key != analysis_cache_key(
+        patent=patent, company=company, model="m", prompt_version="1"
+    )
+
+    # Only the analyzed products count, not the rest of Company.products
+    company.products = [*selected, {"name": "X", "description": "x"}]
+    assert key == analysis_cache_key(
+        patent=patent, company=company, model="m", prompt_version="1", products=selected
+    )
+    assert key != analysis_cache_key(
+        patent=patent,
+        company=company,
+        model="m",
+        prompt_version="1",
+        products=[{"name": "W", "description": "a new widget"}],
+    )
+
+
+def test_single_flight_shares_concurrent_calls() -> None:
+    flight: SingleFlight[int] = SingleFlight()
+    calls: list[str] = []
+
+    async def call() -> int:
+        calls.append("call")
+        await asyncio.sleep(0.01)
+        return len(calls)
+
+    async def main() -> list[tuple[int, bool]]:
+        results = await asyncio.gather(*(flight.do("a", call) for _ in range(3)))
+        # Finished calls are not shared with later callers
+        results.append(await flight.do("a", call))
+        return results
+
+    assert asyncio.run(main()) == [(1, False), (1, True), (1, True), (2, False)]
+    assert len(flight) == 0
+
+
+def test_single_flight_shares_exceptions() -> None:
+    flight: SingleFlight[int] = SingleFlight()
+
+    async def call() -> int:
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    async def main() -> None:
+        await asyncio.gather(flight.do("a", call), flight.do("a", call))
+
+    with pytest.raises(ValueError):
+        asyncio.run(main())
+    assert len(flight) == 0
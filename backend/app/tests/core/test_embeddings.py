@@ -0,0 +1,70 @@
+import uuid
+from pathlib import Path
+
+import numpy as np
+
+from app.core.embeddings import HashingEmbedder, VectorIndex, update_index
+
+
+def test_hashing_embedder_ranks_shared_vocabulary_higher() -> None:
+    embedder = HashingEmbedder(dimension=256)
+    query, close, far = embedder.embed(
+        [
+            "shopping list generated from a mobile advertisement",
+            "mobile shopping list application",
+            "hydraulic lawn mower blade",
+        ]
+    )
+    assert np.isclose(np.linalg.norm(query), 1.0)
+    assert query @ close > query @ far
+
+
+def test_vector_index_upsert_search_and_reload(tmp_path: Path) -> None:
+    embedder = HashingEmbedder(dimension=64)
+    path = str(tmp_path / "index.npz")
+    index = VectorIndex(path, embedder)
+    ids = [uuid.uuid4() for _ in range(3)]
+    texts = ["lawn mower blade", "shopping list app", "coffee grinder burr"]
+    assert update_index(index, zip(ids, texts, strict=True)) == 3
+    # Unchanged texts are not embedded again
+    assert update_index(index, zip(ids, texts, strict=True)) == 0
+    assert update_index(index, [(ids[2], "espresso grinder burr")]) == 1
+
+    matches = index.search(embedder.embed(["shopping list", "mower blade"]), k=2)
+    assert {id for id, _, _ in matches} == {ids[0], ids[1]}
+    closest_query = {id: query for id, _, query in matches}
+    assert closest_query == {ids[1]: 0, ids[0]: 1}
+
+    index.save()
+    reloaded = VectorIndex(path, embedder)
+    assert reloaded.ids() == ids
+    assert reloaded.content_hash(ids[2]) == index.content_hash(ids[2])
+    assert reloaded.remove([ids[0], uuid.uuid4()]) == 1
+    assert ids[0] not in reloaded
+
+    # Indexes of another embedder are ignored
+    assert len(VectorIndex(path, HashingEmbedder(dimension=32))) == 0
+
+
+def test_vector_index_top_pairs_matches_brute_force(tmp_path: Path) -> None:
+    embedder = HashingEmbedder(dimension=32)
+    index = VectorIndex(str(tmp_path / "index.npz"), embedder)
+    ids = [uuid.uuid4() for _ in range(50)]
+    update_index(index, ((id, f"patent {i} word{i % 7}") for i, id in enumerate(ids)))
+    queries = embedder.embed([f"product word{i}" for i in range(4)])
+
+    scores = np.stack(
+        [embedder.embed([f"patent {i} word{i % 7}"])[0] for i in range(50)]
+    )
+    scores = scores @ queries.T
+    expected = sorted(scores.ravel(), reverse=True)[:10]
+    # Small batches make the running top-n merge across batches
+    pairs = index.top_pairs(queries, 10, batch_size=7)
+    assert np.allclose([score for _, _, score in pairs], expected)
+    for id, query, score in pairs:
+        assert np.isclose(scores[ids.index(id), query], score)
+
+    assert all(
+        score > 0.5 for _, _, score in index.top_pairs(queries, 10, min_score=0.5)
+    )
+    assert index.top_pairs(queries, 0) == []
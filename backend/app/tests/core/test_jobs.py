@@ -0,0 +1,90 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import settings
+from app.core.jobs import claim_next_job
+from app.models import InfringementJob
+from app.tests.utils.company import create_random_company
+
+PATENT_ID = "US-RE49889-E1"
+
+
+def create_running_job(
+    db: Session, *, attempts: int, heartbeat_age: timedelta
+) -> InfringementJob:
+    now = datetime.utcnow()
+    job = InfringementJob(
+        patent_id=PATENT_ID,
+        company_name=create_random_company(db).name,
+        status="running",
+        attempts=attempts,
+        # Oldest in the queue, so it is the one considered first
+        created_at=datetime(2000, 1, 1),
+        started_at=now - heartbeat_age,
+        heartbeat_at=now - heartbeat_age,
+    )
+    db.add(job)
+    db.commit()
+    return job
+
+
+def claim() -> InfringementJob | None:
+    async def main() -> InfringementJob | None:
+        # The app's engine is bound to the event loop of the app's workers
+        engine = create_async_engine(
+            str(settings.SQLALCHEMY_DATABASE_URI), poolclass=NullPool
+        )
+        try:
+            async with AsyncSession(engine, expire_on_commit=False) as session:
+                return await claim_next_job(session=session)
+        finally:
+            await engine.dispose()
+
+    return asyncio.run(main())
+
+
+def test_claim_next_job_skips_running_job_with_heartbeat(db: Session) -> None:
+    job = create_running_job(db, attempts=1, heartbeat_age=timedelta(seconds=1))
+    try:
+        claimed = claim()
+        assert claimed is None or claimed.id != job.id
+        db.refresh(job)
+        assert job.status == "running"
+        assert job.attempts == 1
+    finally:
+        db.delete(job)
+        db.commit()
+
+
+def test_claim_next_job_reclaims_stale_running_job(db: Session) -> None:
+    stale = timedelta(seconds=settings.INFRINGEMENT_JOB_TIMEOUT_SECONDS + 1)
+    job = create_running_job(db, attempts=1, heartbeat_age=stale)
+    try:
+        claimed = claim()
+        assert claimed is not None
+        assert claimed.id == job.id
+        assert claimed.attempts == 2
+    finally:
+        db.delete(job)
+        db.commit()
+
+
+def test_claim_next_job_fails_job_out_of_attempts(db: Session) -> None:
+    stale = timedelta(seconds=settings.INFRINGEMENT_JOB_TIMEOUT_SECONDS + 1)
+    job = create_running_job(
+        db, attempts=settings.INFRINGEMENT_JOB_MAX_ATTEMPTS, heartbeat_age=stale
+    )
+    try:
+        claimed = claim()
+        assert claimed is None or claimed.id != job.id
+        db.refresh(job)
+        assert job.status == "failed"
+        assert job.finished_at is not None
+    finally:
+        db.delete(job)
+        db.commit()
@@ -0,0 +1,51 @@
+import json
+
+from app.core.json_stream import JsonArrayItemParser
+
+RESPONSE = {
+    "analysis_id": "1",
+    "notes": ["top_infringing_products", {"a": "}"}],
+    "top_infringing_products": [
+        {
+            "product_name": 'Shopping "List" {App}',
+            "relevant_claims": ["1", "2"],
+            "explanation": "Uses [ads] \\ lists",
+        },
+        {"product_name": "Walmart+", "relevant_claims": [], "explanation": ""},
+    ],
+    "overall_risk_assessment": "High",
+}
+
+
+def test_parser_yields_items_as_they_complete() -> None:
+    text = "```json\n" + json.dumps(RESPONSE, indent=2) + "\n```"
+    parser = JsonArrayItemParser("top_infringing_products")
+    items = []
+    for position, char in enumerate(text):
+        for item in parser.feed(char):
+            items.append(item)
+            # Each item is returned by the chunk holding its closing brace
+            assert text[: position + 1].endswith("}")
+    assert items == RESPONSE["top_infringing_products"]
+
+
+def test_parser_handles_arbitrary_chunks() -> None:
+    text = json.dumps(RESPONSE)
+    parser = JsonArrayItemParser("top_infringing_products")
+    items = []
+    for start in range(0, len(text), 7):
+        items.extend(parser.feed(text[start : start + 7]))
+    assert items == RESPONSE["top_infringing_products"]
+    assert JsonArrayItemParser("missing").feed(text) == []
+
+
+def test_parser_skips_malformed_items() -> None:
+    text = (
+        '{"top_infringing_products": [{"product_name": "A"}, '
+        '{"product_name": "B",}, {"product_name": \'C\'}, {"product_name": "D"}]}'
+    )
+    parser = JsonArrayItemParser("top_infringing_products")
+    items = []
+    for start in range(0, len(text), 5):
+        items.extend(parser.feed(text[start : start + 5]))
+    assert items == [{"product_name": "A"}, {"product_name": "D"}]
@@ -0,0 +1,22 @@
+import pytest
+
+from app.core.openai import supported_response_format
+
+
+@pytest.mark.parametrize(
+    ("model", "response_format"),
+    [
+        ("gpt-3.5-turbo-16k", "text"),
+        ("gpt-4", "text"),
+        ("gpt-3.5-turbo", "json_object"),
+        ("gpt-4-turbo-2024-04-09", "json_object"),
+        ("gpt-4o-2024-05-13", "json_object"),
+        ("gpt-4o", "json_schema"),
+        ("gpt-4o-mini", "json_schema"),
+        ("o1-mini", "text"),
+        ("o3-mini", "json_schema"),
+        ("llama-3-70b", "text"),
+    ],
+)
+def test_supported_response_format(model: str, response_format: str) -> None:
+    assert supported_response_format(model) == response_format
@@ -0,0 +1,62 @@
+from app.core.prefilter import bm25_scores, prefilter_products, tokenize
+from app.models import Patent
+
+PATENT = Patent(
+    publication_number="US-0000001-A1",
+    title="Generating electronic shopping lists from advertisements",
+    abstract="A mobile device adds advertised items to a shopping list.",
+    claims=[
+        {
+            "num": "00001",
+            "text": "1. A method comprising adding an advertised item to a shopping list.",
+        },
+        {
+            "num": "00002",
+            "text": "2. The method of claim 1, wherein the list is synchronized.",
+        },
+    ],
+)
+
+PRODUCTS = [
+    {"name": "Garden Hose", "description": "Durable rubber hose for watering plants"},
+    {"name": "List App", "description": "Mobile shopping list with advertised deals"},
+    {"name": "List Sync", "description": "Shopping list synchronized across devices"},
+]
+
+
+def test_tokenize_drops_stopwords() -> None:
+    assert tokenize("The method of claim 1, wherein a List is Synced") == [
+        "method",
+        "list",
+        "synced",
+    ]
+
+
+def test_bm25_scores_rank_matching_documents() -> None:
+    documents = [["hose", "garden"], ["shopping", "list"], ["shopping", "cart"]]
+    scores = bm25_scores(["shopping", "list"], documents)
+    assert scores[0] == 0
+    assert scores[1] > scores[2] > 0
+    assert bm25_scores(["shopping"], []) == []
+
+
+def test_prefilter_products_keeps_top_k_candidates() -> None:
+    selected, scores = prefilter_products(PRODUCTS, PATENT, top_k=1)
+    assert selected == [PRODUCTS[1]]
+    assert [score.product_name for score in scores] == [
+        "List App",
+        "List Sync",
+        "Garden Hose",
+    ]
+    assert [score.selected for score in scores] == [True, False, False]
+    assert scores[-1].score == 0
+
+
+def test_prefilter_products_drops_unrelated_products() -> None:
+    selected, scores = prefilter_products(PRODUCTS, PATENT, top_k=10)
+    # Selected products keep the company's order
+    assert selected == PRODUCTS[1:]
+    assert not scores[-1].selected
+
+    selected, _ = prefilter_products(PRODUCTS, PATENT, top_k=0)
+    assert selected == PRODUCTS
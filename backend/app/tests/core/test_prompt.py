@@ -0,0 +1,96 @@
+import json
+
+from app.core.prompt import (
+    build_analysis_prompt,
+    compact_claims,
+    count_tokens,
+    parse_claims,
+    to_compact_json,
+)
+from app.models import Company, Patent
+
+MODEL = "gpt-3.5-turbo-16k"
+
+CLAIMS = [
+    {"num": "00001", "text": "1. A method for generating a shopping list."},
+    {
+        "num": "00002",
+        "text": "2. The method according to claim 1, further comprising "
+        + "syncing the list. " * 40,
+    },
+    {"num": "00003", "text": "3. The method of claim 2, wherein the list is remote."},
+    {"num": "00004", "text": "4. A system comprising a processor."},
+]
+
+
+def test_parse_claims_detects_dependencies() -> None:
+    claims = parse_claims(json.dumps(CLAIMS))
+    assert [(claim.number, claim.parent) for claim in claims] == [
+        (1, None),
+        (2, 1),
+        (3, 2),
+        (4, None),
+    ]
+    assert claims[0].text == "A method for generating a shopping list."
+    assert parse_claims(CLAIMS) == claims
+
+
+def test_parse_claims_from_plain_text() -> None:
+    claims = parse_claims("1. A widget.\n2. The widget of claim 1, in blue.")
+    assert [(claim.number, claim.parent) for claim in claims] == [(1, None), (2, 1)]
+    assert parse_claims(None) == []
+
+
+def test_compact_claims_keeps_independent_claims_within_budget() -> None:
+    claims = parse_claims(CLAIMS)
+    compacted, omitted = compact_claims(claims, budget=10_000, model=MODEL)
+    assert [claim["n"] for claim in compacted] == [1, 2, 3, 4]
+    assert omitted == []
+
+    compacted, omitted = compact_claims(claims, budget=100, model=MODEL)
+    numbers = [claim["n"] for claim in compacted]
+    assert 1 in numbers and 4 in numbers
+    assert omitted
+    assert all(claim["text"].endswith("...") for claim in compacted if claim["n"] == 2)
+
+
+def test_compact_claims_omits_claims_after_the_first_omitted_one() -> None:
+    claims = parse_claims(CLAIMS)
+    independent = sum(
+        count_tokens(to_compact_json({"n": claim.number, "text": claim.text}), MODEL)
+        for claim in claims
+        if claim.is_independent
+    )
+    claim_3 = claims[2]
+    claim_3_cost = count_tokens(
+        to_compact_json(
+            {"n": claim_3.number, "dep": claim_3.parent, "text": claim_3.text}
+        ),
+        MODEL,
+    )
+    # Room for the short claim 3, but too little to truncate claim 2 into
+    compacted, omitted = compact_claims(
+        claims, budget=independent + claim_3_cost, model=MODEL
+    )
+    assert [claim["n"] for claim in compacted] == [1, 4]
+    assert omitted == [2, 3]
+
+
+def test_build_analysis_prompt_is_compact() -> None:
+    patent = Patent(
+        publication_number="US-1", title="Lists", abstract="", claims=CLAIMS
+    )
+    company = Company(
+        name="Acme", products=[{"name": "App", "description": "Shopping app"}]
+    )
+    prompt, tokens = build_analysis_prompt(
+        company=company,
+        patent=patent,
+        analysis_id="id",
+        analysis_date="2024-01-01",
+        budget=10_000,
+        model=MODEL,
+    )
+    assert '[{"name":"App","description":"Shopping app"}]' in prompt
+    assert "    " not in prompt
+    assert 0 < tokens < 10_000
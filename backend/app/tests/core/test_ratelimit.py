@@ -0,0 +1,135 @@
+import asyncio
+
+import httpx
+import openai
+import pytest
+
+from app.core.config import settings
+from app.core.ratelimit import (
+    RateLimiter,
+    TokenBucket,
+    call_with_retries,
+    retry_after,
+)
+
+
+def status_error(
+    error: type[openai.APIStatusError], status: int, headers: dict[str, str]
+) -> openai.APIStatusError:
+    response = httpx.Response(
+        status,
+        headers=headers,
+        request=httpx.Request("POST", "https://api.openai.com/v1/chat/completions"),
+    )
+    return error("failed", response=response, body=None)
+
+
+def test_token_bucket_queues_reservations() -> None:
+    bucket = TokenBucket(per_minute=60)
+    assert bucket.reserve(60) == 0
+    # One token a second, so the next 30 tokens are ready in about 30 seconds
+    assert 29 < bucket.reserve(30) <= 30
+    # Later reservations queue behind earlier ones
+    assert 59 < bucket.reserve(30) <= 60
+    # Returned tokens shorten the queue
+    bucket.adjust(-60)
+    assert bucket.reserve(0) == 0
+
+
+def test_token_bucket_caps_oversized_reservations() -> None:
+    bucket = TokenBucket(per_minute=60)
+    assert bucket.reserve(1000) == 0
+    assert 59 < bucket.reserve(1000) <= 60
+
+
+def test_retry_after_headers() -> None:
+    error = status_error(openai.RateLimitError, 429, {"retry-after-ms": "1500"})
+    assert retry_after(error) == 1.5
+    error = status_error(openai.RateLimitError, 429, {"retry-after": "3"})
+    assert retry_after(error) == 3
+    error = status_error(
+        openai.RateLimitError, 429, {"retry-after": "Wed, 21 Oct 2015 07:28:00 GMT"}
+    )
+    assert retry_after(error) == 0
+    assert retry_after(status_error(openai.InternalServerError, 503, {})) is None
+    assert retry_after(RuntimeError()) is None
+
+
+def test_call_with_retries_honors_retry_after(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    sleeps: list[float] = []
+
+    async def sleep(seconds: float) -> None:
+        sleeps.append(seconds)
+
+    monkeypatch.setattr(asyncio, "sleep", sleep)
+    monkeypatch.setattr(settings, "OPENAI_RETRY_BASE_SECONDS", 0.5)
+    limiter = RateLimiter(requests_per_minute=0, tokens_per_minute=0)
+    errors: list[Exception] = [
+        status_error(openai.RateLimitError, 429, {"retry-after": "20"}),
+        status_error(openai.InternalServerError, 503, {}),
+    ]
+
+    async def call() -> str:
+        if errors:
+            raise errors.pop(0)
+        return "done"
+
+    assert asyncio.run(call_with_retries(call, tokens=100, limiter=limiter)) == "done"
+    # Retry-After plus jitter, then backoff from the base delay. As sleeping
+    # is mocked, the pause the rate limit put on every caller of the limiter
+    # is still running at each following attempt
+    retry_delay, pause, backoff, pause_again = sleeps
+    assert 20 <= retry_delay <= 20.5
+    assert 19 < pause <= retry_delay
+    assert 0 <= backoff <= 1.0
+    assert 19 < pause_again <= retry_delay
+
+
+def test_call_with_retries_gives_up(monkeypatch: pytest.MonkeyPatch) -> None:
+    async def sleep(_seconds: float) -> None:
+        pass
+
+    monkeypatch.setattr(asyncio, "sleep", sleep)
+    monkeypatch.setattr(settings, "OPENAI_MAX_RETRIES", 2)
+    limiter = RateLimiter(requests_per_minute=0, tokens_per_minute=0)
+    calls: list[int] = []
+
+    async def rate_limited() -> None:
+        calls.append(1)
+        raise status_error(openai.RateLimitError, 429, {})
+
+    with pytest.raises(openai.RateLimitError):
+        asyncio.run(call_with_retries(rate_limited, tokens=1, limiter=limiter))
+    assert len(calls) == 3
+
+    async def bad_request() -> None:
+        calls.append(1)
+        raise status_error(openai.BadRequestError, 400, {})
+
+    calls.clear()
+    with pytest.raises(openai.BadRequestError):
+        asyncio.run(call_with_retries(bad_request, tokens=1, limiter=limiter))
+    assert len(calls) == 1
+
+
+def test_call_with_retries_refunds_failed_attempts(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    async def sleep(_seconds: float) -> None:
+        pass
+
+    monkeypatch.setattr(asyncio, "sleep", sleep)
+    limiter = RateLimiter(requests_per_minute=0, tokens_per_minute=1000)
+    errors: list[Exception] = [status_error(openai.InternalServerError, 503, {})]
+
+    async def call() -> str:
+        if errors:
+            raise errors.pop(0)
+        return "done"
+
+    assert asyncio.run(call_with_retries(call, tokens=600, limiter=limiter)) == "done"
+    # Only the attempt that went through still holds its 600 tokens
+    assert limiter.tokens is not None
+    assert limiter.tokens.reserve(400) == 0
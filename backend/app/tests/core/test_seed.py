@@ -0,0 +1,134 @@
+import io
+import json
+
+import pytest
+from sqlmodel import Session, col, select
+
+from app.core.seed import (
+    decode_json_strings,
+    ingest_patents,
+    iter_json_array,
+    load_companies,
+)
+from app.models import Company, Patent, PatentClaim, Product
+
+
+def test_iter_json_array_across_chunks() -> None:
+    items = [{"name": "a" * 50, "values": [1, 2.5, None]}, 12345, "text", [True]]
+    document = json.dumps(items, indent=2)
+    assert list(iter_json_array(io.StringIO(document), chunk_size=7)) == items
+    assert list(iter_json_array(io.StringIO("[]"))) == []
+
+
+def test_iter_json_array_under_key() -> None:
+    document = json.dumps(
+        {"meta": {"n": 2}, "companies": [{"name": "a"}, {"name": "b"}]}
+    )
+    companies = iter_json_array(io.StringIO(document), key="companies", chunk_size=5)
+    assert list(companies) == [{"name": "a"}, {"name": "b"}]
+
+
+def test_iter_json_array_rejects_truncated_documents() -> None:
+    with pytest.raises(ValueError):
+        list(iter_json_array(io.StringIO('[{"name": "a"}, {"na'), chunk_size=4))
+    with pytest.raises(ValueError):
+        list(iter_json_array(io.StringIO('{"name": "a"}')))
+
+
+def test_ingest_patents_skips_unchanged(db: Session) -> None:
+    patent = {"publication_number": "US-SEED-0001-A1", "title": "Original title"}
+    updated = {**patent, "title": "Updated title"}
+    # The last record of a publication number in a batch wins
+    document = json.dumps([patent, updated, {"title": "Missing number"}])
+    stats = ingest_patents(db, io.StringIO(document))
+    assert (stats.inserted, stats.duplicate, stats.invalid) == (1, 1, 1)
+
+    stats = ingest_patents(db, io.StringIO(json.dumps([updated])))
+    assert (stats.inserted, stats.updated, stats.unchanged) == (0, 0, 1)
+
+    row = db.exec(
+        select(Patent).where(Patent.publication_number == "US-SEED-0001-A1")
+    ).one()
+    first_updated_at = row.updated_at
+    stats = ingest_patents(db, io.StringIO(json.dumps([patent])))
+    assert (stats.inserted, stats.updated, stats.unchanged) == (0, 1, 0)
+    db.refresh(row)
+    assert row.title == "Original title"
+    assert row.updated_at and first_updated_at and row.updated_at > first_updated_at
+
+    db.delete(row)
+    db.commit()
+
+
+def test_ingest_patents_splits_claims(db: Session) -> None:
+    patent = {
+        "publication_number": "US-SEED-0002-A1",
+        "title": "Claimed",
+        "claims": [
+            {"num": "00001", "text": "1. A widget comprising a lever."},
+            {
+                "num": "00002",
+                "text": "2. The widget of claim 1, wherein the lever bends.",
+            },
+        ],
+    }
+    ingest_patents(db, io.StringIO(json.dumps([patent])))
+    row = db.exec(
+        select(Patent).where(Patent.publication_number == "US-SEED-0002-A1")
+    ).one()
+    claims = db.exec(
+        select(PatentClaim)
+        .where(PatentClaim.patent_id == row.id)
+        .order_by(col(PatentClaim.number))
+    ).all()
+    assert [(c.number, c.parent, c.is_independent) for c in claims] == [
+        (1, None, True),
+        (2, 1, False),
+    ]
+    assert claims[0].text == "A widget comprising a lever."
+
+    # Changed claims replace the stored ones
+    patent["claims"] = patent["claims"][:1]
+    ingest_patents(db, io.StringIO(json.dumps([patent])))
+    numbers = db.exec(
+        select(PatentClaim.number).where(PatentClaim.patent_id == row.id)
+    ).all()
+    assert numbers == [1]
+
+    db.delete(row)
+    db.commit()
+
+
+def test_load_companies_splits_products(db: Session) -> None:
+    company = {
+        "name": "Seed Products Inc.",
+        "products": [
+            {"name": "Lever", "description": "Old lever"},
+            {"name": "Widget", "description": "A widget"},
+            # The last product of a name wins
+            {"name": "Lever", "description": "New lever"},
+        ],
+    }
+    load_companies(db, io.StringIO(json.dumps({"companies": [company]})))
+    row = db.exec(select(Company).where(Company.name == "Seed Products Inc.")).one()
+    products = db.exec(
+        select(Product.name, Product.description)
+        .where(Product.company_id == row.id)
+        .order_by(Product.name)
+    ).all()
+    assert [tuple(product) for product in products] == [
+        ("Lever", "New lever"),
+        ("Widget", "A widget"),
+    ]
+
+    db.delete(row)
+    db.commit()
+
+
+def test_decode_json_strings() -> None:
+    item = {"claims": '[{"num": "1"}]', "landscapes": "", "title": "[not json"}
+    assert decode_json_strings(item, ["claims", "landscapes", "title"]) == {
+        "claims": [{"num": "1"}],
+        "landscapes": "",
+        "title": "[not json",
+    }
@@ -0,0 +1,23 @@
+from sqlmodel import Session
+
+from app.core.seed import replace_company_products
+from app.models import Company
+from app.tests.utils.utils import random_lower_string
+
+
+def create_random_company(db: Session) -> Company:
+    company = Company(
+        name=random_lower_string(),
+        products=[
+            {
+                "name": random_lower_string(),
+                "description": "Mobile shopping list application",
+            }
+        ],
+    )
+    db.add(company)
+    db.commit()
+    replace_company_products(db, {company.id: company.products})
+    db.commit()
+    db.refresh(company)
+    return company
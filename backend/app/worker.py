@@ -0,0 +1,34 @@
+import asyncio
+import logging
+
+from app.core.config import settings
+from app.core.jobs import JobWorkerPool
+from app.core.openai import close_analyzer
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+async def run(concurrency: int) -> None:
+    pool = JobWorkerPool(concurrency)
+    pool.start()
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await pool.stop()
+        await close_analyzer()
+
+
+def main() -> None:
+    # Outside the API process, run at least one worker even if in-process
+    # workers are disabled
+    concurrency = max(settings.INFRINGEMENT_WORKER_CONCURRENCY, 1)
+    logger.info("Starting infringement job worker")
+    try:
+        asyncio.run(run(concurrency))
+    except KeyboardInterrupt:
+        logger.info("Infringement job worker stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Compare the cost of serializing patent list responses.
+
+"before" is the path /patents/ used to take: FastAPI's serialize_response
+validating the rows against the route's response field and serializing them,
+then the stdlib json module (fastapi.responses.JSONResponse). "after" is the
+path it takes now: encode the selected rows as they are with orjson
+(fastapi.responses.ORJSONResponse).
+
+--full benchmarks complete patents, with the large claims, citations and
+description columns, as /patents/ returned them before it returned summaries.
+Uses the seed patents, so no database is needed:
+
+    python scripts/benchmark_serialization.py --rows 1000 [--full]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+import uuid
+from typing import Any
+
+from fastapi._compat import ModelField
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import APIRoute, serialize_response
+from fastapi.utils import create_model_field
+from sqlmodel import SQLModel
+
+from app.api.routes.patents import router
+from app.models import PatentBase, PatentPublic, PatentSummary
+
+SEED_PATENTS = os.path.join(
+    os.path.dirname(__file__), "..", "app", "data", "patents.json"
+)
+
+
+def load_rows(count: int, fields: list[str]) -> list[dict[str, Any]]:
+    """
+    Rows as the database returns them: only the selected columns, with
+    datetimes and UUIDs rather than strings.
+    """
+    with open(SEED_PATENTS, encoding="utf-8") as f:
+        patents = [PatentBase.model_validate(patent) for patent in json.load(f)]
+    rows = []
+    for i in range(count):
+        patent = patents[i % len(patents)].model_dump()
+        rows.append({"id": uuid.uuid4(), **{field: patent[field] for field in fields}})
+    return rows
+
+
+class FullPatentsPublic(SQLModel):
+    """
+    Response model of /patents/ when it returned complete patents.
+    """
+
+    data: list[PatentPublic]
+    count: int | None
+    next_cursor: str | None = None
+
+
+def response_field(full: bool) -> ModelField:
+    """
+    Response field FastAPI validates /patents/ responses against, or the one it
+    had when returning complete patents.
+    """
+    route = next(
+        route
+        for route in router.routes
+        if isinstance(route, APIRoute) and route.path == "/"
+    )
+    assert route.response_field is not None
+    if not full:
+        return route.response_field
+    return create_model_field(
+        name=route.response_field.name, type_=FullPatentsPublic, mode="serialization"
+    )
+
+
+# serialize_response is a coroutine, run on one loop so its setup is not timed
+loop = asyncio.new_event_loop()
+
+
+def before(rows: list[dict[str, Any]], field: ModelField) -> bytes:
+    content = {"data": rows, "count": len(rows), "next_cursor": None}
+    serialized = loop.run_until_complete(
+        serialize_response(field=field, response_content=content)
+    )
+    return JSONResponse(serialized).body
+
+
+def after(rows: list[dict[str, Any]], _field: ModelField) -> bytes:
+    return ORJSONResponse({"data": rows, "count": len(rows), "next_cursor": None}).body
+
+
+def measure(
+    render: Any, rows: list[dict[str, Any]], field: ModelField, repeat: int
+) -> tuple[float, int]:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        body = render(rows, field)
+        best = min(best, time.perf_counter() - started)
+    return best, len(body)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--full", action="store_true", help="Complete patents")
+    args = parser.parse_args()
+
+    model: type[SQLModel] = PatentPublic if args.full else PatentSummary
+    fields = [field for field in model.model_fields if field != "id"]
+    rows = load_rows(args.rows, fields)
+    field = response_field(args.full)
+    print(f"{args.rows} patents as {model.__name__}")
+    results = {}
+    for name, render in (("before", before), ("after", after)):
+        seconds, size = measure(render, rows, field, args.repeat)
+        results[name] = seconds
+        megabytes = size / 1024 / 1024
+        print(
+            f"{name:>6}: {seconds * 1000:8.1f} ms for {megabytes:6.2f} MB"
+            f" = {seconds * 1000 / megabytes:8.1f} ms/MB"
+        )
+    print(f"speedup: {results['before'] / results['after']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
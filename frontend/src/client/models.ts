@@ -30,7 +30,8 @@ export type ItemUpdate = {
 
 export type ItemsPublic = {
   data: Array<ItemPublic>
-  count: number
+  count: number | null
+  next_cursor?: string | null
 }
 
 export type Message = {
@@ -89,7 +90,8 @@ export type UserUpdateMe = {
 
 export type UsersPublic = {
   data: Array<UserPublic>
-  count: number
+  count: number | null
+  next_cursor?: string | null
 }
 
 export type ValidationError = {
@@ -112,6 +114,12 @@ export type InfringementAnalysisPublic = {
     specific_features: string[];
   }>;
   overall_risk_assessment: string;
+  is_error: boolean;
+  product_scores: Array<{
+    product_name: string;
+    score: number;
+    selected: boolean;
+  }>;
 };
 
 export type CompanyPublic = {
@@ -125,7 +133,8 @@ export type CompanyPublic = {
 
 export type CompaniesPublic = {
   data: Array<CompanyPublic>;
-  count: number;
+  count: number | null;
+  next_cursor?: string | null;
 };
 
 export type PatentPublic = {
@@ -162,7 +171,21 @@ export type PatentPublic = {
   attachment_urls?: string | null;
 };
 
+export type PatentSummary = {
+  id: string;
+  publication_number?: string | null;
+  title?: string | null;
+  assignee?: string | null;
+  abstract?: string | null;
+  ai_summary?: string | null;
+  priority_date?: string | null;
+  application_date?: string | null;
+  grant_date?: string | null;
+  jurisdictions?: string | null;
+};
+
 export type PatentsPublic = {
-  data: Array<PatentPublic>;
-  count: number;
+  data: Array<PatentSummary>;
+  count: number | null;
+  next_cursor?: string | null;
 };
\ No newline at end of file
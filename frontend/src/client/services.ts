@@ -538,6 +538,9 @@ export type TInfringementCheck = {
   companyName: string;
 };
 
+export type InfringingProduct =
+  InfringementAnalysisPublic["top_infringing_products"][number];
+
 export class InfringementService {
   /**
    * Run Infringement Check
@@ -563,6 +566,74 @@ export class InfringementService {
     });
   }
 
+  /**
+   * Stream Infringement Check
+   * Checks for patent infringement, calling onProduct with each infringing
+   * product as soon as it is analyzed (server-sent events).
+   * @returns InfringementAnalysisPublic The complete analysis
+   * @throws Error
+   */
+  public static async streamInfringement(
+    data: TInfringementCheck,
+    onProduct: (product: InfringingProduct) => void,
+    signal?: AbortSignal,
+  ): Promise<InfringementAnalysisPublic> {
+    const { patentId, companyName } = data;
+    const url = "/api/v1/infringement/check/stream";
+    const token =
+      typeof OpenAPI.TOKEN === "function"
+        ? await OpenAPI.TOKEN({ method: "POST", url })
+        : OpenAPI.TOKEN;
+    const response = await fetch(`${OpenAPI.BASE}${url}`, {
+      method: "POST",
+      headers: {
+        "Content-Type": "application/json",
+        Accept: "text/event-stream",
+        ...(token ? { Authorization: `Bearer ${token}` } : {}),
+      },
+      body: JSON.stringify({ patent_id: patentId, company_name: companyName }),
+      signal,
+    });
+    if (!response.ok || !response.body) {
+      throw new Error(`Infringement check failed with status ${response.status}`);
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = "";
+    for (;;) {
+      const { done, value } = await reader.read();
+      if (done) {
+        break;
+      }
+      buffer += decoder.decode(value, { stream: true });
+      // Events are separated by a blank line
+      let end = buffer.indexOf("\n\n");
+      while (end !== -1) {
+        let event = "message";
+        const dataLines: string[] = [];
+        for (const line of buffer.slice(0, end).split("\n")) {
+          if (line.startsWith("event: ")) {
+            event = line.slice("event: ".length);
+          } else if (line.startsWith("data: ")) {
+            dataLines.push(line.slice("data: ".length));
+          }
+        }
+        buffer = buffer.slice(end + 2);
+        end = buffer.indexOf("\n\n");
+
+        const payload = JSON.parse(dataLines.join("\n"));
+        if (event === "product") {
+          onProduct(payload);
+        } else if (event === "analysis") {
+          await reader.cancel();
+          return payload;
+        }
+      }
+    }
+    throw new Error("Infringement stream ended without an analysis");
+  }
+
   /**
    * Get Infringement Report
    * Retrieve a report by analysis ID.
@@ -592,6 +663,7 @@ export type TPatent = {
 export type TDataReadPatents = {
   limit?: number;
   skip?: number;
+  fields?: string;
 };
 
 export class PatentService {
@@ -604,13 +676,14 @@ export class PatentService {
   public static readPatents(
     data: TDataReadPatents = {},
   ): CancelablePromise<PatentsPublic> {
-    const { limit, skip } = data;
+    const { limit, skip, fields } = data;
     return __request(OpenAPI, {
       method: "GET",
       url: "/api/v1/patents/",
       query: {
         skip,
         limit,
+        fields,
       },
       errors: {
         422: `Validation Error`,
@@ -9,14 +9,14 @@ import {
 import { BsThreeDotsVertical } from "react-icons/bs"
 import { FiEdit, FiTrash } from "react-icons/fi"
 
-import type { ItemPublic, UserPublic, InfringementAnalysisPublic, PatentPublic, CompanyPublic } from "../../client"
+import type { ItemPublic, UserPublic, InfringementAnalysisPublic, PatentPublic, PatentSummary, CompanyPublic } from "../../client"
 import EditUser from "../Admin/EditUser"
 import EditItem from "../Items/EditItem"
 import Delete from "./DeleteAlert"
 
 interface ActionsMenuProps {
   type: string
-  value: ItemPublic | UserPublic | InfringementAnalysisPublic | PatentPublic | CompanyPublic
+  value: ItemPublic | UserPublic | InfringementAnalysisPublic | PatentPublic | PatentSummary | CompanyPublic
   disabled?: boolean
 }
 
@@ -23,6 +23,7 @@ import { useState } from "react";
 import { useQuery, useMutation, UseMutationResult } from "@tanstack/react-query";
 import { createFileRoute } from "@tanstack/react-router";
 import { InfringementService, PatentService, CompanyService } from "../../client";
+import type { InfringingProduct } from "../../client/services";
 
 export const Route = createFileRoute("/_layout/infringementAnalysis")({
   component: InfringementAnalysis,
@@ -98,7 +99,15 @@ function InfringementsForm({ onSubmit }: { onSubmit: (patentId: string, companyN
   );
 }
 
-function InfringementsResult({ data, isLoading }: { data?: any; isLoading: boolean }) {
+function InfringementsResult({
+  data,
+  isLoading,
+  isStreaming,
+}: {
+  data?: any;
+  isLoading: boolean;
+  isStreaming?: boolean;
+}) {
   const borderColor = useColorModeValue("gray.200", "gray.600");
   const [showFullExplanation, setShowFullExplanation] = useState<{ [key: number]: boolean }>({});
 
@@ -126,7 +135,7 @@ function InfringementsResult({ data, isLoading }: { data?: any; isLoading: boole
       <Box mt={6} maxWidth="100%" whiteSpace="pre-wrap" wordBreak="break-word">
         <Heading size="md">Overall Risk Assessment</Heading>
         <Box mt={2} p={2} borderWidth="1px" borderRadius="md" borderColor={borderColor} bg={useColorModeValue("gray.50", "gray.800")}>
-          {data.overall_risk_assessment}
+          {isStreaming ? <SkeletonText noOfLines={2} /> : data.overall_risk_assessment}
         </Box>
       </Box>
       <Divider my={4} borderColor={borderColor} />
@@ -201,6 +210,7 @@ function InfringementsResult({ data, isLoading }: { data?: any; isLoading: boole
           ))}
         </Tbody>
       </Table>
+      {isStreaming && <Progress size="xs" isIndeterminate colorScheme="teal" mt={2} />}
     </TableContainer>
   );
 }
@@ -208,15 +218,27 @@ function InfringementsResult({ data, isLoading }: { data?: any; isLoading: boole
 
 function InfringementAnalysis() {
   const [result, setResult] = useState<any>(null);
+  // Infringing products received so far, shown while the analysis streams
+  const [products, setProducts] = useState<InfringingProduct[]>([]);
 
   const mutation: UseMutationResult<any, Error, { patentId: string; companyName: string }> = useMutation({
     mutationKey: ["checkInfringement"],
-    mutationFn: ({ patentId, companyName }: { patentId: string; companyName: string }) =>
-      InfringementService.checkInfringement({ patentId, companyName }),
+    mutationFn: ({ patentId, companyName }: { patentId: string; companyName: string }) => {
+      setResult(null);
+      setProducts([]);
+      return InfringementService.streamInfringement({ patentId, companyName }, (product) =>
+        setProducts((previous) => [...previous, product]),
+      );
+    },
     onSuccess: (data) => {
       setResult(data);
     },
   });
+  const isPending = mutation.status === "pending";
+  const partialResult =
+    isPending && products.length > 0
+      ? { top_infringing_products: products, analysis_date: new Date().toISOString() }
+      : null;
 
   const handleSubmit = (patentId: string, companyName: string) => {
     mutation.mutate({ patentId, companyName });
@@ -230,7 +252,11 @@ function InfringementAnalysis() {
 
       {/* <Navbar type={"Infringement"} /> */}
       <InfringementsForm onSubmit={handleSubmit} />
-      <InfringementsResult data={result} isLoading={mutation.status === "pending"} />
+      <InfringementsResult
+        data={result ?? partialResult}
+        isLoading={isPending && products.length === 0}
+        isStreaming={partialResult !== null}
+      />
     </Container>
   );
 }